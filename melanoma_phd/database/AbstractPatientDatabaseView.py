@@ -1,13 +1,21 @@
 from abc import ABC, abstractmethod
-from typing import List, Optional, Type, Union
+from typing import Callable, Dict, List, Optional, Type, TypeVar, Union
 
+import numpy as np
 import pandas as pd
 
 from melanoma_phd.database.Patient import Patient
+from melanoma_phd.database.PatientColumnArrays import PatientColumnArrays
+from melanoma_phd.database.statistics.StatisticalPropertyCache import StatisticalPropertyCache
 from melanoma_phd.database.variable.BaseVariable import BaseVariable
 
+DataframeBound = TypeVar("DataframeBound", PatientColumnArrays, StatisticalPropertyCache)
+
 
 class AbstractPatientDatabaseView(ABC):
+    _column_arrays: Optional[PatientColumnArrays]
+    _property_cache: Optional[StatisticalPropertyCache]
+
     def __init__(self) -> None:
         pass
 
@@ -32,16 +40,61 @@ class AbstractPatientDatabaseView(ABC):
     def patient_ids(self) -> List[int]:
         return list(self.dataframe.index.values)
 
+    @property
+    def column_arrays(self) -> PatientColumnArrays:
+        """Column arrays of the view dataframe, shared by the patients of this view."""
+        self._column_arrays = self._bind_to_dataframe(self._column_arrays, PatientColumnArrays)
+        return self._column_arrays
+
+    @property
+    def property_cache(self) -> StatisticalPropertyCache:
+        """Statistical properties of the view dataframe, shared by the testers of this view."""
+        self._property_cache = self._bind_to_dataframe(
+            self._property_cache, StatisticalPropertyCache
+        )
+        return self._property_cache
+
+    def _bind_to_dataframe(
+        self,
+        current: Optional[DataframeBound],
+        create: Callable[[pd.DataFrame], DataframeBound],
+    ) -> DataframeBound:
+        """Returns `current` if it was built for the view dataframe, or a new one otherwise."""
+        dataframe = self.dataframe
+        if current is None or current.dataframe is not dataframe:
+            return create(dataframe)
+        return current
+
     def get_patient(self, patient_id: int) -> Patient:
-        return Patient(patient_id, self.dataframe.loc[patient_id])
+        column_arrays = self.column_arrays
+        position = int(column_arrays.positions([patient_id])[0])
+        return Patient(patient_id, position, column_arrays)
 
     def get_patients(self, patient_ids: Optional[List[int]]) -> List[Patient]:
+        column_arrays = self.column_arrays
         if patient_ids:
-            return [self.get_patient(patient_id) for patient_id in patient_ids]
+            positions = column_arrays.positions(patient_ids)
         else:
-            return [
-                Patient(int(index), row) for index, row in self.dataframe.iterrows()
-            ]
+            patient_ids = [int(patient_id) for patient_id in column_arrays.patient_ids]
+            positions = np.arange(len(patient_ids))
+        return [
+            Patient(patient_id, int(position), column_arrays)
+            for patient_id, position in zip(patient_ids, positions)
+        ]
+
+    def get_patients_data(
+        self, column_ids: List[str], patient_ids: Optional[List[int]] = None
+    ) -> Dict[str, np.ndarray]:
+        """Returns the values of `column_ids` columns of `patient_ids` patients, all of them if
+        not provided, as arrays in patients order.
+        """
+        column_arrays = self.column_arrays
+        positions = (
+            column_arrays.positions(patient_ids)
+            if patient_ids
+            else np.arange(len(column_arrays.patient_ids))
+        )
+        return column_arrays.take(column_ids, positions)
 
     def get_variable(self, variable_id: str) -> BaseVariable:
         for variable in self.variables:
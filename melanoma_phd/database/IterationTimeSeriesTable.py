@@ -0,0 +1,159 @@
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from melanoma_phd.database.filter.FilterMask import FilterMask
+from melanoma_phd.database.variable.BaseVariable import BaseVariable
+from melanoma_phd.database.variable.IterationCategoricalVariable import IterationCategoricalVariable
+from melanoma_phd.database.variable.IterationScalarVariable import IterationScalarVariable
+
+
+class IterationTimeSeriesTable:
+    """Long format table of the iteration variables, with a row per variable, patient and iteration
+    holding the value and the time of the reference variable at that iteration.
+
+    Rows are sorted by variable, patient position and iteration, so each variable is a contiguous
+    slice and patient sets are selected with a positions mask. Null values are not stored.
+    """
+
+    ITERATION = "iteration"
+    TIME = "time"
+    VARIABLE = "variable"
+    VALUE = "value"
+
+    def __init__(self, dataframe: pd.DataFrame, variables: List[BaseVariable]) -> None:
+        self._patient_index: pd.Index = dataframe.index
+        self._column_ids: List[str] = []
+        self._variable_slices: Dict[str, slice] = {}
+        positions: List[np.ndarray] = []
+        iterations: List[np.ndarray] = []
+        times: List[np.ndarray] = []
+        values: List[np.ndarray] = []
+        value_columns: List[np.ndarray] = []
+        time_columns: List[np.ndarray] = []
+        start = 0
+        for variable in variables:
+            if (
+                not isinstance(variable, (IterationScalarVariable, IterationCategoricalVariable))
+                or variable.id in self._variable_slices
+            ):
+                continue
+            value_ids = variable.iterated_variable_ids
+            time_ids = variable.reference_variable.iterated_variable_ids
+            if len(value_ids) != len(time_ids):
+                raise ValueError(
+                    f"'{variable.id}' iterations do not match '{variable.reference_variable.id}' ones"
+                )
+            value_matrix = self.__to_numpy(dataframe[value_ids])
+            variable_positions, variable_iterations = np.nonzero(pd.notna(value_matrix))
+            positions.append(variable_positions)
+            iterations.append(variable_iterations + 1)
+            values.append(value_matrix[variable_positions, variable_iterations])
+            times.append(
+                dataframe[time_ids].to_numpy(dtype=float)[variable_positions, variable_iterations]
+            )
+            value_columns.append(self.__column_codes(value_ids)[variable_iterations])
+            time_columns.append(self.__column_codes(time_ids)[variable_iterations])
+            self._variable_slices[variable.id] = slice(start, start + len(variable_positions))
+            start += len(variable_positions)
+        self._positions = self.__concatenate(positions, dtype=np.int64)
+        self._iterations = self.__concatenate(iterations, dtype=np.int64)
+        self._times = self.__concatenate(times, dtype=float)
+        self._values = self.__concatenate(values, dtype=float)
+        self._value_columns = self.__concatenate(value_columns, dtype=np.int64)
+        self._time_columns = self.__concatenate(time_columns, dtype=np.int64)
+        self._variable_codes = np.empty(len(self._positions), dtype=np.int64)
+        for variable_code, variable_slice in enumerate(self._variable_slices.values()):
+            self._variable_codes[variable_slice] = variable_code
+
+    @property
+    def variable_ids(self) -> List[str]:
+        return list(self._variable_slices.keys())
+
+    @property
+    def size(self) -> int:
+        return len(self._positions)
+
+    def get(
+        self,
+        variable_ids: Optional[List[str]] = None,
+        patient_ids: Optional[List[int]] = None,
+        mask: Optional[FilterMask] = None,
+    ) -> pd.DataFrame:
+        """Returns the rows of `variable_ids` variables and `patient_ids` patients, all of them if
+        not provided. A filter `mask` over the database rows removes the rows of filtered patients
+        and of removed values, and nulls the removed times.
+        """
+        rows = self.__get_rows(variable_ids)
+        positions = self._positions[rows]
+        keep = np.ones(len(rows), dtype=bool)
+        if patient_ids is not None:
+            selected_positions = np.zeros(len(self._patient_index), dtype=bool)
+            patient_positions = self._patient_index.get_indexer(patient_ids)
+            selected_positions[patient_positions[patient_positions >= 0]] = True
+            keep &= selected_positions[positions]
+        times = self._times[rows]
+        if mask is not None:
+            keep &= mask.rows[positions]
+            value_columns = self._value_columns[rows]
+            time_columns = self._time_columns[rows]
+            removed_times = np.zeros(len(rows), dtype=bool)
+            for column_code, column_id in enumerate(self._column_ids):
+                cells = mask.cells.get(column_id)
+                if cells is None:
+                    continue
+                removed_cells = ~cells[positions]
+                keep &= ~(removed_cells & (value_columns == column_code))
+                removed_times |= removed_cells & (time_columns == column_code)
+            if removed_times.any():
+                times = np.where(removed_times, np.nan, times)
+        rows = rows[keep]
+        return pd.DataFrame(
+            {
+                self._patient_index.name: self._patient_index[self._positions[rows]],
+                self.ITERATION: self._iterations[rows],
+                self.TIME: times[keep],
+                self.VARIABLE: pd.Categorical.from_codes(
+                    self._variable_codes[rows], categories=self.variable_ids
+                ),
+                self.VALUE: self._values[rows],
+            }
+        )
+
+    def __get_rows(self, variable_ids: Optional[List[str]]) -> np.ndarray:
+        if variable_ids is None:
+            return np.arange(len(self._positions))
+        return np.concatenate(
+            [np.empty(0, dtype=np.int64)]
+            + [
+                np.arange(
+                    self._variable_slices[variable_id].start,
+                    self._variable_slices[variable_id].stop,
+                )
+                for variable_id in variable_ids
+            ]
+        )
+
+    def __column_codes(self, column_ids: List[str]) -> np.ndarray:
+        codes = []
+        for column_id in column_ids:
+            if column_id not in self._column_ids:
+                self._column_ids.append(column_id)
+            codes.append(self._column_ids.index(column_id))
+        return np.array(codes, dtype=np.int64)
+
+    @staticmethod
+    def __to_numpy(dataframe: pd.DataFrame) -> np.ndarray:
+        try:
+            return dataframe.to_numpy(dtype=float)
+        except (TypeError, ValueError):
+            return dataframe.to_numpy(dtype=object)
+
+    @staticmethod
+    def __concatenate(arrays: List[np.ndarray], dtype: type) -> np.ndarray:
+        if not arrays:
+            return np.empty(0, dtype=dtype)
+        if dtype is float and any(array.dtype == object for array in arrays):
+            return np.concatenate([array.astype(object) for array in arrays])
+        return np.concatenate(arrays).astype(dtype, copy=False)
@@ -3,16 +3,37 @@ from typing import Any, Dict, List
 
 import pandas as pd
 
+from melanoma_phd.database.PatientColumnArrays import PatientColumnArrays
+
 
 class Patient:
-    def __init__(self, patient_id: int, series: pd.Series) -> None:
+    """Lazy proxy of a patient row, reading its values from the column arrays of a view."""
+
+    __slots__ = ("_id", "_position", "_columns")
+
+    def __init__(self, patient_id: int, position: int, columns: PatientColumnArrays) -> None:
         self._id: int = patient_id
-        self._dataframe: pd.Series = series
+        self._position: int = position
+        self._columns: PatientColumnArrays = columns
 
     @property
     def id(self) -> int:
         return self._id
 
+    @property
+    def position(self) -> int:
+        return self._position
+
+    @property
+    def series(self) -> pd.Series:
+        return self._columns.row(self._position)
+
+    def get(self, column_id: str) -> Any:
+        return self._columns.value(column_id, self._position)
+
+    def __getitem__(self, column_id: str) -> Any:
+        return self.get(column_id)
+
     def create_time_series(
         self,
         time_variable_name: str,
@@ -51,8 +72,9 @@ class Patient:
         for index in range:
             time_variable_name_it = time_variable_name.replace("{N}", "{}").format(index)
             value_variable_name_it = value_variable_name.replace("{N}", "{}").format(index)
-            if self._dataframe[time_variable_name_it] is not pd.NaT:
-                data_dict[new_time_variable].append(self._dataframe[time_variable_name_it])
-                data_dict[new_value_variable].append(self._dataframe[value_variable_name_it])
+            time = self.get(time_variable_name_it)
+            if pd.notna(time):
+                data_dict[new_time_variable].append(time)
+                data_dict[new_value_variable].append(self.get(value_variable_name_it))
 
         return pd.DataFrame(data_dict)
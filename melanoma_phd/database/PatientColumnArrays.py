@@ -0,0 +1,53 @@
+import threading
+from typing import Any, Dict, List
+
+import numpy as np
+import pandas as pd
+
+
+class PatientColumnArrays:
+    """Numpy arrays of the columns of a patients dataframe, each one converted on its first access
+    and shared by all the patients read from it.
+    """
+
+    def __init__(self, dataframe: pd.DataFrame) -> None:
+        self._dataframe = dataframe
+        self._arrays: Dict[str, np.ndarray] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def dataframe(self) -> pd.DataFrame:
+        return self._dataframe
+
+    @property
+    def patient_ids(self) -> np.ndarray:
+        return self._dataframe.index.to_numpy()
+
+    def get(self, column_id: str) -> np.ndarray:
+        array = self._arrays.get(column_id)
+        if array is None:
+            with self._lock:
+                array = self._arrays.get(column_id)
+                if array is None:
+                    array = self._dataframe[column_id].to_numpy()
+                    self._arrays[column_id] = array
+        return array
+
+    def positions(self, patient_ids: List[int]) -> np.ndarray:
+        """Row positions of `patient_ids`, raising KeyError for the ones not present."""
+        positions = self._dataframe.index.get_indexer(patient_ids)
+        if (positions < 0).any():
+            missing_ids = [
+                patient_id for patient_id, position in zip(patient_ids, positions) if position < 0
+            ]
+            raise KeyError(f"Patients {missing_ids} not present")
+        return positions
+
+    def take(self, column_ids: List[str], positions: np.ndarray) -> Dict[str, np.ndarray]:
+        return {column_id: self.get(column_id)[positions] for column_id in column_ids}
+
+    def value(self, column_id: str, position: int) -> Any:
+        return self.get(column_id)[position]
+
+    def row(self, position: int) -> pd.Series:
+        return self._dataframe.iloc[position]
@@ -3,7 +3,6 @@ from __future__ import annotations
 import logging
 import os
 import re
-from copy import deepcopy
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple
 
@@ -17,14 +16,22 @@ from melanoma_phd.config.IterationConfigGenerator import IterationConfigGenerato
 from melanoma_phd.database.AbstractPatientDatabaseView import AbstractPatientDatabaseView
 from melanoma_phd.database.DatabaseSheet import DatabaseSheet
 from melanoma_phd.database.filter.BaseFilter import BaseFilter
+from melanoma_phd.database.filter.FilterMaskContext import FilterMaskContext
+from melanoma_phd.database.filter.IncrementalFilterer import IncrementalFilterer
 from melanoma_phd.database.filter.PatientDataFilterer import PatientDataFilterer
+from melanoma_phd.database.filter.QueryFilter import QueryFilter
+from melanoma_phd.database.index.DatabaseIndex import DatabaseIndex
+from melanoma_phd.database.IterationTimeSeriesTable import IterationTimeSeriesTable
+from melanoma_phd.database.PatientColumnArrays import PatientColumnArrays
 from melanoma_phd.database.PatientDatabaseView import PatientDatabaseView
+from melanoma_phd.database.PatientDatabaseViewCache import PatientDatabaseViewCache
 from melanoma_phd.database.source.DriveFileRepository import (
     DriveFileRepository,
     DriveFileRepositoryConfig,
     DriveVersionFileInfo,
 )
 from melanoma_phd.database.source.GoogleDriveService import GoogleDriveService
+from melanoma_phd.database.statistics.StatisticalPropertyCache import StatisticalPropertyCache
 from melanoma_phd.database.variable.BaseVariable import BaseVariable
 from melanoma_phd.database.variable.IterationCategoricalVariable import IterationCategoricalVariable
 from melanoma_phd.database.variable.IterationScalarVariable import IterationScalarVariable
@@ -48,18 +55,37 @@ class PatientDatabase(AbstractPatientDatabaseView):
     DATABASE_FOLDER = "database"
     DATABASE_FILE = "patient_database.xlsx"
     VERSION_REGEX = re.compile(r"versió\ +(?P<number>\d+)")
+    VIEW_CACHE_MEMORY_MB = 512
 
     def __init__(self, config: AppConfig) -> None:
         self._config: AppConfig = config
         self._index_variable_name: Optional[str] = None
         self._dataframe: Optional[pd.DataFrame] = None
+        self._index: Optional[DatabaseIndex] = None
+        self._query_filter: Optional[QueryFilter] = None
+        self._time_series_table: Optional[IterationTimeSeriesTable] = None
+        self._column_arrays: Optional[PatientColumnArrays] = None
+        self._property_cache: Optional[StatisticalPropertyCache] = None
+        self._count_cube_ids: List[str] = []
         self._sheets: List[DatabaseSheet] = []
+        self._load_count: int = 0
+        self._view_cache = PatientDatabaseViewCache(
+            max_memory_bytes=self.VIEW_CACHE_MEMORY_MB * 1024 * 1024
+        )
         self.__load()
 
     @property
     def file_info(self) -> DriveVersionFileInfo:
         return self._file_info
 
+    @property
+    def version_key(self) -> str:
+        return f"{self._file_info.version}#{self._load_count}"
+
+    @property
+    def view_cache(self) -> PatientDatabaseViewCache:
+        return self._view_cache
+
     @property
     def sheets(self) -> List[DatabaseSheet]:
         return self._sheets
@@ -72,6 +98,30 @@ class PatientDatabase(AbstractPatientDatabaseView):
             )
         return self._dataframe
 
+    @property
+    def index(self) -> DatabaseIndex:
+        if self._index is None:
+            raise ValueError(
+                f"Database index has not been built. Please review code to ensure the process is working as expected"
+            )
+        return self._index
+
+    @property
+    def query_filter(self) -> QueryFilter:
+        """Query filter over the database variables, keeping the parsed queries of this load."""
+        if self._query_filter is None:
+            self._query_filter = QueryFilter(variables=self.variables)
+        return self._query_filter
+
+    @property
+    def time_series_table(self) -> IterationTimeSeriesTable:
+        """Long format table of the iteration variables, built once per load."""
+        if self._time_series_table is None:
+            self._time_series_table = IterationTimeSeriesTable(
+                dataframe=self.dataframe, variables=self.variables
+            )
+        return self._time_series_table
+
     @property
     def variables(self) -> List[BaseVariable]:
         return [variable for sheet in self.sheets for variable in sheet.variables]
@@ -91,15 +141,68 @@ class PatientDatabase(AbstractPatientDatabaseView):
     def reload(self) -> None:
         self.__load()
 
+    def set_count_cube_variables(self, variables: List[BaseVariable]) -> None:
+        """Builds, on this and the following loads, the count cube of the static categorical
+        `variables`, answering their counts and descriptive statistics in filtered views.
+        """
+        self._count_cube_ids = [variable.id for variable in variables]
+        self.index.build_count_cube(self._count_cube_ids)
+        self._view_cache.clear()
+
     def filter(
-        self, filters: List[BaseFilter], name: Optional[str] = None
+        self,
+        filters: List[BaseFilter],
+        name: Optional[str] = None,
+        fingerprint: Optional[str] = None,
+        filterer: Optional[IncrementalFilterer] = None,
     ) -> PatientDatabaseView:
-        dataframe_to_filter = self.dataframe.copy()
-        df_result = PatientDataFilterer().filter(dataframe_to_filter, filters)
-        if name:
-            df_result.name = name
-        variables = [deepcopy(variable) for variable in self.variables]
-        return PatientDatabaseView(dataframe=df_result, variables=variables)
+        """Filters the database. Views are cached by `fingerprint`, which has to identify the
+        selection of `filters` univocally. An incremental `filterer` reuses the masks of its
+        previous evaluations.
+        """
+        if fingerprint is not None:
+            cache_key = (self.version_key, name, fingerprint)
+            view = self._view_cache.get(cache_key)
+            if view is None:
+                view = self.filter(filters=filters, name=name, filterer=filterer)
+                self._view_cache.put(cache_key, view)
+            return view
+        mask = (filterer if filterer is not None else PatientDataFilterer()).mask(
+            self.dataframe, filters, self.variables, self.index
+        )
+        selection = (
+            PatientDataFilterer().selection(
+                FilterMaskContext(
+                    dataframe=self.dataframe, variables=self.variables, index=self.index
+                ),
+                filters,
+            )
+            if self.index.count_cube is not None
+            else None
+        )
+        return PatientDatabaseView(
+            dataframe=self.dataframe,
+            variables=self.variables,
+            mask=mask,
+            name=name,
+            selection=selection,
+            count_cube=self.index.count_cube,
+        )
+
+    def query(self, query: str, name: Optional[str] = None) -> PatientDatabaseView:
+        """Filters the database with a textual query, see `QueryParser` for its syntax."""
+        cache_key = (self.version_key, name, f"query:{query.strip()}")
+        view = self._view_cache.get(cache_key)
+        if view is None:
+            context = FilterMaskContext(
+                dataframe=self.dataframe, variables=self.variables, index=self.index
+            )
+            context.apply(self.query_filter.mask(context, query))
+            view = PatientDatabaseView(
+                dataframe=self.dataframe, variables=self.variables, mask=context.mask, name=name
+            )
+            self._view_cache.put(cache_key, view)
+        return view
 
     def __check_equal_column_data(
         self, left_dataframe: pd.DataFrame, right_dataframe: pd.DataFrame
@@ -113,6 +216,12 @@ class PatientDatabase(AbstractPatientDatabaseView):
         return not_equal_columns
 
     def __load(self) -> None:
+        self._view_cache.clear()
+        self._query_filter = None
+        self._time_series_table = None
+        self._column_arrays = None
+        self._property_cache = None
+        self._load_count += 1
         database_file_path = os.path.join(
             self._config.data_folder, self.DATABASE_FOLDER, self.DATABASE_FILE
         )
@@ -124,6 +233,9 @@ class PatientDatabase(AbstractPatientDatabaseView):
         self.__load_database(
             database_file=database_file, config_file=self._config.database_config
         )
+        self._index = DatabaseIndex(dataframe=self.dataframe, variables=self.variables)
+        if self._count_cube_ids:
+            self._index.build_count_cube(self._count_cube_ids)
 
     def __download_latest_version_file(
         self,
@@ -1,20 +1,114 @@
-from typing import List
+import threading
+from typing import Any, Dict, List, Optional, Union
 
+import numpy as np
 import pandas as pd
 
 from melanoma_phd.database.AbstractPatientDatabaseView import AbstractPatientDatabaseView
+from melanoma_phd.database.filter.FilterMask import FilterMask
+from melanoma_phd.database.index.CountCube import CountCube
+from melanoma_phd.database.PatientColumnArrays import PatientColumnArrays
+from melanoma_phd.database.statistics.CountCubeStatistics import CountCubeStatistics
+from melanoma_phd.database.statistics.StatisticalPropertyCache import StatisticalPropertyCache
 from melanoma_phd.database.variable.BaseVariable import BaseVariable
 
 
 class PatientDatabaseView(AbstractPatientDatabaseView):
-    def __init__(self, dataframe: pd.DataFrame, variables: List[BaseVariable]) -> None:
-        self._dataframe: pd.DataFrame = dataframe
+    """View of a dataframe sharing the variables catalog of the database.
+
+    When a filter `mask` is provided, `dataframe` is the unfiltered base dataframe, which is only
+    sliced the first time the view dataframe is accessed. Columns are only copied when the mask
+    removes cells of iteration variables. When the view is a `selection` of categorical values, the
+    descriptive statistics of the `count_cube` dimensions are aggregated from the cube.
+    """
+
+    def __init__(
+        self,
+        dataframe: pd.DataFrame,
+        variables: List[BaseVariable],
+        mask: Optional[FilterMask] = None,
+        name: Optional[str] = None,
+        selection: Optional[Dict[str, List[Any]]] = None,
+        count_cube: Optional[CountCube] = None,
+    ) -> None:
+        self._base_dataframe: pd.DataFrame = dataframe
         self._variables: List[BaseVariable] = variables
+        self._mask: Optional[FilterMask] = mask
+        self._name: Optional[str] = name
+        self._count_cube_statistics: Optional[CountCubeStatistics] = (
+            CountCubeStatistics(count_cube, selection)
+            if count_cube is not None and selection is not None
+            else None
+        )
+        self._dataframe: Optional[pd.DataFrame] = None if mask is not None else dataframe
+        self._column_arrays: Optional[PatientColumnArrays] = None
+        self._property_cache: Optional[StatisticalPropertyCache] = None
+        self._lock = threading.Lock()
 
     @property
     def dataframe(self) -> pd.DataFrame:
+        if self._dataframe is None:
+            with self._lock:
+                if self._dataframe is None:
+                    self._dataframe = self.__materialize()
         return self._dataframe
 
     @property
     def variables(self) -> List[BaseVariable]:
         return self._variables
+
+    @property
+    def mask(self) -> Optional[FilterMask]:
+        return self._mask
+
+    @property
+    def patients_number(self) -> int:
+        if self._mask is not None:
+            return int(np.count_nonzero(self._mask.rows))
+        return len(self._base_dataframe.index)
+
+    def descriptive_statistics(
+        self,
+        variable: BaseVariable,
+        group_by: Optional[Union[BaseVariable, List[BaseVariable]]] = None,
+    ) -> pd.DataFrame:
+        statistics = self.count_cube_descriptive_statistics(variable, group_by)
+        if statistics is not None:
+            return statistics
+        return variable.descriptive_statistics(self.dataframe, group_by=group_by)
+
+    def count_cube_descriptive_statistics(
+        self,
+        variable: BaseVariable,
+        group_by: Optional[Union[BaseVariable, List[BaseVariable]]] = None,
+    ) -> Optional[pd.DataFrame]:
+        """Descriptive statistics aggregated from the count cube, None when the view is not a cube
+        selection or the variables are not cube dimensions.
+        """
+        if self._count_cube_statistics is None:
+            return None
+        return self._count_cube_statistics.descriptive_statistics(variable, group_by)
+
+    def memory_usage(self) -> int:
+        """Bytes owned by this view, excluding the data shared with the base dataframe."""
+        if self._mask is None:
+            return 0
+        mask_memory = self._mask.rows.nbytes + sum(
+            cell_mask.nbytes for cell_mask in self._mask.cells.values()
+        )
+        if self._mask.is_full:
+            return mask_memory
+        base_memory = int(self._base_dataframe.memory_usage(index=True, deep=False).sum())
+        return mask_memory + base_memory * self.patients_number // max(
+            len(self._base_dataframe.index), 1
+        )
+
+    def __materialize(self) -> pd.DataFrame:
+        assert self._mask is not None
+        if self._mask.is_full:
+            dataframe = self._base_dataframe.copy(deep=False)
+        else:
+            dataframe = self._mask.materialize(self._base_dataframe)
+        if self._name:
+            dataframe.name = self._name
+        return dataframe
@@ -0,0 +1,53 @@
+import logging
+import threading
+from collections import OrderedDict
+from typing import Hashable, Optional, Tuple
+
+from melanoma_phd.database.PatientDatabaseView import PatientDatabaseView
+
+
+class PatientDatabaseViewCache:
+    """Thread-safe LRU cache of filtered database views limited by the memory owned by the views.
+
+    Views are shared between callers, so their dataframes must not be modified in place.
+    """
+
+    def __init__(self, max_memory_bytes: int) -> None:
+        self._max_memory_bytes = max_memory_bytes
+        self._memory_bytes = 0
+        self._views: OrderedDict[Hashable, Tuple[PatientDatabaseView, int]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def memory_bytes(self) -> int:
+        return self._memory_bytes
+
+    def __len__(self) -> int:
+        return len(self._views)
+
+    def get(self, key: Hashable) -> Optional[PatientDatabaseView]:
+        with self._lock:
+            entry = self._views.get(key)
+            if entry is None:
+                return None
+            self._views.move_to_end(key)
+            return entry[0]
+
+    def put(self, key: Hashable, view: PatientDatabaseView) -> None:
+        memory_bytes = view.memory_usage()
+        if memory_bytes > self._max_memory_bytes:
+            logging.debug(f"Database view of {memory_bytes} bytes exceeds cache memory budget")
+            return
+        with self._lock:
+            if key in self._views:
+                self._memory_bytes -= self._views.pop(key)[1]
+            self._views[key] = (view, memory_bytes)
+            self._memory_bytes += memory_bytes
+            while self._memory_bytes > self._max_memory_bytes:
+                _, (_, evicted_memory_bytes) = self._views.popitem(last=False)
+                self._memory_bytes -= evicted_memory_bytes
+
+    def clear(self) -> None:
+        with self._lock:
+            self._views.clear()
+            self._memory_bytes = 0
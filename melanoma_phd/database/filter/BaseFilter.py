@@ -1,8 +1,12 @@
 from abc import ABC, abstractmethod
-from typing import Any
+from typing import Any, Optional
 
 import pandas as pd
 
+from melanoma_phd.database.filter.FilterEstimate import FilterEstimate
+from melanoma_phd.database.filter.FilterMask import FilterMask
+from melanoma_phd.database.filter.FilterMaskContext import FilterMaskContext
+
 
 class BaseFilter(ABC):
     @property
@@ -13,3 +17,13 @@ class BaseFilter(ABC):
     @abstractmethod
     def filter(self, *args: Any, **kwargs: Any) -> pd.DataFrame:
         pass
+
+    def mask(self, context: FilterMaskContext, *args: Any, **kwargs: Any) -> FilterMask:
+        """Adapter for filters only implementing `filter`, applied to the context dataframe."""
+        return context.mask_from_dataframe(self.filter(context.materialize(), *args, **kwargs))
+
+    def estimate(
+        self, context: FilterMaskContext, *args: Any, **kwargs: Any
+    ) -> Optional[FilterEstimate]:
+        """Estimates the filter over the context, None if unknown so it is never reordered."""
+        return None
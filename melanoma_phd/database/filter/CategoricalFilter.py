@@ -1,8 +1,12 @@
-from typing import List
+from typing import Any, Dict, List, Optional
 
+import numpy as np
 import pandas as pd
 
 from melanoma_phd.database.filter.BaseFilter import BaseFilter
+from melanoma_phd.database.filter.FilterEstimate import FilterEstimate
+from melanoma_phd.database.filter.FilterMask import FilterMask
+from melanoma_phd.database.filter.FilterMaskContext import FilterMaskContext
 from melanoma_phd.database.variable.CategoricalVariable import CategoricalVariable
 
 
@@ -15,6 +19,10 @@ class CategoricalFilter(BaseFilter):
     def name(self) -> str:
         return self._variable.name
 
+    @property
+    def variable(self) -> CategoricalVariable:
+        return self._variable
+
     def filter(self, dataframe: pd.DataFrame, options: List[str]) -> pd.DataFrame:
         return (
             dataframe[
@@ -24,5 +32,51 @@ class CategoricalFilter(BaseFilter):
             else dataframe
         )
 
+    def mask(self, context: FilterMaskContext, options: List[str]) -> FilterMask:
+        if not options:
+            return context.full_mask()
+        values = self._variable.get_category_values(options)
+        bitmap_index = context.get_bitmap_index(self._variable.id)
+        if bitmap_index is not None:
+            return context.row_mask(bitmap_index.to_mask(bitmap_index.union(values)))
+        series = context.get_dataframe([self._variable.id])[self._variable.id]
+        return context.row_mask(series.isin(values).to_numpy())
+
+    def estimate(self, context: FilterMaskContext, options: List[str]) -> FilterEstimate:
+        if not options:
+            return FilterEstimate.empty()
+        bitmap_index = context.get_bitmap_index(self._variable.id)
+        if bitmap_index is not None:
+            values = self._variable.get_category_values(options)
+            return FilterEstimate(
+                cost=len(values) * context.size / 8,
+                selectivity=bitmap_index.count(bitmap_index.union(values)) / max(context.size, 1),
+                input_ids=[self._variable.id],
+            )
+        return FilterEstimate(cost=context.size, input_ids=[self._variable.id])
+
+    def selection(self, options: List[str]) -> Optional[Dict[str, List[Any]]]:
+        """Returns the raw values selected by `options` in the variable column."""
+        if not options:
+            return {}
+        return {self._variable.id: self._variable.get_category_values(options)}
+
+    def count_options(self, context: FilterMaskContext, rows: np.ndarray) -> Dict[str, int]:
+        """Returns the number of `rows` holding each option."""
+        bitmap_index = context.get_bitmap_index(self._variable.id)
+        if bitmap_index is not None:
+            rows_bitmap = bitmap_index.from_mask(rows)
+            return {
+                option: bitmap_index.count(
+                    bitmap_index.union(self._variable.get_category_values([option])) & rows_bitmap
+                )
+                for option in self.options()
+            }
+        series = context.get_dataframe([self._variable.id])[self._variable.id][rows]
+        return {
+            option: int(series.isin(self._variable.get_category_values([option])).sum())
+            for option in self.options()
+        }
+
     def options(self) -> List[str]:
         return self._variable.category_names
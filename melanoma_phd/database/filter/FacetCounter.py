@@ -0,0 +1,150 @@
+import logging
+import threading
+from typing import Any, Dict, List, Optional, Set
+
+import numpy as np
+import pandas as pd
+
+from melanoma_phd.database.filter.BaseFilter import BaseFilter
+from melanoma_phd.database.filter.CategoricalFilter import CategoricalFilter
+from melanoma_phd.database.filter.FilterMask import FilterMask
+from melanoma_phd.database.filter.FilterMaskCache import FilterMaskCache
+from melanoma_phd.database.filter.FilterMaskContext import FilterMaskContext
+from melanoma_phd.database.filter.PatientDataFilterer import PatientDataFilterer
+from melanoma_phd.database.index.DatabaseIndex import DatabaseIndex
+from melanoma_phd.database.variable.BaseVariable import BaseVariable
+
+
+class FacetCounter:
+    """Counts the rows holding each option of categorical filters given all the other filters, as
+    in faceted search.
+
+    The rows kept by each filter are evaluated on all rows, so the rows kept by the other filters
+    are the intersection of their masks. Masks of filters not masking cells nor reading masked
+    values are cached by their `save_to_dict` selection, so a selection change only evaluates the
+    changed filter and the options are counted over the bitmap indexes. When the other filters
+    are categorical selections over the count cube dimensions, options are counted from the cube.
+    """
+
+    def __init__(self) -> None:
+        self._dataframe: Optional[pd.DataFrame] = None
+        self._rows: FilterMaskCache[np.ndarray] = FilterMaskCache()
+        self._lock = threading.Lock()
+
+    def clear(self) -> None:
+        self._dataframe = None
+        self._rows.clear()
+
+    def count(
+        self,
+        dataframe: pd.DataFrame,
+        filters: List[BaseFilter],
+        facets: Dict[int, CategoricalFilter],
+        variables: Optional[List[BaseVariable]] = None,
+        index: Optional[DatabaseIndex] = None,
+    ) -> Dict[int, Dict[str, int]]:
+        """Returns the option counts of the `facets` categorical filters, by their index in
+        `filters`. Facets of filters masking cells are not counted.
+        """
+        with self._lock:
+            if self._dataframe is not dataframe:
+                self.clear()
+                self._dataframe = dataframe
+            filterer = PatientDataFilterer()
+            context = FilterMaskContext(dataframe=dataframe, variables=variables, index=index)
+            counts = self.__count_from_cube(context, filters, facets, index)
+            facets = {
+                facet_index: facet
+                for facet_index, facet in facets.items()
+                if facet_index not in counts
+            }
+            if not facets:
+                return counts
+            estimates = [filterer.estimate(context, filter) for filter in filters]
+            order = filterer.order_indexes(estimates)
+            cacheable_indexes = filterer.cacheable_indexes(filters, estimates, order)
+
+            rows: Dict[int, np.ndarray] = {}
+            row_only_indexes: Set[int] = set()
+            for filter_index in order:
+                estimate = estimates[filter_index]
+                if filter_index in cacheable_indexes:
+                    rows[filter_index] = self.__get_cached_rows(
+                        context, filter_index, filters[filter_index]
+                    )
+                    row_only_indexes.add(filter_index)
+                    continue
+                mask = filterer.mask_filter(context, filters[filter_index])
+                rows[filter_index] = mask.rows
+                context.apply(
+                    FilterMask(
+                        rows=np.ones(context.size, dtype=bool),
+                        cells=mask.cells,
+                        variables=mask.variables,
+                    )
+                )
+                if estimate is not None and not estimate.output_ids:
+                    row_only_indexes.add(filter_index)
+
+            base_context = FilterMaskContext(dataframe=dataframe, variables=variables, index=index)
+            for facet_index, facet in facets.items():
+                if facet_index not in row_only_indexes:
+                    continue
+                other_rows = np.ones(context.size, dtype=bool)
+                for filter_index, filter_rows in rows.items():
+                    if filter_index != facet_index:
+                        other_rows &= filter_rows
+                counts[facet_index] = facet.count_options(base_context, other_rows)
+            return counts
+
+    def __count_from_cube(
+        self,
+        context: FilterMaskContext,
+        filters: List[BaseFilter],
+        facets: Dict[int, CategoricalFilter],
+        index: Optional[DatabaseIndex],
+    ) -> Dict[int, Dict[str, int]]:
+        """Counts the facets of cube dimensions whose other filters are all cube selections."""
+        if index is None or index.dataframe is not context.dataframe or index.count_cube is None:
+            return {}
+        count_cube = index.count_cube
+        filterer = PatientDataFilterer()
+        counts: Dict[int, Dict[str, int]] = {}
+        for facet_index, facet in facets.items():
+            if not count_cube.has_dimensions([facet.variable.id]):
+                continue
+            selection = filterer.selection(
+                context,
+                [
+                    filter
+                    for filter_index, filter in enumerate(filters)
+                    if filter_index != facet_index
+                ],
+            )
+            if selection is None or not count_cube.has_dimensions(list(selection.keys())):
+                continue
+            option_counts: Dict[str, int] = {}
+            for option in facet.options():
+                option_selection = dict(selection)
+                option_selection.update(facet.selection([option]))
+                if facet.variable.id in selection:
+                    option_selection[facet.variable.id] = [
+                        value
+                        for value in option_selection[facet.variable.id]
+                        if value in selection[facet.variable.id]
+                    ]
+                option_counts[option] = count_cube.count(option_selection)
+            counts[facet_index] = option_counts
+        return counts
+
+    def __get_cached_rows(
+        self, context: FilterMaskContext, filter_index: int, filter: Any
+    ) -> np.ndarray:
+        _, selection_key = FilterMaskCache.get_selection(filter)
+        rows = self._rows.get(filter_index, selection_key)
+        if rows is not None:
+            return rows
+        logging.debug(f"Evaluating facet filter {filter_index} on all rows")
+        rows = PatientDataFilterer().mask_filter(context, filter).rows
+        self._rows.put(filter_index, selection_key, rows)
+        return rows
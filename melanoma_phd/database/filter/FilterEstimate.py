@@ -0,0 +1,47 @@
+import math
+from dataclasses import dataclass, field
+from typing import List
+
+
+@dataclass
+class FilterEstimate:
+    """Estimated `cost`, in evaluated values, and `selectivity`, as the fraction of kept rows, of a
+    filter. `input_ids` are the columns read by the filter and `output_ids` the columns it masks or
+    recomputes, which constrain the filters it can be reordered with.
+    """
+
+    DEFAULT_SELECTIVITY = 0.5
+
+    cost: float
+    selectivity: float = DEFAULT_SELECTIVITY
+    input_ids: List[str] = field(default_factory=list)
+    output_ids: List[str] = field(default_factory=list)
+
+    @classmethod
+    def empty(cls) -> "FilterEstimate":
+        return cls(cost=0.0, selectivity=1.0)
+
+    @property
+    def is_empty(self) -> bool:
+        """Whether the filter keeps all rows without reading any column."""
+        return (
+            self.cost == 0.0
+            and self.selectivity >= 1.0
+            and not self.input_ids
+            and not self.output_ids
+        )
+
+    @property
+    def rank(self) -> float:
+        """Ordering key: filters removing more rows per evaluated value go first."""
+        if self.selectivity >= 1.0:
+            return math.inf
+        return self.cost / (1.0 - max(self.selectivity, 0.0))
+
+    def depends_on(self, other: "FilterEstimate") -> bool:
+        """Whether the result of either filter changes when applied after the other one."""
+        return bool(
+            set(self.input_ids).intersection(other.output_ids)
+            or set(self.output_ids).intersection(other.input_ids)
+            or set(self.output_ids).intersection(other.output_ids)
+        )
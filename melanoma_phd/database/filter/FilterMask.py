@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+from melanoma_phd.database.variable.BaseIterationScalarVariable import BaseIterationScalarVariable
+from melanoma_phd.database.variable.BaseVariable import BaseVariable
+
+
+@dataclass
+class FilterMask:
+    """Result of a filter over the rows of a base dataframe.
+
+    `rows` keeps the selected rows, `cells` removes single values of iteration columns (False values
+    become null) and `variables` lists the dynamic variables to recompute from the masked cells.
+    """
+
+    rows: np.ndarray
+    cells: Dict[str, np.ndarray] = field(default_factory=dict)
+    variables: List[BaseVariable] = field(default_factory=list)
+
+    @classmethod
+    def full(cls, size: int) -> FilterMask:
+        return cls(rows=np.ones(size, dtype=bool))
+
+    @property
+    def is_full(self) -> bool:
+        return not self.cells and not self.variables and bool(self.rows.all())
+
+    def materialize(self, dataframe: pd.DataFrame) -> pd.DataFrame:
+        """Returns a copy of the rows of `dataframe` kept by this mask, with removed cells and
+        recomputed variables.
+        """
+        filtered_dataframe = dataframe.iloc[np.flatnonzero(self.rows)]
+        if self.cells or self.variables:
+            filtered_dataframe = filtered_dataframe.copy()
+        if self.cells:
+            column_ids = list(self.cells.keys())
+            cell_masks = np.column_stack(
+                [self.cells[column_id][self.rows] for column_id in column_ids]
+            )
+            filtered_dataframe[column_ids] = filtered_dataframe[column_ids].where(cell_masks)
+        for variable_id, series in self.recompute(filtered_dataframe, self.variables).items():
+            filtered_dataframe[variable_id] = series
+        return filtered_dataframe
+
+    @staticmethod
+    def recompute(dataframe: pd.DataFrame, variables: List[BaseVariable]) -> Dict[str, pd.Series]:
+        """Returns the series of `variables` computed from `dataframe`, batching the means of the
+        iteration scalar variables.
+        """
+        batch_variables = [
+            variable
+            for variable in variables
+            if isinstance(variable, BaseIterationScalarVariable)
+            and type(variable).get_series is BaseIterationScalarVariable.get_series
+        ]
+        batch_series = BaseIterationScalarVariable.get_batch_series(batch_variables, dataframe)
+        return {
+            variable.id: (
+                batch_series[variable.id]
+                if variable.id in batch_series
+                else variable.get_series(dataframe=dataframe)
+            )
+            for variable in variables
+        }
+
+    def __and__(self, other: FilterMask) -> FilterMask:
+        if len(self.rows) != len(other.rows):
+            raise ValueError(
+                f"Filter masks with different sizes {len(self.rows)} and {len(other.rows)}"
+            )
+        cells = dict(self.cells)
+        for column_id, cell_mask in other.cells.items():
+            cells[column_id] = cells[column_id] & cell_mask if column_id in cells else cell_mask
+        variables = list(self.variables)
+        variable_ids = {variable.id for variable in variables}
+        variables.extend(
+            variable for variable in other.variables if variable.id not in variable_ids
+        )
+        return FilterMask(rows=self.rows & other.rows, cells=cells, variables=variables)
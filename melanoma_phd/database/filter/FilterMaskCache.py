@@ -0,0 +1,35 @@
+import json
+from collections import OrderedDict
+from typing import Any, Dict, Generic, Optional, Tuple, TypeVar
+
+CachedMask = TypeVar("CachedMask")
+
+
+class FilterMaskCache(Generic[CachedMask]):
+    """Least recently used masks of filters, keyed by filter index and `save_to_dict` selection."""
+
+    MAX_CACHED_MASKS = 256
+
+    def __init__(self) -> None:
+        self._masks: OrderedDict[Tuple[int, str], CachedMask] = OrderedDict()
+
+    def clear(self) -> None:
+        self._masks.clear()
+
+    def get(self, filter_index: int, selection_key: str) -> Optional[CachedMask]:
+        mask = self._masks.get((filter_index, selection_key))
+        if mask is not None:
+            self._masks.move_to_end((filter_index, selection_key))
+        return mask
+
+    def put(self, filter_index: int, selection_key: str, mask: CachedMask) -> None:
+        self._masks[(filter_index, selection_key)] = mask
+        while len(self._masks) > self.MAX_CACHED_MASKS:
+            self._masks.popitem(last=False)
+
+    @staticmethod
+    def get_selection(filter: Any) -> Tuple[Dict[str, Any], str]:
+        """Selection of a filter, read with `save_to_dict`, and its cache key."""
+        selection: Dict[str, Any] = {}
+        filter.save_to_dict(selection)
+        return selection, json.dumps(selection, sort_keys=True, default=str)
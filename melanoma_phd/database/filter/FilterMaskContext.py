@@ -0,0 +1,181 @@
+import logging
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+
+from melanoma_phd.database.filter.FilterMask import FilterMask
+from melanoma_phd.database.index.BitmapIndex import BitmapIndex
+from melanoma_phd.database.index.DatabaseIndex import DatabaseIndex
+from melanoma_phd.database.index.SortedColumnIndex import SortedColumnIndex
+from melanoma_phd.database.variable.BaseVariable import BaseVariable
+
+
+class FilterMaskContext:
+    """Accumulates filter masks over a base dataframe, which is only sliced once on `materialize`.
+
+    Filters read their input columns through `get_dataframe`, so they see the cells removed and the
+    variables recomputed by the masks applied before them, as with sequential dataframe filtering.
+    """
+
+    def __init__(
+        self,
+        dataframe: pd.DataFrame,
+        variables: Optional[List[BaseVariable]] = None,
+        index: Optional[DatabaseIndex] = None,
+    ) -> None:
+        self._dataframe = dataframe
+        self._variables = variables if variables else []
+        self._index = index if index is not None and index.dataframe is dataframe else None
+        self._mask = FilterMask.full(len(dataframe.index))
+
+    @property
+    def dataframe(self) -> pd.DataFrame:
+        return self._dataframe
+
+    @property
+    def mask(self) -> FilterMask:
+        return self._mask
+
+    @property
+    def rows(self) -> np.ndarray:
+        return self._mask.rows
+
+    @property
+    def size(self) -> int:
+        return len(self._dataframe.index)
+
+    @property
+    def candidates(self) -> Optional[np.ndarray]:
+        """Positions of the rows kept so far, or None if all rows are kept."""
+        return None if self._mask.rows.all() else np.flatnonzero(self._mask.rows)
+
+    def expand(
+        self, values: np.ndarray, positions: Optional[np.ndarray], fill_value: bool
+    ) -> np.ndarray:
+        """Expands `values` evaluated at the rows `positions` to all base rows."""
+        if positions is None:
+            return values
+        expanded_values = np.full(len(self._dataframe.index), fill_value, dtype=bool)
+        expanded_values[positions] = values
+        return expanded_values
+
+    def full_mask(self) -> FilterMask:
+        return FilterMask.full(len(self._dataframe.index))
+
+    def row_mask(self, rows: np.ndarray) -> FilterMask:
+        return FilterMask(rows=np.asarray(rows, dtype=bool))
+
+    def apply(self, mask: FilterMask) -> None:
+        self._mask = self._mask & mask
+
+    def get_bitmap_index(self, column_id: str) -> Optional[BitmapIndex]:
+        """Returns the bitmap index of `column_id` column if its values are not masked."""
+        if self._index is None or not self.__is_unmasked(column_id):
+            return None
+        return self._index.get_bitmap_index(column_id)
+
+    def get_non_null_count(self, column_id: str) -> Optional[int]:
+        """Returns the number of non null values of `column_id` column if they are not masked."""
+        if self._index is None or not self.__is_unmasked(column_id):
+            return None
+        return self._index.get_non_null_count(column_id)
+
+    def get_sorted_index(self, column_ids: List[str]) -> Optional[SortedColumnIndex]:
+        """Returns the sorted index of `column_ids` columns if their values are not masked."""
+        if self._index is None or not all(
+            self.__is_unmasked(column_id) for column_id in column_ids
+        ):
+            return None
+        return self._index.get_sorted_index(column_ids)
+
+    def get_dataframe(
+        self, column_ids: Optional[List[str]] = None, positions: Optional[np.ndarray] = None
+    ) -> pd.DataFrame:
+        """Returns all base rows, or the rows at `positions`, of `column_ids` columns with the
+        accumulated cell masks applied.
+        """
+        dataframe = self._dataframe if column_ids is None else self._dataframe[column_ids]
+        if positions is not None:
+            dataframe = dataframe.iloc[positions]
+        masked_columns = [column_id for column_id in self._mask.cells if column_id in dataframe]
+        recomputed_variables = [
+            variable for variable in self._mask.variables if variable.id in dataframe
+        ]
+        if not masked_columns and not recomputed_variables:
+            return dataframe
+        dataframe = dataframe.copy()
+        if masked_columns:
+            cell_masks = np.column_stack(
+                [
+                    (
+                        self._mask.cells[column_id]
+                        if positions is None
+                        else self._mask.cells[column_id][positions]
+                    )
+                    for column_id in masked_columns
+                ]
+            )
+            dataframe[masked_columns] = dataframe[masked_columns].where(cell_masks)
+        if recomputed_variables:
+            source_dataframe = (
+                dataframe
+                if column_ids is None
+                else self.get_dataframe(column_ids=None, positions=positions)
+            )
+            for variable_id, series in FilterMask.recompute(
+                source_dataframe, recomputed_variables
+            ).items():
+                dataframe[variable_id] = series
+        return dataframe
+
+    def materialize(self) -> pd.DataFrame:
+        return self._mask.materialize(self._dataframe)
+
+    def mask_from_dataframe(self, dataframe: pd.DataFrame) -> FilterMask:
+        """Adapts the dataframe returned by a filter applied to `materialize()` result to a mask.
+
+        Removed rows and removed values are masked. Other changed columns are recomputed when they
+        belong to a known variable.
+        """
+        positions = self._dataframe.index.get_indexer(dataframe.index)
+        if (positions < 0).any():
+            raise ValueError("Filtered dataframe contains rows not present in the base dataframe")
+        rows = np.zeros(len(self._dataframe.index), dtype=bool)
+        rows[positions] = True
+        mask = FilterMask(rows=rows)
+
+        current_dataframe = self.get_dataframe().iloc[positions]
+        for column_id in dataframe.columns.intersection(current_dataframe.columns):
+            current_series = current_dataframe[column_id]
+            filtered_series = dataframe[column_id]
+            removed_cells = current_series.notna().to_numpy() & filtered_series.isna().to_numpy()
+            if removed_cells.any():
+                cell_mask = np.ones(len(self._dataframe.index), dtype=bool)
+                cell_mask[positions[removed_cells]] = False
+                mask.cells[column_id] = cell_mask
+            current_values = current_series[~removed_cells]
+            filtered_values = filtered_series[~removed_cells]
+            equal_values = (current_values == filtered_values) | (
+                current_values.isna() & filtered_values.isna()
+            )
+            if not equal_values.all():
+                variable = self.__get_variable(column_id)
+                if variable is not None:
+                    mask.variables.append(variable)
+                else:
+                    logging.warning(
+                        f"Ignoring changed values of '{column_id}' column since it has no variable"
+                    )
+        return mask
+
+    def __is_unmasked(self, column_id: str) -> bool:
+        return column_id not in self._mask.cells and all(
+            variable.id != column_id for variable in self._mask.variables
+        )
+
+    def __get_variable(self, variable_id: str) -> Optional[BaseVariable]:
+        for variable in self._variables:
+            if variable.id == variable_id:
+                return variable
+        return None
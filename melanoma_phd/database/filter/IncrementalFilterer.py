@@ -0,0 +1,130 @@
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from melanoma_phd.database.filter.BaseFilter import BaseFilter
+from melanoma_phd.database.filter.FilterMask import FilterMask
+from melanoma_phd.database.filter.FilterMaskCache import FilterMaskCache
+from melanoma_phd.database.filter.FilterMaskContext import FilterMaskContext
+from melanoma_phd.database.filter.PatientDataFilterer import PatientDataFilterer
+from melanoma_phd.database.index.DatabaseIndex import DatabaseIndex
+from melanoma_phd.database.variable.BaseVariable import BaseVariable
+
+
+@dataclass
+class CachedFilterMask:
+    """Rows kept by a filter selection, only known at the `evaluated` rows."""
+
+    selection: Dict[str, Any]
+    rows: np.ndarray
+    evaluated: np.ndarray
+
+
+class IncrementalFilterer:
+    """Filters a dataframe reusing the row masks of the previous evaluations, so changing a filter
+    only evaluates that filter on the rows not discarded by the other ones. Tightened selections,
+    those whose selected option lists are subsets of the previous ones, are only evaluated on the
+    rows the previous selection kept.
+
+    Filter selections are read with `save_to_dict`. Filters without it, filters masking cells or
+    recomputing variables and filters reading values masked by previous filters are evaluated
+    every time.
+    """
+
+    def __init__(self) -> None:
+        self._dataframe: Optional[pd.DataFrame] = None
+        self._masks: FilterMaskCache[CachedFilterMask] = FilterMaskCache()
+        self._selection_keys: Dict[int, str] = {}
+        self._lock = threading.Lock()
+
+    def clear(self) -> None:
+        self._dataframe = None
+        self._masks.clear()
+        self._selection_keys.clear()
+
+    def mask(
+        self,
+        dataframe: pd.DataFrame,
+        filters: List[BaseFilter],
+        variables: Optional[List[BaseVariable]] = None,
+        index: Optional[DatabaseIndex] = None,
+    ) -> FilterMask:
+        with self._lock:
+            if self._dataframe is not dataframe:
+                self.clear()
+                self._dataframe = dataframe
+            filterer = PatientDataFilterer()
+            context = FilterMaskContext(dataframe=dataframe, variables=variables, index=index)
+            estimates = [filterer.estimate(context, filter) for filter in filters]
+            order = filterer.order_indexes(estimates)
+
+            cacheable_indexes = filterer.cacheable_indexes(filters, estimates, order)
+            cached_masks: Dict[int, CachedFilterMask] = {
+                filter_index: self.__get_cached_mask(
+                    filter_index, filters[filter_index], size=context.size
+                )
+                for filter_index in order
+                if filter_index in cacheable_indexes
+            }
+
+            for filter_index, cached_mask in cached_masks.items():
+                required = np.ones(context.size, dtype=bool)
+                for other_index, other_cached_mask in cached_masks.items():
+                    if other_index != filter_index:
+                        required &= other_cached_mask.rows | ~other_cached_mask.evaluated
+                missing = required & ~cached_mask.evaluated
+                if missing.any():
+                    logging.debug(f"Evaluating filter {filter_index} on {missing.sum()} rows")
+                    evaluation_context = FilterMaskContext(
+                        dataframe=dataframe, variables=variables, index=index
+                    )
+                    evaluation_context.apply(evaluation_context.row_mask(missing))
+                    rows = filterer.mask_filter(evaluation_context, filters[filter_index]).rows
+                    cached_mask.rows = np.where(missing, rows, cached_mask.rows)
+                    cached_mask.evaluated = cached_mask.evaluated | missing
+
+            rows = np.ones(context.size, dtype=bool)
+            for cached_mask in cached_masks.values():
+                rows &= cached_mask.rows
+            context.apply(context.row_mask(rows))
+            for filter_index in order:
+                if filter_index not in cached_masks:
+                    context.apply(filterer.mask_filter(context, filters[filter_index]))
+            return context.mask
+
+    def __get_cached_mask(self, filter_index: int, filter: Any, size: int) -> CachedFilterMask:
+        selection, selection_key = FilterMaskCache.get_selection(filter)
+        cached_mask = self._masks.get(filter_index, selection_key)
+        if cached_mask is None:
+            previous_cached_mask = self._masks.get(
+                filter_index, self._selection_keys.get(filter_index, "")
+            )
+            if previous_cached_mask is not None and self.__is_tightening(
+                selection, previous_cached_mask.selection
+            ):
+                evaluated = previous_cached_mask.evaluated & ~previous_cached_mask.rows
+            else:
+                evaluated = np.zeros(size, dtype=bool)
+            cached_mask = CachedFilterMask(
+                selection=selection, rows=np.zeros(size, dtype=bool), evaluated=evaluated
+            )
+            self._masks.put(filter_index, selection_key, cached_mask)
+        self._selection_keys[filter_index] = selection_key
+        return cached_mask
+
+    @staticmethod
+    def __is_tightening(selection: Dict[str, Any], previous_selection: Dict[str, Any]) -> bool:
+        if selection.keys() != previous_selection.keys():
+            return False
+        for key, value in selection.items():
+            previous_value = previous_selection[key]
+            if isinstance(value, list) and isinstance(previous_value, list):
+                if not previous_value or not value or not set(value).issubset(previous_value):
+                    return False
+            elif value != previous_value:
+                return False
+        return True
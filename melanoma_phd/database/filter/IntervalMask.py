@@ -0,0 +1,45 @@
+from typing import List
+
+import numpy as np
+import pandas as pd
+
+
+class IntervalMask:
+    """Vectorized membership of values in a list of intervals, respecting each interval closed
+    side. Null values are never contained in any interval, as with `value in interval`.
+    """
+
+    def __init__(self, intervals: List[pd.Interval]) -> None:
+        self._intervals = intervals
+        self._lefts = np.array([interval.left for interval in intervals], dtype=float)
+        self._rights = np.array([interval.right for interval in intervals], dtype=float)
+        self._closed_left = np.array([interval.closed_left for interval in intervals], dtype=bool)
+        self._closed_right = np.array([interval.closed_right for interval in intervals], dtype=bool)
+
+    @property
+    def intervals(self) -> List[pd.Interval]:
+        return self._intervals
+
+    def masks(self, values: np.ndarray) -> np.ndarray:
+        """Returns a boolean array with `values` shape plus a trailing axis with one mask per
+        interval.
+        """
+        values = self.__to_float(values)[..., np.newaxis]
+        lower = np.where(self._closed_left, values >= self._lefts, values > self._lefts)
+        upper = np.where(self._closed_right, values <= self._rights, values < self._rights)
+        return lower & upper
+
+    def any(self, values: np.ndarray) -> np.ndarray:
+        return self.masks(values).any(axis=-1)
+
+    def series(self, series: pd.Series) -> pd.Series:
+        return pd.Series(self.any(series.to_numpy()), index=series.index, name=series.name)
+
+    @staticmethod
+    def __to_float(values: np.ndarray) -> np.ndarray:
+        if isinstance(values, (pd.Series, pd.DataFrame)):
+            return values.to_numpy(dtype=float, na_value=np.nan)
+        values = np.asarray(values)
+        if values.dtype == object:
+            return np.where(pd.isna(values), np.nan, values).astype(float)
+        return values.astype(float, copy=False)
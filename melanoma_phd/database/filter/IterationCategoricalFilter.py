@@ -1,8 +1,12 @@
-from typing import List
+from typing import Any, Dict, List, Optional
 
 import pandas as pd
 
 from melanoma_phd.database.filter.CategoricalFilter import CategoricalFilter
+from melanoma_phd.database.filter.FilterEstimate import FilterEstimate
+from melanoma_phd.database.filter.FilterMask import FilterMask
+from melanoma_phd.database.filter.FilterMaskContext import FilterMaskContext
+from melanoma_phd.database.index.BitmapIndex import BitmapIndex
 from melanoma_phd.database.variable.IterationCategoricalVariable import IterationCategoricalVariable
 
 
@@ -22,18 +26,56 @@ class IterationCategoricalFilter(CategoricalFilter):
     def name(self) -> str:
         return self._name
 
+    def selection(self, options: List[str]) -> Optional[Dict[str, List[Any]]]:
+        return {} if not options else None
+
     def filter(self, dataframe: pd.DataFrame, options: List[str]) -> pd.DataFrame:
         if not options:
             return dataframe
+        context = FilterMaskContext(dataframe=dataframe)
+        return self.mask(context, options).materialize(dataframe)
+
+    def mask(self, context: FilterMaskContext, options: List[str]) -> FilterMask:
+        if not options:
+            return context.full_mask()
 
+        positions = context.candidates
         filter_dataframe = self._reference_variable.get_filter_dataframe(
-            dataframe=dataframe, category_options=options
+            dataframe=context.get_dataframe(
+                self._reference_variable.iterated_variable_ids, positions=positions
+            ),
+            category_options=options,
         )
-        mask_series = filter_dataframe.any(skipna=True, axis=1)
-        dataframe = dataframe.loc[mask_series]
-        filter_dataframe = filter_dataframe.loc[mask_series]
+        rows = filter_dataframe.any(skipna=True, axis=1).to_numpy()
+        mask = context.row_mask(context.expand(rows, positions, fill_value=False))
         for iteration_variable in self._iteration_variables:
-            dataframe = iteration_variable.filter(
-                dataframe=dataframe, filter_dataframe=filter_dataframe
+            for column_id, cells in iteration_variable.get_filter_cells(filter_dataframe).items():
+                mask.cells[column_id] = context.expand(cells, positions, fill_value=True)
+            mask.variables.append(iteration_variable)
+        return mask
+
+    def estimate(self, context: FilterMaskContext, options: List[str]) -> FilterEstimate:
+        if not options:
+            return FilterEstimate.empty()
+        iterated_variable_ids = self._reference_variable.iterated_variable_ids
+        output_ids = [
+            variable_id
+            for iteration_variable in self._iteration_variables
+            for variable_id in iteration_variable.iterated_variable_ids + [iteration_variable.id]
+        ]
+        cost = context.size * (len(iterated_variable_ids) + len(output_ids))
+        bitmap_indexes = [
+            context.get_bitmap_index(variable_id) for variable_id in iterated_variable_ids
+        ]
+        if bitmap_indexes and all(bitmap_index is not None for bitmap_index in bitmap_indexes):
+            values = self._reference_variable.get_category_values(options)
+            bitmap = bitmap_indexes[0].empty()
+            for bitmap_index in bitmap_indexes:
+                bitmap = bitmap | bitmap_index.union(values)
+            return FilterEstimate(
+                cost=cost,
+                selectivity=BitmapIndex.count(bitmap) / max(context.size, 1),
+                input_ids=iterated_variable_ids,
+                output_ids=output_ids,
             )
-        return dataframe
+        return FilterEstimate(cost=cost, input_ids=iterated_variable_ids, output_ids=output_ids)
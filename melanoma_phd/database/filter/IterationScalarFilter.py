@@ -3,6 +3,9 @@ from typing import List
 import pandas as pd
 
 from melanoma_phd.database.filter.BaseFilter import BaseFilter
+from melanoma_phd.database.filter.FilterEstimate import FilterEstimate
+from melanoma_phd.database.filter.FilterMask import FilterMask
+from melanoma_phd.database.filter.FilterMaskContext import FilterMaskContext
 from melanoma_phd.database.variable.IterationScalarVariable import IterationScalarVariable
 from melanoma_phd.database.variable.ReferenceIterationVariable import ReferenceIterationVariable
 
@@ -27,14 +30,53 @@ class IterationScalarFilter(BaseFilter):
         return self._reference_variable.interval
 
     def filter(self, dataframe: pd.DataFrame, intervals: List[pd.Interval]) -> pd.DataFrame:
-        filter_dataframe = self._reference_variable.get_filter_dataframe(
-            dataframe=dataframe, intervals=intervals
-        )
-        mask_series = filter_dataframe.any(skipna=True, axis=1)
-        dataframe = dataframe.loc[mask_series]
-        filter_dataframe = filter_dataframe.loc[mask_series]
+        context = FilterMaskContext(dataframe=dataframe)
+        return self.mask(context, intervals).materialize(dataframe)
+
+    def mask(self, context: FilterMaskContext, intervals: List[pd.Interval]) -> FilterMask:
+        iterated_variable_ids = self._reference_variable.iterated_variable_ids
+        sorted_index = context.get_sorted_index(iterated_variable_ids)
+        if sorted_index is not None:
+            if not intervals:
+                raise ValueError(f"No intervals to filter '{self._reference_variable.id}'")
+            positions = None
+            filter_dataframe = self._reference_variable.create_filter_dataframe(
+                index=context.dataframe.index,
+                interval_masks=sorted_index.interval_masks(intervals),
+            )
+        else:
+            positions = context.candidates
+            filter_dataframe = self._reference_variable.get_filter_dataframe(
+                dataframe=context.get_dataframe(iterated_variable_ids, positions=positions),
+                intervals=intervals,
+            )
+        rows = filter_dataframe.any(skipna=True, axis=1).to_numpy()
+        mask = context.row_mask(context.expand(rows, positions, fill_value=False))
         for iteration_variable in self._iteration_variables:
-            dataframe = iteration_variable.filter(
-                dataframe=dataframe, filter_dataframe=filter_dataframe
+            for column_id, cells in iteration_variable.get_filter_cells(filter_dataframe).items():
+                mask.cells[column_id] = context.expand(cells, positions, fill_value=True)
+            mask.variables.append(iteration_variable)
+        return mask
+
+    def estimate(self, context: FilterMaskContext, intervals: List[pd.Interval]) -> FilterEstimate:
+        iterated_variable_ids = self._reference_variable.iterated_variable_ids
+        output_ids = [
+            variable_id
+            for iteration_variable in self._iteration_variables
+            for variable_id in iteration_variable.iterated_variable_ids + [iteration_variable.id]
+        ]
+        cost = context.size * len(output_ids)
+        sorted_index = context.get_sorted_index(iterated_variable_ids)
+        if sorted_index is not None:
+            count = sorted_index.count(intervals)
+            return FilterEstimate(
+                cost=cost + count,
+                selectivity=min(count / max(context.size, 1), 1.0),
+                input_ids=iterated_variable_ids,
+                output_ids=output_ids,
             )
-        return dataframe
+        return FilterEstimate(
+            cost=cost + context.size * len(iterated_variable_ids) * len(intervals),
+            input_ids=iterated_variable_ids,
+            output_ids=output_ids,
+        )
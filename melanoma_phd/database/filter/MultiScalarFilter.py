@@ -1,10 +1,14 @@
-import functools
+import math
 from typing import List
 
 import numpy as np
 import pandas as pd
 
 from melanoma_phd.database.filter.BaseFilter import BaseFilter
+from melanoma_phd.database.filter.FilterEstimate import FilterEstimate
+from melanoma_phd.database.filter.FilterMask import FilterMask
+from melanoma_phd.database.filter.FilterMaskContext import FilterMaskContext
+from melanoma_phd.database.filter.IntervalMask import IntervalMask
 from melanoma_phd.database.variable.ScalarVariable import ScalarVariable
 
 
@@ -21,14 +25,36 @@ class MultiScalarFilter(BaseFilter):
     def filter(self, dataframe: pd.DataFrame, intervals: List[pd.Interval]) -> pd.DataFrame:
         if not intervals:
             return dataframe
-        series_list = [
-            dataframe[variable.id].map(
-                lambda value: any([value in interval for interval in intervals])
+        values = dataframe[[variable.id for variable in self._variables]].to_numpy()
+        mask = IntervalMask(intervals).any(values).any(axis=1)
+        return dataframe[mask]
+
+    def mask(self, context: FilterMaskContext, intervals: List[pd.Interval]) -> FilterMask:
+        if not intervals:
+            return context.full_mask()
+        rows = np.zeros(len(context.dataframe.index), dtype=bool)
+        for variable in self._variables:
+            sorted_index = context.get_sorted_index([variable.id])
+            if sorted_index is not None:
+                rows |= sorted_index.mask(intervals)
+            else:
+                series = context.get_dataframe([variable.id])[variable.id]
+                rows |= IntervalMask(intervals).any(series.to_numpy())
+        return context.row_mask(rows)
+
+    def estimate(self, context: FilterMaskContext, intervals: List[pd.Interval]) -> FilterEstimate:
+        if not intervals:
+            return FilterEstimate.empty()
+        input_ids = [variable.id for variable in self._variables]
+        sorted_indexes = [context.get_sorted_index([variable_id]) for variable_id in input_ids]
+        if all(sorted_index is not None for sorted_index in sorted_indexes):
+            count = sum(sorted_index.count(intervals) for sorted_index in sorted_indexes)
+            return FilterEstimate(
+                cost=2 * len(intervals) * len(input_ids) * math.log2(max(context.size, 2)) + count,
+                selectivity=min(count / max(context.size, 1), 1.0),
+                input_ids=input_ids,
             )
-            for variable in self._variables
-        ]
-        series = functools.reduce(np.logical_or, series_list)
-        return dataframe[series]
+        return FilterEstimate(cost=context.size * len(input_ids), input_ids=input_ids)
 
     def interval(self) -> pd.Interval:
         left_interval = [
@@ -1,6 +1,9 @@
 import pandas as pd
 
 from melanoma_phd.database.filter.BaseFilter import BaseFilter
+from melanoma_phd.database.filter.FilterEstimate import FilterEstimate
+from melanoma_phd.database.filter.FilterMask import FilterMask
+from melanoma_phd.database.filter.FilterMaskContext import FilterMaskContext
 from melanoma_phd.database.variable.BaseVariable import BaseVariable
 
 
@@ -15,3 +18,17 @@ class NotEmptyVariableFilter(BaseFilter):
 
     def filter(self, dataframe: pd.DataFrame) -> pd.DataFrame:
         return dataframe[~dataframe[self._variable.id].isna()]
+
+    def mask(self, context: FilterMaskContext) -> FilterMask:
+        series = context.get_dataframe([self._variable.id])[self._variable.id]
+        return context.row_mask(series.notna().to_numpy())
+
+    def estimate(self, context: FilterMaskContext) -> FilterEstimate:
+        non_null_count = context.get_non_null_count(self._variable.id)
+        if non_null_count is not None:
+            return FilterEstimate(
+                cost=context.size,
+                selectivity=non_null_count / max(context.size, 1),
+                input_ids=[self._variable.id],
+            )
+        return FilterEstimate(cost=context.size, input_ids=[self._variable.id])
@@ -1,15 +1,139 @@
-from typing import List
+import logging
+import math
+from typing import Any, Dict, List, Optional, Set
 
 import pandas as pd
 
 from melanoma_phd.database.filter.BaseFilter import BaseFilter
+from melanoma_phd.database.filter.FilterEstimate import FilterEstimate
+from melanoma_phd.database.filter.FilterMask import FilterMask
+from melanoma_phd.database.filter.FilterMaskContext import FilterMaskContext
+from melanoma_phd.database.index.DatabaseIndex import DatabaseIndex
+from melanoma_phd.database.variable.BaseVariable import BaseVariable
 
 
 class PatientDataFilterer:
     def __init__(self) -> None:
         pass
 
-    def filter(self, dataframe: pd.DataFrame, filters: List[BaseFilter]) -> pd.DataFrame:
+    def filter(
+        self,
+        dataframe: pd.DataFrame,
+        filters: List[BaseFilter],
+        variables: Optional[List[BaseVariable]] = None,
+        index: Optional[DatabaseIndex] = None,
+    ) -> pd.DataFrame:
+        return self.mask(dataframe, filters, variables, index).materialize(dataframe)
+
+    def mask(
+        self,
+        dataframe: pd.DataFrame,
+        filters: List[BaseFilter],
+        variables: Optional[List[BaseVariable]] = None,
+        index: Optional[DatabaseIndex] = None,
+    ) -> FilterMask:
+        context = FilterMaskContext(dataframe=dataframe, variables=variables, index=index)
+        for filter in self.order(context, filters):
+            context.apply(self.mask_filter(context, filter))
+        return context.mask
+
+    def order(self, context: FilterMaskContext, filters: List[BaseFilter]) -> List[BaseFilter]:
+        """Orders `filters` to apply first the cheap and selective ones, keeping the relative order
+        of the filters depending on each other so the result is the same as in list order.
+        """
+        estimates = [self.estimate(context, filter) for filter in filters]
+        return [filters[index] for index in self.order_indexes(estimates)]
+
+    def order_indexes(self, estimates: List[Optional[FilterEstimate]]) -> List[int]:
+        """Returns the application order of the filters with `estimates`, see `order`."""
+        pending = list(range(len(estimates)))
+        order: List[int] = []
+        while pending:
+            ready = [
+                index
+                for index in pending
+                if not any(
+                    self.__depends_on(estimates[index], estimates[previous_index])
+                    for previous_index in pending
+                    if previous_index < index
+                )
+            ]
+            index = min(
+                ready,
+                key=lambda index: (
+                    estimates[index].rank if estimates[index] is not None else math.inf,
+                    index,
+                ),
+            )
+            pending.remove(index)
+            order.append(index)
+        logging.debug(f"Filters order {order}")
+        return order
+
+    def cacheable_indexes(
+        self,
+        filters: List[BaseFilter],
+        estimates: List[Optional[FilterEstimate]],
+        order: List[int],
+    ) -> Set[int]:
+        """Returns the indexes of the filters whose kept rows can be cached by their selection when
+        applied in `order`: filters with `save_to_dict`, not masking cells nor recomputing
+        variables, and not reading the columns masked by the previous ones.
+        """
+        cacheable: Set[int] = set()
+        output_ids: Set[str] = set()
+        unknown_outputs = False
+        for index in order:
+            estimate = estimates[index]
+            if (
+                estimate is not None
+                and not estimate.output_ids
+                and not unknown_outputs
+                and not output_ids.intersection(estimate.input_ids)
+                and hasattr(filters[index], "save_to_dict")
+            ):
+                cacheable.add(index)
+            elif estimate is None:
+                unknown_outputs = True
+            else:
+                output_ids.update(estimate.output_ids)
+        return cacheable
+
+    def estimate(self, context: FilterMaskContext, filter: BaseFilter) -> Optional[FilterEstimate]:
+        if hasattr(filter, "estimate"):
+            return filter.estimate(context)
+        return None
+
+    def selection(
+        self, context: FilterMaskContext, filters: List[BaseFilter]
+    ) -> Optional[Dict[str, List[Any]]]:
+        """Returns the raw values selected in each column by `filters`, if all of them either select
+        categorical values with `selection` or keep all rows, or None otherwise.
+        """
+        selection: Dict[str, List[Any]] = {}
         for filter in filters:
-            dataframe = filter.filter(dataframe)
-        return dataframe
+            filter_selection = filter.selection() if hasattr(filter, "selection") else None
+            if filter_selection is None:
+                estimate = self.estimate(context, filter)
+                if estimate is None or not estimate.is_empty:
+                    return None
+                continue
+            for column_id, values in filter_selection.items():
+                selection[column_id] = (
+                    [value for value in selection[column_id] if value in values]
+                    if column_id in selection
+                    else list(values)
+                )
+        return selection
+
+    def __depends_on(
+        self, estimate: Optional[FilterEstimate], other_estimate: Optional[FilterEstimate]
+    ) -> bool:
+        if estimate is None or other_estimate is None:
+            return True
+        return estimate.depends_on(other_estimate)
+
+    def mask_filter(self, context: FilterMaskContext, filter: BaseFilter) -> FilterMask:
+        if hasattr(filter, "mask"):
+            return filter.mask(context)
+        return context.mask_from_dataframe(filter.filter(context.materialize()))
@@ -0,0 +1,68 @@
+import threading
+from collections import OrderedDict
+from typing import List, Optional
+
+import pandas as pd
+
+from melanoma_phd.database.filter.BaseFilter import BaseFilter
+from melanoma_phd.database.filter.FilterEstimate import FilterEstimate
+from melanoma_phd.database.filter.FilterMask import FilterMask
+from melanoma_phd.database.filter.FilterMaskContext import FilterMaskContext
+from melanoma_phd.database.filter.QueryParser import QueryNode, QueryParser
+from melanoma_phd.database.variable.BaseVariable import BaseVariable
+
+
+class QueryFilter(BaseFilter):
+    """Filters patients with a textual query, see `QueryParser`. The last parsed queries are kept,
+    so repeated queries are parsed once.
+    """
+
+    MAX_CACHED_QUERIES = 256
+
+    def __init__(self, variables: List[BaseVariable], name: str = "Query") -> None:
+        super().__init__()
+        self._name = name
+        self._parser = QueryParser(variables)
+        self._queries: OrderedDict[str, QueryNode] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    def compile(self, query: str) -> Optional[QueryNode]:
+        query = query.strip() if query else ""
+        if not query:
+            return None
+        with self._lock:
+            node = self._queries.get(query)
+            if node is not None:
+                self._queries.move_to_end(query)
+                return node
+        node = self._parser.parse(query)
+        with self._lock:
+            self._queries[query] = node
+            while len(self._queries) > self.MAX_CACHED_QUERIES:
+                self._queries.popitem(last=False)
+        return node
+
+    def filter(self, dataframe: pd.DataFrame, query: str) -> pd.DataFrame:
+        node = self.compile(query)
+        if node is None:
+            return dataframe
+        return dataframe[node.evaluate(FilterMaskContext(dataframe=dataframe))]
+
+    def mask(self, context: FilterMaskContext, query: str) -> FilterMask:
+        node = self.compile(query)
+        if node is None:
+            return context.full_mask()
+        return context.row_mask(node.evaluate(context))
+
+    def estimate(self, context: FilterMaskContext, query: str) -> Optional[FilterEstimate]:
+        node = self.compile(query)
+        if node is None:
+            return FilterEstimate.empty()
+        input_ids = list(dict.fromkeys(node.column_ids))
+        if not all(column_id in context.dataframe.columns for column_id in input_ids):
+            return None
+        return FilterEstimate(cost=context.size * len(input_ids), input_ids=input_ids)
@@ -0,0 +1,379 @@
+from __future__ import annotations
+
+import re
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Dict, List, NoReturn, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from melanoma_phd.database.filter.FilterMaskContext import FilterMaskContext
+from melanoma_phd.database.filter.IntervalMask import IntervalMask
+from melanoma_phd.database.variable.BaseVariable import BaseVariable
+from melanoma_phd.database.variable.CategoricalVariable import CategoricalVariable
+from melanoma_phd.database.variable.ScalarVariable import ScalarVariable
+
+QueryValue = Union[int, float, str]
+
+
+class QueryError(ValueError):
+    def __init__(self, message: str, query: str, position: int) -> None:
+        self.query: str = query
+        self.position: int = position
+        super().__init__(f"{message} at position {position} of query '{query}'")
+
+
+@dataclass
+class QueryToken:
+    type: str
+    value: QueryValue
+    position: int
+
+
+class QueryNode(ABC):
+    """Compiled query expression, evaluated to a boolean array over the context base rows."""
+
+    @abstractmethod
+    def evaluate(self, context: FilterMaskContext) -> np.ndarray:
+        pass
+
+    @property
+    @abstractmethod
+    def column_ids(self) -> List[str]:
+        pass
+
+
+class QueryAndNode(QueryNode):
+    def __init__(self, nodes: List[QueryNode]) -> None:
+        self._nodes = nodes
+
+    def evaluate(self, context: FilterMaskContext) -> np.ndarray:
+        rows = self._nodes[0].evaluate(context)
+        for node in self._nodes[1:]:
+            rows = rows & node.evaluate(context)
+        return rows
+
+    @property
+    def column_ids(self) -> List[str]:
+        return [column_id for node in self._nodes for column_id in node.column_ids]
+
+
+class QueryOrNode(QueryAndNode):
+    def evaluate(self, context: FilterMaskContext) -> np.ndarray:
+        rows = self._nodes[0].evaluate(context)
+        for node in self._nodes[1:]:
+            rows = rows | node.evaluate(context)
+        return rows
+
+
+class QueryNotNode(QueryNode):
+    def __init__(self, node: QueryNode) -> None:
+        self._node = node
+
+    def evaluate(self, context: FilterMaskContext) -> np.ndarray:
+        return ~self._node.evaluate(context)
+
+    @property
+    def column_ids(self) -> List[str]:
+        return self._node.column_ids
+
+
+class QueryPredicateNode(QueryNode):
+    """Comparison of a variable values. Null values never satisfy a comparison, except `is null`.
+
+    Quantified predicates compare the iterated columns of an iteration variable: `any` keeps the
+    patients with some iteration satisfying it and `all` the patients with every recorded
+    iteration satisfying it.
+    """
+
+    def __init__(
+        self,
+        variable: BaseVariable,
+        operator: str,
+        values: Optional[List[QueryValue]] = None,
+        interval: Optional[pd.Interval] = None,
+        quantifier: Optional[str] = None,
+    ) -> None:
+        self._variable = variable
+        self._operator = operator
+        self._values = values if values else []
+        self._interval = interval
+        self._quantifier = quantifier
+        self._column_ids = (
+            list(getattr(variable, "iterated_variable_ids")) if quantifier else [variable.id]
+        )
+
+    @property
+    def column_ids(self) -> List[str]:
+        return self._column_ids
+
+    def evaluate(self, context: FilterMaskContext) -> np.ndarray:
+        matches = self.__evaluate_cells(context)
+        if self._quantifier is None:
+            return matches[:, 0]
+        elif self._quantifier == "any":
+            return matches.any(axis=1)
+        elif self._operator in ("is null", "is not null"):
+            return matches.all(axis=1)
+        recorded = self.__get_dataframe(context).notna().to_numpy()
+        return (matches | ~recorded).all(axis=1) & recorded.any(axis=1)
+
+    def __evaluate_cells(self, context: FilterMaskContext) -> np.ndarray:
+        if self._interval is not None:
+            sorted_index = context.get_sorted_index(self._column_ids)
+            if sorted_index is not None:
+                matches = sorted_index.mask([self._interval])
+            else:
+                values = self.__get_dataframe(context).to_numpy()
+                matches = IntervalMask([self._interval]).any(values)
+            return matches.reshape(len(matches), -1)
+        if self._operator in ("in", "=="):
+            bitmap_index = (
+                context.get_bitmap_index(self._variable.id) if self._quantifier is None else None
+            )
+            if bitmap_index is not None:
+                matches = bitmap_index.to_mask(bitmap_index.union(self._values))
+                return matches.reshape(len(matches), -1)
+            return self.__get_dataframe(context).isin(self._values).to_numpy()
+        dataframe = self.__get_dataframe(context)
+        if self._operator in ("not in", "!="):
+            return (dataframe.notna() & ~dataframe.isin(self._values)).to_numpy()
+        elif self._operator == "is null":
+            return dataframe.isna().to_numpy()
+        elif self._operator == "is not null":
+            return dataframe.notna().to_numpy()
+        raise ValueError(f"Unknown '{self._operator}' query operator")
+
+    def __get_dataframe(self, context: FilterMaskContext) -> pd.DataFrame:
+        if all(column_id in context.dataframe.columns for column_id in self._column_ids):
+            return context.get_dataframe(self._column_ids)
+        return self._variable.get_series(dataframe=context.get_dataframe()).to_frame()
+
+
+class QueryCursor:
+    """Tokens of a query being parsed and the position of the next one."""
+
+    def __init__(self, query: str, tokens: List[QueryToken]) -> None:
+        self._query = query
+        self._tokens = tokens
+        self._position = 0
+
+    def peek(self) -> QueryToken:
+        return self._tokens[self._position]
+
+    def advance(self) -> QueryToken:
+        token = self.peek()
+        self._position += 1
+        return token
+
+    def accept(self, type: str, value: QueryValue) -> bool:
+        token = self.peek()
+        if token.type == type and token.value == value:
+            self._position += 1
+            return True
+        return False
+
+    def expect(self, type: str, value: QueryValue) -> None:
+        if not self.accept(type, value):
+            self.raise_error(f"Expected '{value}' but found '{self.peek().value}'")
+
+    def raise_error(self, message: str, position: Optional[int] = None) -> NoReturn:
+        raise QueryError(
+            message, self._query, self.peek().position if position is None else position
+        )
+
+
+class QueryParser:
+    """Parses textual filter queries over variable identifiers and category names, e.g.
+
+        BOR in ["RC", "RP"] and "EDAD (AÑOS)" between 40 and 60 and any("TIEMPO IT{N}" in [5, 7])
+
+    Identifiers are bare words or quoted strings. Predicates are `in [...]`, `not in [...]`,
+    `between a and b`, comparisons (`==`, `!=`, `<`, `<=`, `>`, `>=`) and `is [not] null`, which
+    can be combined with `and`, `or`, `not` and parentheses. `any(...)` and `all(...)` quantify a
+    predicate over the iterations of an iteration variable.
+
+    Parsing state lives in a `QueryCursor` per query, so a parser can be shared across sessions.
+    """
+
+    TOKEN_REGEX = re.compile(
+        r"""\s*(?:
+        (?P<string>"(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*')
+        |(?P<operator><=|>=|==|!=|<|>|=)
+        |(?P<punctuation>[()\[\],])
+        |(?P<word>[^\s()\[\],<>=!"']+)
+        )""",
+        re.VERBOSE,
+    )
+    NUMBER_REGEX = re.compile(r"[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?")
+    KEYWORDS = ["and", "or", "not", "in", "between", "is", "null", "any", "all"]
+    COMPARISON_OPERATORS = ["==", "=", "!=", "<", "<=", ">", ">="]
+
+    def __init__(self, variables: List[BaseVariable]) -> None:
+        self._variables: Dict[str, BaseVariable] = {variable.id: variable for variable in variables}
+
+    def parse(self, query: str) -> QueryNode:
+        cursor = QueryCursor(query, self.__tokenize(query))
+        node = self.__parse_or(cursor)
+        if cursor.peek().type != "end":
+            cursor.raise_error(f"Unexpected '{cursor.peek().value}'")
+        return node
+
+    def __tokenize(self, query: str) -> List[QueryToken]:
+        tokens: List[QueryToken] = []
+        position = 0
+        while query[position:].strip():
+            match = self.TOKEN_REGEX.match(query, position)
+            if not match or match.lastgroup is None:
+                raise QueryError(
+                    "Invalid character", query, len(query) - len(query[position:].lstrip())
+                )
+            text = match.group(match.lastgroup)
+            start = match.start(match.lastgroup)
+            if match.lastgroup == "string":
+                tokens.append(QueryToken("string", self.__unescape(text[1:-1]), start))
+            elif match.lastgroup == "word" and self.NUMBER_REGEX.fullmatch(text):
+                number = float(text)
+                tokens.append(
+                    QueryToken("number", int(number) if number.is_integer() else number, start)
+                )
+            elif match.lastgroup == "word" and text.lower() in self.KEYWORDS:
+                tokens.append(QueryToken("keyword", text.lower(), start))
+            else:
+                tokens.append(QueryToken(match.lastgroup, text, start))
+            position = match.end()
+        tokens.append(QueryToken("end", "end of query", len(query)))
+        return tokens
+
+    def __parse_or(self, cursor: QueryCursor) -> QueryNode:
+        nodes = [self.__parse_and(cursor)]
+        while cursor.accept("keyword", "or"):
+            nodes.append(self.__parse_and(cursor))
+        return nodes[0] if len(nodes) == 1 else QueryOrNode(nodes)
+
+    def __parse_and(self, cursor: QueryCursor) -> QueryNode:
+        nodes = [self.__parse_not(cursor)]
+        while cursor.accept("keyword", "and"):
+            nodes.append(self.__parse_not(cursor))
+        return nodes[0] if len(nodes) == 1 else QueryAndNode(nodes)
+
+    def __parse_not(self, cursor: QueryCursor) -> QueryNode:
+        if cursor.accept("keyword", "not"):
+            return QueryNotNode(self.__parse_not(cursor))
+        if cursor.accept("punctuation", "("):
+            node = self.__parse_or(cursor)
+            cursor.expect("punctuation", ")")
+            return node
+        for quantifier in ("any", "all"):
+            if cursor.accept("keyword", quantifier):
+                cursor.expect("punctuation", "(")
+                node = self.__parse_predicate(cursor, quantifier=quantifier)
+                cursor.expect("punctuation", ")")
+                return node
+        return self.__parse_predicate(cursor)
+
+    def __parse_predicate(self, cursor: QueryCursor, quantifier: Optional[str] = None) -> QueryNode:
+        variable = self.__parse_variable(cursor, quantifier=quantifier)
+        token = cursor.peek()
+        if cursor.accept("keyword", "in"):
+            return QueryPredicateNode(
+                variable, "in", values=self.__parse_values(cursor, variable), quantifier=quantifier
+            )
+        elif cursor.accept("keyword", "not"):
+            cursor.expect("keyword", "in")
+            return QueryPredicateNode(
+                variable,
+                "not in",
+                values=self.__parse_values(cursor, variable),
+                quantifier=quantifier,
+            )
+        elif cursor.accept("keyword", "is"):
+            operator = "is not null" if cursor.accept("keyword", "not") else "is null"
+            cursor.expect("keyword", "null")
+            return QueryPredicateNode(variable, operator, quantifier=quantifier)
+        elif cursor.accept("keyword", "between"):
+            left = self.__parse_number(cursor, variable)
+            cursor.expect("keyword", "and")
+            right = self.__parse_number(cursor, variable)
+            return QueryPredicateNode(
+                variable,
+                "between",
+                interval=pd.Interval(left, right, closed="both"),
+                quantifier=quantifier,
+            )
+        elif token.type == "operator" and token.value in self.COMPARISON_OPERATORS:
+            cursor.advance()
+            if token.value in ("==", "=", "!="):
+                operator = "!=" if token.value == "!=" else "=="
+                values = [self.__parse_value(cursor, variable)]
+                return QueryPredicateNode(variable, operator, values=values, quantifier=quantifier)
+            value = self.__parse_number(cursor, variable)
+            interval = {
+                "<": pd.Interval(-np.inf, value, closed="neither"),
+                "<=": pd.Interval(-np.inf, value, closed="right"),
+                ">": pd.Interval(value, np.inf, closed="neither"),
+                ">=": pd.Interval(value, np.inf, closed="left"),
+            }[str(token.value)]
+            return QueryPredicateNode(
+                variable, str(token.value), interval=interval, quantifier=quantifier
+            )
+        cursor.raise_error(f"Expected a comparison of '{variable.id}' but found '{token.value}'")
+
+    def __parse_variable(self, cursor: QueryCursor, quantifier: Optional[str]) -> BaseVariable:
+        token = cursor.peek()
+        if token.type not in ("word", "string"):
+            cursor.raise_error(f"Expected a variable identifier but found '{token.value}'")
+        variable = self._variables.get(str(token.value))
+        if variable is None:
+            cursor.raise_error(f"Unknown '{token.value}' variable")
+        if quantifier and not hasattr(variable, "iterated_variable_ids"):
+            cursor.raise_error(
+                f"'{variable.id}' is not an iteration variable to use '{quantifier}'"
+            )
+        cursor.advance()
+        return variable
+
+    def __parse_values(self, cursor: QueryCursor, variable: BaseVariable) -> List[QueryValue]:
+        cursor.expect("punctuation", "[")
+        values: List[QueryValue] = []
+        if not cursor.accept("punctuation", "]"):
+            values.append(self.__parse_value(cursor, variable))
+            while cursor.accept("punctuation", ","):
+                values.append(self.__parse_value(cursor, variable))
+            cursor.expect("punctuation", "]")
+        return values
+
+    def __parse_value(self, cursor: QueryCursor, variable: BaseVariable) -> QueryValue:
+        token = cursor.peek()
+        if token.type not in ("number", "string", "word"):
+            cursor.raise_error(f"Expected a value but found '{token.value}'")
+        cursor.advance()
+        if isinstance(variable, CategoricalVariable) and variable.categories:
+            if token.value in variable.category_names:
+                return variable.get_category_value(str(token.value))
+            elif token.value in variable.categories:
+                return token.value
+            cursor.raise_error(
+                f"'{token.value}' is not a category of '{variable.id}': {variable.category_names}",
+                position=token.position,
+            )
+        if isinstance(variable, ScalarVariable) and token.type != "number":
+            cursor.raise_error(
+                f"Expected a number to compare '{variable.id}' but found '{token.value}'",
+                position=token.position,
+            )
+        return token.value
+
+    def __parse_number(self, cursor: QueryCursor, variable: BaseVariable) -> Union[int, float]:
+        token = cursor.peek()
+        if token.type != "number":
+            cursor.raise_error(
+                f"Expected a number to compare '{variable.id}' but found '{token.value}'"
+            )
+        cursor.advance()
+        return token.value
+
+    @staticmethod
+    def __unescape(text: str) -> str:
+        return re.sub(r"\\(.)", r"\1", text)
@@ -1,6 +1,12 @@
+import math
+
 import pandas as pd
 
 from melanoma_phd.database.filter.BaseFilter import BaseFilter
+from melanoma_phd.database.filter.FilterEstimate import FilterEstimate
+from melanoma_phd.database.filter.FilterMask import FilterMask
+from melanoma_phd.database.filter.FilterMaskContext import FilterMaskContext
+from melanoma_phd.database.filter.IntervalMask import IntervalMask
 from melanoma_phd.database.variable.ScalarVariable import ScalarVariable
 
 
@@ -14,7 +20,25 @@ class ScalarFilter(BaseFilter):
         return self._variable.name
 
     def filter(self, dataframe: pd.DataFrame, interval: pd.Interval) -> pd.DataFrame:
-        return dataframe[dataframe[self._variable.id].map(lambda value: value in interval)]
+        return dataframe[IntervalMask([interval]).series(dataframe[self._variable.id])]
+
+    def mask(self, context: FilterMaskContext, interval: pd.Interval) -> FilterMask:
+        sorted_index = context.get_sorted_index([self._variable.id])
+        if sorted_index is not None:
+            return context.row_mask(sorted_index.mask([interval]))
+        series = context.get_dataframe([self._variable.id])[self._variable.id]
+        return context.row_mask(IntervalMask([interval]).any(series.to_numpy()))
+
+    def estimate(self, context: FilterMaskContext, interval: pd.Interval) -> FilterEstimate:
+        sorted_index = context.get_sorted_index([self._variable.id])
+        if sorted_index is not None:
+            count = sorted_index.count([interval])
+            return FilterEstimate(
+                cost=2 * math.log2(max(context.size, 2)) + count,
+                selectivity=count / max(context.size, 1),
+                input_ids=[self._variable.id],
+            )
+        return FilterEstimate(cost=context.size, input_ids=[self._variable.id])
 
     def interval(self) -> pd.Interval:
         return self._variable.interval
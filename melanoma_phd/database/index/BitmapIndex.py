@@ -0,0 +1,62 @@
+from typing import Any, Dict, Iterable, List
+
+import numpy as np
+import pandas as pd
+
+
+class BitmapIndex:
+    """Packed bitset of the rows holding each value of a column. Null values are not indexed."""
+
+    POPCOUNT_TABLE = np.array([bin(byte).count("1") for byte in range(256)], dtype=np.uint8)
+
+    def __init__(self, series: pd.Series) -> None:
+        self._size = len(series.index)
+        codes, uniques = pd.factorize(series)
+        self._bitmaps: Dict[Any, np.ndarray] = {
+            value: np.packbits(codes == code) for code, value in enumerate(uniques)
+        }
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    @property
+    def values(self) -> List[Any]:
+        return list(self._bitmaps.keys())
+
+    def empty(self) -> np.ndarray:
+        return np.zeros((self._size + 7) // 8, dtype=np.uint8)
+
+    def full(self) -> np.ndarray:
+        return np.packbits(np.ones(self._size, dtype=bool))
+
+    def get(self, value: Any) -> np.ndarray:
+        bitmap = self._bitmaps.get(value)
+        return bitmap if bitmap is not None else self.empty()
+
+    def union(self, values: Iterable[Any]) -> np.ndarray:
+        bitmap = self.empty()
+        for value in values:
+            if value in self._bitmaps:
+                bitmap = bitmap | self._bitmaps[value]
+        return bitmap
+
+    def to_mask(self, bitmap: np.ndarray) -> np.ndarray:
+        return np.unpackbits(bitmap, count=self._size).astype(bool)
+
+    def from_mask(self, mask: np.ndarray) -> np.ndarray:
+        return np.packbits(np.asarray(mask, dtype=bool))
+
+    @classmethod
+    def intersection(cls, bitmaps: Iterable[np.ndarray]) -> np.ndarray:
+        return np.bitwise_and.reduce(list(bitmaps))
+
+    @classmethod
+    def count(cls, bitmap: np.ndarray) -> int:
+        return int(cls.POPCOUNT_TABLE[bitmap].sum(dtype=np.int64))
+
+    def value_counts(self) -> Dict[Any, int]:
+        return {value: self.count(bitmap) for value, bitmap in self._bitmaps.items()}
+
+    def memory_usage(self) -> int:
+        return sum(bitmap.nbytes for bitmap in self._bitmaps.values())
@@ -0,0 +1,106 @@
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+
+class CountCube:
+    """Sparse count table of the rows holding each combination of values, null values included, of
+    some categorical dimension columns.
+
+    Only the combinations present in the dataframe are stored, so counts and value counts of any
+    selection over the dimensions are aggregated from a table of at most as many cells as rows.
+    Cells also keep the position of their first row, to order value counts as pandas does.
+    """
+
+    def __init__(self, dataframe: pd.DataFrame, dimension_ids: List[str]) -> None:
+        self._dimension_ids = list(dimension_ids)
+        self._size = len(dataframe.index)
+        self._codes: Dict[str, np.ndarray] = {}
+        self._levels: Dict[str, pd.Index] = {}
+        self._level_codes: Dict[str, Dict[Any, int]] = {}
+        row_codes = []
+        for dimension_id in self._dimension_ids:
+            codes, levels = pd.factorize(dataframe[dimension_id], sort=True)
+            row_codes.append(codes)
+            self._levels[dimension_id] = levels
+            self._level_codes[dimension_id] = {value: code for code, value in enumerate(levels)}
+        if row_codes:
+            cell_codes, cells = np.unique(np.column_stack(row_codes), axis=0, return_inverse=True)
+        else:
+            cell_codes = np.empty((min(self._size, 1), 0), dtype=np.int64)
+            cells = np.zeros(self._size, dtype=np.int64)
+        cells = cells.ravel()
+        for position, dimension_id in enumerate(self._dimension_ids):
+            self._codes[dimension_id] = cell_codes[:, position]
+        self._counts = np.bincount(cells, minlength=len(cell_codes))
+        self._first_positions = np.full(len(cell_codes), self._size, dtype=np.int64)
+        np.minimum.at(self._first_positions, cells, np.arange(self._size))
+
+    @property
+    def dimension_ids(self) -> List[str]:
+        return self._dimension_ids
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    @property
+    def cells_number(self) -> int:
+        return len(self._counts)
+
+    def has_dimensions(self, column_ids: List[str]) -> bool:
+        return all(column_id in self._codes for column_id in column_ids)
+
+    def count(self, selection: Dict[str, List[Any]]) -> int:
+        """Number of rows holding any of the selected values in every selected column."""
+        return int(self._counts[self.__select(selection)].sum())
+
+    def value_counts(
+        self,
+        column_ids: List[str],
+        selection: Optional[Dict[str, List[Any]]] = None,
+        sort: bool = True,
+    ) -> pd.Series:
+        """Number of selected rows holding each combination of non null values of `column_ids`.
+        Sorted by descending count, as `pd.Series.value_counts`, or by values if not `sort`.
+        """
+        cells = self.__select(selection if selection else {})
+        for column_id in column_ids:
+            cells &= self._codes[column_id] >= 0
+        cell_codes = np.column_stack([self._codes[column_id][cells] for column_id in column_ids])
+        group_codes, groups = np.unique(cell_codes, axis=0, return_inverse=True)
+        groups = groups.ravel()
+        counts = np.bincount(groups, weights=self._counts[cells], minlength=len(group_codes))
+        first_positions = np.full(len(group_codes), self._size, dtype=np.int64)
+        np.minimum.at(first_positions, groups, self._first_positions[cells])
+        if len(column_ids) == 1:
+            index = pd.Index(self._levels[column_ids[0]][group_codes[:, 0]], name=column_ids[0])
+        else:
+            index = pd.MultiIndex.from_arrays(
+                [
+                    self._levels[column_id][group_codes[:, position]]
+                    for position, column_id in enumerate(column_ids)
+                ],
+                names=column_ids,
+            )
+        value_counts = pd.Series(counts.astype(np.int64), index=index, name="count")
+        if sort:
+            value_counts = value_counts.iloc[np.lexsort((first_positions, -counts))]
+        return value_counts
+
+    def memory_usage(self) -> int:
+        return (
+            self._counts.nbytes
+            + self._first_positions.nbytes
+            + sum(codes.nbytes for codes in self._codes.values())
+        )
+
+    def __select(self, selection: Dict[str, List[Any]]) -> np.ndarray:
+        cells = np.ones(len(self._counts), dtype=bool)
+        for column_id, values in selection.items():
+            level_codes = self._level_codes[column_id]
+            selected_codes = np.zeros(len(level_codes) + 1, dtype=bool)
+            selected_codes[[level_codes[value] for value in values if value in level_codes]] = True
+            cells &= selected_codes[self._codes[column_id]]
+        return cells
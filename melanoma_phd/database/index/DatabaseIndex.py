@@ -0,0 +1,114 @@
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from melanoma_phd.database.index.BitmapIndex import BitmapIndex
+from melanoma_phd.database.index.CountCube import CountCube
+from melanoma_phd.database.index.SortedColumnIndex import SortedColumnIndex
+from melanoma_phd.database.variable.BaseVariable import BaseVariable
+from melanoma_phd.database.variable.CategoricalVariable import CategoricalVariable
+from melanoma_phd.database.variable.ReferenceIterationVariable import ReferenceIterationVariable
+from melanoma_phd.database.variable.ScalarVariable import ScalarVariable
+from melanoma_phd.database.variable.VariableDynamicMixin import VariableDynamicMixin
+
+
+class DatabaseIndex:
+    """Indexes of the raw columns of the database dataframe, built once per database load."""
+
+    def __init__(
+        self,
+        dataframe: pd.DataFrame,
+        variables: List[BaseVariable],
+        sorted_indexes: bool = True,
+    ) -> None:
+        self._dataframe = dataframe
+        self._size = len(dataframe.index)
+        self._bitmap_indexes: Dict[str, BitmapIndex] = {}
+        self._sorted_indexes: Dict[Tuple[str, ...], SortedColumnIndex] = {}
+        self._non_null_counts: Dict[str, int] = dataframe.notna().sum().to_dict()
+        self._count_cube: Optional[CountCube] = None
+        for variable in variables:
+            if (
+                isinstance(variable, CategoricalVariable)
+                and not isinstance(variable, VariableDynamicMixin)
+                and variable.id in dataframe.columns
+                and variable.id not in self._bitmap_indexes
+            ):
+                self._bitmap_indexes[variable.id] = BitmapIndex(dataframe[variable.id])
+        if sorted_indexes:
+            self.__create_sorted_indexes(variables)
+
+    @property
+    def dataframe(self) -> pd.DataFrame:
+        return self._dataframe
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    @property
+    def count_cube(self) -> Optional[CountCube]:
+        return self._count_cube
+
+    def build_count_cube(self, column_ids: List[str]) -> None:
+        """Builds the count cube of the bitmap indexed `column_ids` columns."""
+        dimension_ids = [
+            column_id
+            for column_id in dict.fromkeys(column_ids)
+            if column_id in self._bitmap_indexes
+        ]
+        self._count_cube = CountCube(self._dataframe, dimension_ids) if dimension_ids else None
+        if self._count_cube is not None:
+            logging.info(
+                f"Count cube of {len(dimension_ids)} dimensions built with "
+                f"{self._count_cube.cells_number} cells"
+            )
+
+    def get_bitmap_index(self, column_id: str) -> Optional[BitmapIndex]:
+        return self._bitmap_indexes.get(column_id)
+
+    def get_sorted_index(self, column_ids: List[str]) -> Optional[SortedColumnIndex]:
+        return self._sorted_indexes.get(tuple(column_ids))
+
+    def get_non_null_count(self, column_id: str) -> Optional[int]:
+        return self._non_null_counts.get(column_id)
+
+    def count(self, selection: Dict[str, List[Any]]) -> int:
+        """Number of rows holding any of the selected values in every selected column."""
+        bitmaps = [
+            self._bitmap_indexes[column_id].union(values)
+            for column_id, values in selection.items()
+            if values
+        ]
+        if not bitmaps:
+            return self._size
+        return BitmapIndex.count(BitmapIndex.intersection(bitmaps))
+
+    def memory_usage(self) -> int:
+        return (
+            sum(index.memory_usage() for index in self._bitmap_indexes.values())
+            + sum(index.memory_usage() for index in self._sorted_indexes.values())
+            + (self._count_cube.memory_usage() if self._count_cube is not None else 0)
+        )
+
+    def __create_sorted_indexes(self, variables: List[BaseVariable]) -> None:
+        for variable in variables:
+            if isinstance(variable, ReferenceIterationVariable):
+                column_ids = variable.iterated_variable_ids
+            elif (
+                isinstance(variable, ScalarVariable)
+                and not isinstance(variable, VariableDynamicMixin)
+                and variable.id in self._dataframe.columns
+            ):
+                column_ids = [variable.id]
+            else:
+                continue
+            if tuple(column_ids) in self._sorted_indexes:
+                continue
+            try:
+                self._sorted_indexes[tuple(column_ids)] = SortedColumnIndex.from_dataframe(
+                    self._dataframe, column_ids
+                )
+            except (TypeError, ValueError) as error:
+                logging.debug(f"Sorted index not created for {column_ids} columns: {error}")
@@ -0,0 +1,77 @@
+from typing import List, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+class SortedColumnIndex:
+    """Sorted values of one or several numeric columns, resolving interval queries with binary
+    search. Null values are not indexed, so they are never contained in any interval.
+    """
+
+    def __init__(self, values: np.ndarray) -> None:
+        values = np.asarray(values, dtype=float)
+        self._shape = values.shape
+        flat_values = values.ravel()
+        positions = np.flatnonzero(~np.isnan(flat_values))
+        order = np.argsort(flat_values[positions], kind="stable")
+        self._positions: np.ndarray = positions[order]
+        self._sorted_values: np.ndarray = flat_values[self._positions]
+
+    @classmethod
+    def from_dataframe(cls, dataframe: pd.DataFrame, column_ids: List[str]) -> "SortedColumnIndex":
+        values = dataframe[column_ids].to_numpy(dtype=float, na_value=np.nan)
+        return cls(values[:, 0] if len(column_ids) == 1 else values)
+
+    @property
+    def shape(self) -> Tuple[int, ...]:
+        return self._shape
+
+    def memory_usage(self) -> int:
+        return self._positions.nbytes + self._sorted_values.nbytes
+
+    def mask(self, intervals: List[pd.Interval]) -> np.ndarray:
+        """Returns a boolean array of the indexed shape with the values inside any interval."""
+        mask = np.zeros(int(np.prod(self._shape)), dtype=bool)
+        for start, stop in self.__merge_ranges([self.__range(interval) for interval in intervals]):
+            mask[self._positions[start:stop]] = True
+        return mask.reshape(self._shape)
+
+    def interval_masks(self, intervals: List[pd.Interval]) -> np.ndarray:
+        """Returns a boolean array of the indexed shape plus a trailing axis with one mask per
+        interval, as `IntervalMask.masks`.
+        """
+        masks = np.zeros((int(np.prod(self._shape)), len(intervals)), dtype=bool)
+        for index, interval in enumerate(intervals):
+            start, stop = self.__range(interval)
+            masks[self._positions[start:stop], index] = True
+        return masks.reshape(self._shape + (len(intervals),))
+
+    def count(self, intervals: List[pd.Interval]) -> int:
+        return sum(
+            stop - start
+            for start, stop in self.__merge_ranges(
+                [self.__range(interval) for interval in intervals]
+            )
+        )
+
+    def __range(self, interval: pd.Interval) -> Tuple[int, int]:
+        start = np.searchsorted(
+            self._sorted_values, interval.left, side="left" if interval.closed_left else "right"
+        )
+        stop = np.searchsorted(
+            self._sorted_values, interval.right, side="right" if interval.closed_right else "left"
+        )
+        return int(start), int(max(start, stop))
+
+    @staticmethod
+    def __merge_ranges(ranges: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+        merged_ranges: List[Tuple[int, int]] = []
+        for start, stop in sorted(ranges):
+            if start >= stop:
+                continue
+            if merged_ranges and start <= merged_ranges[-1][1]:
+                merged_ranges[-1] = (merged_ranges[-1][0], max(merged_ranges[-1][1], stop))
+            else:
+                merged_ranges.append((start, stop))
+        return merged_ranges
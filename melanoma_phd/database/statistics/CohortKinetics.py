@@ -0,0 +1,144 @@
+import warnings
+from enum import Enum
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from melanoma_phd.database.variable.BaseVariable import BaseVariable
+from melanoma_phd.database.variable.IterationScalarVariable import IterationScalarVariable
+from melanoma_phd.database.variable.StatisticFieldName import StatisticFieldName
+
+
+class CohortKineticsMethod(Enum):
+    BINNING = "binning"
+    INTERPOLATION = "interpolation"
+
+
+class CohortKinetics:
+    """Cohort trajectory of an iteration scalar variable: median and interquartile range of the
+    patient values at each point of a common time grid, per group by category.
+
+    Patient series, with the times of the reference variable of `variable`, are resampled onto the
+    grid all at once over the patients x iterations matrices, either averaging the values of the
+    bin centered at each grid time or interpolating linearly between the closest iterations.
+    """
+
+    TIME = "time"
+
+    def __init__(
+        self,
+        variable: IterationScalarVariable,
+        time_grid: np.ndarray,
+        method: CohortKineticsMethod = CohortKineticsMethod.BINNING,
+    ) -> None:
+        self._variable = variable
+        self._time_grid = np.sort(np.unique(np.asarray(time_grid, dtype=float)))
+        if not len(self._time_grid):
+            raise ValueError(f"Empty time grid for '{variable.id}' cohort kinetics")
+        self._method = method
+
+    @property
+    def time_grid(self) -> np.ndarray:
+        return self._time_grid
+
+    @classmethod
+    def create_time_grid(cls, variable: IterationScalarVariable, step: float) -> np.ndarray:
+        """Time grid every `step` over the times of the reference variable of `variable`."""
+        if step <= 0:
+            raise ValueError(f"Time grid step has to be positive, not {step}")
+        interval = variable.reference_variable.interval
+        return np.arange(interval.left, interval.right + step / 2, step)
+
+    def resample(self, dataframe: pd.DataFrame) -> np.ndarray:
+        """Returns the patients x grid times matrix of the resampled values, null where a patient
+        has no value.
+        """
+        values = dataframe[self._variable.iterated_variable_ids].to_numpy(dtype=float)
+        times = dataframe[self._variable.reference_variable.iterated_variable_ids].to_numpy(
+            dtype=float
+        )
+        if values.shape != times.shape:
+            raise ValueError(
+                f"'{self._variable.id}' iterations do not match its reference variable ones"
+            )
+        times = np.where(np.isnan(values), np.nan, times)
+        if self._method == CohortKineticsMethod.BINNING:
+            return self.__bin(values, times)
+        return self.__interpolate(values, times)
+
+    def compute(
+        self, dataframe: pd.DataFrame, group_by: Optional[BaseVariable] = None
+    ) -> pd.DataFrame:
+        """Returns the count, median and quartiles of the resampled values at each grid time,
+        indexed by group by category, if any, and time.
+        """
+        resampled = self.resample(dataframe)
+        if group_by is None:
+            groups = {self._variable.name: np.ones(len(dataframe.index), dtype=bool)}
+        else:
+            group_series = group_by.get_series(dataframe)
+            groups = {
+                group: (group_series == group).to_numpy()
+                for group in sorted(group_series.dropna().unique(), key=str)
+            }
+        statistics = []
+        for group, group_mask in groups.items():
+            group_values = resampled[group_mask]
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore", category=RuntimeWarning)
+                quartiles = np.nanpercentile(group_values, [25, 50, 75], axis=0)
+            statistics.append(
+                pd.DataFrame(
+                    {
+                        StatisticFieldName.COUNT.value: np.count_nonzero(
+                            ~np.isnan(group_values), axis=0
+                        ),
+                        StatisticFieldName.MEDIAN.value: quartiles[1],
+                        StatisticFieldName.QUARTILE_1.value: quartiles[0],
+                        StatisticFieldName.QUARTILE_3.value: quartiles[2],
+                    },
+                    index=pd.MultiIndex.from_product(
+                        [[group], self._time_grid],
+                        names=[group_by.id if group_by else None, self.TIME],
+                    ),
+                )
+            )
+        return pd.concat(statistics)
+
+    def __bin(self, values: np.ndarray, times: np.ndarray) -> np.ndarray:
+        grid = self._time_grid
+        half_steps = np.diff(grid) / 2 if len(grid) > 1 else np.array([0.5])
+        edges = np.concatenate(
+            [[grid[0] - half_steps[0]], grid[:-1] + half_steps, [grid[-1] + half_steps[-1]]]
+        )
+        bins = np.searchsorted(edges, times, side="right") - 1
+        valid = ~np.isnan(times) & (bins >= 0) & (bins < len(grid))
+        patients = np.broadcast_to(np.arange(len(values))[:, None], values.shape)
+        cells = patients[valid] * len(grid) + bins[valid]
+        sums = np.bincount(cells, weights=values[valid], minlength=len(values) * len(grid))
+        counts = np.bincount(cells, minlength=len(values) * len(grid))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return (sums / counts).reshape(len(values), len(grid))
+
+    def __interpolate(self, values: np.ndarray, times: np.ndarray) -> np.ndarray:
+        order = np.argsort(times, axis=1, kind="stable")
+        times = np.take_along_axis(times, order, axis=1)
+        values = np.take_along_axis(values, order, axis=1)
+        valid_counts = np.count_nonzero(~np.isnan(times), axis=1)
+        rows = np.arange(len(values))
+        # Position of the last iteration at or before each grid time
+        left = (times[:, :, None] <= self._time_grid[None, None, :]).sum(axis=1) - 1
+        right = np.minimum(left + 1, np.maximum(valid_counts - 1, 0)[:, None])
+        left_index = np.maximum(left, 0)
+        left_times = times[rows[:, None], left_index]
+        right_times = times[rows[:, None], right]
+        left_values = values[rows[:, None], left_index]
+        right_values = values[rows[:, None], right]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            weights = (self._time_grid[None, :] - left_times) / (right_times - left_times)
+            interpolated = left_values + weights * (right_values - left_values)
+        exact = left_times == self._time_grid[None, :]
+        interpolated = np.where(exact, left_values, interpolated)
+        inside = (left >= 0) & (exact | (right_times > self._time_grid[None, :]))
+        return np.where(inside, interpolated, np.nan)
@@ -1,19 +1,22 @@
 from __future__ import annotations
 
+import functools
 import logging
 from dataclasses import dataclass
 from enum import Enum
 from typing import Dict, List, Optional, Tuple
 
+import numpy as np
 import pandas as pd
 import scipy.stats as stats
-import statsmodels.api as sa
-import statsmodels.formula.api as sfa
-from dython.nominal import theils_u
 from sklearn.metrics import matthews_corrcoef
 
 from melanoma_phd.database.statistics.HomogenityTester import HomogenityTester
 from melanoma_phd.database.statistics.NormalityTester import NormalityTester
+from melanoma_phd.database.statistics.OmegaSquaredMatrix import OmegaSquaredMatrix
+from melanoma_phd.database.statistics.PairwiseTableExecutor import PairwiseTableExecutor
+from melanoma_phd.database.statistics.ScalarCorrelationMatrix import ScalarCorrelationMatrix
+from melanoma_phd.database.statistics.StatisticalPropertyCache import StatisticalPropertyCache
 from melanoma_phd.database.statistics.VariableDataframe import VariableDataframe
 from melanoma_phd.database.statistics.VariableStatisticalProperties import (
     VariableStatisticalProperties,
@@ -65,12 +68,25 @@ class Correlationer:
         self,
         normality_null_hypothesis: PValueType = 0.05,
         homogeneity_null_hypothesis: PValueType = 0.05,
+        property_cache: Optional[StatisticalPropertyCache] = None,
+        scalar_correlations: Optional[ScalarCorrelationMatrix] = None,
+        omega_squared: Optional[OmegaSquaredMatrix] = None,
     ) -> None:
         super().__init__()
-        self._normality_tester = NormalityTester(null_hypothesis=normality_null_hypothesis)
+        self._normality_null_hypothesis = normality_null_hypothesis
+        self._homogeneity_null_hypothesis = homogeneity_null_hypothesis
+        self._scalar_correlations = scalar_correlations
+        self._omega_squared = omega_squared
+        self._property_cache = (
+            property_cache if property_cache is not None else StatisticalPropertyCache()
+        )
+        self._normality_tester = NormalityTester(
+            null_hypothesis=normality_null_hypothesis, property_cache=self._property_cache
+        )
         self._homogeneity_tester = HomogenityTester(
             null_hypothesis=homogeneity_null_hypothesis,
             normality_null_hypothesis=normality_null_hypothesis,
+            property_cache=self._property_cache,
         )
 
     def correlate(
@@ -88,8 +104,8 @@ class Correlationer:
             first_variable_dataframe.variable,
             second_variable_dataframe.variable,
         )
-        first_series, second_series = first_variable_dataframe.merge_and_remove_nulls(
-            second_variable_dataframe
+        first_series, second_series = self._property_cache.merge_and_remove_nulls(
+            dataframe, first_variable, second_variable
         )
         variable_0_prop = VariableStatisticalProperties(
             type=first_variable.statistical_type(),
@@ -115,7 +131,14 @@ class Correlationer:
                             },
                             homogeneity=homogenuos_data,
                             type=CorrelationTestType.PEARSON,
-                            coefficient=stats.pearsonr(first_series, second_series).statistic,
+                            coefficient=self._correlate_scalars(
+                                dataframe,
+                                first_variable,
+                                second_variable,
+                                first_series,
+                                second_series,
+                                spearman=False,
+                            )[0],
                         )
                     else:
                         return CorrelationResult(
@@ -125,7 +148,14 @@ class Correlationer:
                             },
                             homogeneity=homogenuos_data,
                             type=CorrelationTestType.SPEARMAN,
-                            coefficient=stats.spearmanr(first_series, second_series).statistic,
+                            coefficient=self._correlate_scalars(
+                                dataframe,
+                                first_variable,
+                                second_variable,
+                                first_series,
+                                second_series,
+                                spearman=True,
+                            )[0],
                         )
                 elif isinstance(second_variable, CategoricalVariable):
                     if isinstance(second_variable, BooleanVariable):
@@ -142,11 +172,8 @@ class Correlationer:
                         )
                     else:
                         # TODO: Differentitate between Ordinal (same as ScalarVariable non-normal) and Nominal (as is here) categorical variables
-                        series_by_categories = first_variable.get_data_by_categories(
-                            dataframe=dataframe,
-                            category_variable=second_variable,
-                            remove_nulls=True,
-                            remove_short_categories=True,
+                        series_by_categories = self._property_cache.get_data_by_categories(
+                            dataframe, first_variable, second_variable
                         )
                         homogenuos_data = self._homogeneity_tester.test_series(
                             *series_by_categories
@@ -160,7 +187,11 @@ class Correlationer:
                                 homogeneity=homogenuos_data,
                                 type=CorrelationTestType.OMEGA_SQUARED,
                                 coefficient=self._calculate_omega_square(
-                                    continuous_series=first_series, categorical_series=second_series
+                                    dataframe,
+                                    first_variable,
+                                    second_variable,
+                                    first_series,
+                                    second_series,
                                 ),
                             )
                         else:
@@ -172,7 +203,9 @@ class Correlationer:
                                 homogeneity=homogenuos_data,
                                 type=CorrelationTestType.EPSILON_SQUARED,
                                 coefficient=self._calculate_epsilon_squared(
-                                    h_statistic=stats.kruskal(*series_by_categories).statistic,
+                                    h_statistic=self._calculate_kruskal_statistic(
+                                        series_by_categories
+                                    ),
                                     n=len(first_series),
                                 ),
                             )
@@ -199,7 +232,9 @@ class Correlationer:
                         },
                         homogeneity=False,
                         type=CorrelationTestType.THEILS_U,
-                        coefficient=theils_u(x=first_series, y=second_series),
+                        coefficient=self._calculate_theils_u(
+                            dataframe, first_variable, second_variable
+                        ),
                     )
             elif isinstance(first_variable, CategoricalVariable):
                 # TODO: Differentitate between Ordinal (same as ScalarVariable non-normal) and Nominal (as is here) categorical variables
@@ -212,7 +247,9 @@ class Correlationer:
                         },
                         homogeneity=False,
                         type=CorrelationTestType.THEILS_U,
-                        coefficient=theils_u(x=first_series, y=second_series),
+                        coefficient=self._calculate_theils_u(
+                            dataframe, first_variable, second_variable
+                        ),
                     )
         except ValueError as e:
             error = ValueError(
@@ -238,61 +275,196 @@ class Correlationer:
         )
 
     def table(
-        self, dataframe: pd.DataFrame, variables: List[BaseVariable]
+        self,
+        dataframe: pd.DataFrame,
+        variables: List[BaseVariable],
+        executor: Optional[PairwiseTableExecutor] = None,
     ) -> Tuple[pd.DataFrame, List[ValueError]]:
         self._check_variables(dataframe, *variables)
-        results: List[List[CorrelationResult]] = []
-        columns: List[str] = []
-        index: List[str] = []
-        for v1 in variables:
-            v1_results = [self.correlate(dataframe, v1, v2) for v2 in variables]
-            results.append(v1_results)
-            var_title = f"{v1.name} [{v1_results[-1].variables[v1].type.value}] Normality={v1_results[-1].variables[v1].normality}"
-            columns.append(var_title)
-            index.append(var_title)
+        pairs: List[Tuple[int, int]] = []
+        for i, v1 in enumerate(variables):
+            for j in range(i + 1, len(variables)):
+                pairs.append((i, j))
+                if not self._is_symmetric(v1, variables[j]):
+                    # Theil's U is asymmetric, so the lower triangle is computed on its own
+                    pairs.append((j, i))
+        # Scalar pairs read their coefficients from the correlation matrix of all the variables,
+        # and scalar and categorical pairs their omega squared from the one of all the variables
+        tester_factory = functools.partial(
+            Correlationer,
+            normality_null_hypothesis=self._normality_null_hypothesis,
+            homogeneity_null_hypothesis=self._homogeneity_null_hypothesis,
+            scalar_correlations=ScalarCorrelationMatrix(dataframe, variables),
+            omega_squared=OmegaSquaredMatrix(dataframe, variables),
+        )
+        computed_results: List[CorrelationResult] = (
+            executor if executor is not None else PairwiseTableExecutor()
+        ).run(
+            tester=tester_factory(
+                property_cache=(
+                    self._property_cache
+                    if self._property_cache.dataframe is dataframe
+                    else StatisticalPropertyCache(dataframe)
+                )
+            ),
+            tester_factory=tester_factory,
+            method_name="correlate",
+            dataframe=dataframe,
+            variables=variables,
+            pairs=pairs,
+        )
+        results: Dict[Tuple[int, int], CorrelationResult] = dict(zip(pairs, computed_results))
+        for i, j in pairs:
+            results.setdefault((j, i), results[(i, j)])
+        titles: List[str] = []
+        for i, v1 in enumerate(variables):
+            v1_properties = (
+                results[(i, len(variables) - 1)].variables[v1]
+                if i < len(variables) - 1
+                else self._get_variable_properties(dataframe, v1)
+            )
+            titles.append(
+                f"{v1.name} [{v1_properties.type.value}] Normality={v1_properties.normality}"
+            )
         return pd.DataFrame(
             data=[
                 [
-                    f"{result.coefficient:.4f} (Homogeneity={result.homogeneity}, {result.type.value})"
-                    if result.succeded
-                    else "ERROR"
-                    for result in result_row
+                    "" if i == j else self._format_result(results[(i, j)])
+                    for j in range(len(variables))
                 ]
-                for result_row in results
+                for i in range(len(variables))
             ],
-            columns=columns,
-            index=index,
-        ), [result.error for result_row in results for result in result_row if not result.succeded]
+            columns=titles,
+            index=titles,
+        ), [result.error for result in computed_results if not result.succeded]
+
+    def _correlate_scalars(
+        self,
+        dataframe: pd.DataFrame,
+        first_variable: BaseVariable,
+        second_variable: BaseVariable,
+        first_series: pd.Series,
+        second_series: pd.Series,
+        spearman: bool,
+    ) -> Tuple[float, float]:
+        """Coefficient and p-value of two scalar series, from the scalar correlations of the table
+        when available.
+        """
+        if (
+            self._scalar_correlations is not None
+            and self._scalar_correlations.dataframe is dataframe
+        ):
+            correlate = (
+                self._scalar_correlations.spearman
+                if spearman
+                else self._scalar_correlations.pearson
+            )
+            correlation = correlate(first_variable, second_variable)
+            if correlation is not None:
+                return correlation
+        result = (stats.spearmanr if spearman else stats.pearsonr)(first_series, second_series)
+        return result.statistic, result.pvalue
+
+    def _format_result(self, result: CorrelationResult) -> str:
+        if not result.succeded:
+            return "ERROR"
+        return f"{result.coefficient:.4f} (Homogeneity={result.homogeneity}, {result.type.value})"
+
+    def _is_symmetric(self, variable: BaseVariable, other_variable: BaseVariable) -> bool:
+        return not all(
+            isinstance(v, CategoricalVariable) and not isinstance(v, BooleanVariable)
+            for v in [variable, other_variable]
+        )
+
+    def _get_variable_properties(
+        self, dataframe: pd.DataFrame, variable: BaseVariable
+    ) -> VariableStatisticalProperties:
+        properties = VariableStatisticalProperties(
+            type=variable.statistical_type(),
+            normality=False,
+        )
+        if isinstance(variable, ScalarVariable):
+            try:
+                properties.normality = self._normality_tester.test_series(
+                    self._property_cache.get_series(dataframe, variable).dropna()
+                )
+            except ValueError:
+                pass
+        return properties
 
     def _check_variables(self, dataframe: pd.DataFrame, *variables: BaseVariable):
-        empty_variables = []
-        for variable in variables:
-            serie = variable.get_series(dataframe)
-            null_mask = serie.isnull()
-            if sum(null_mask) == len(null_mask):
-                empty_variables.append(variable)
+        empty_variables = [
+            variable
+            for variable in variables
+            if self._property_cache.get_null_mask(dataframe, variable).all()
+        ]
         if empty_variables:
             error_msg = f"{self.__class__.__name__}: variables {[variable.name for variable in empty_variables]} are empty for the given filters. Please review database or filters."
             logging.error(error_msg)
             raise ValueError(error_msg)
 
-    def _calculate_omega_square(self, continuous_series: pd.Series, categorical_series: pd.Series):
-        anova = self._calculate_anova(
-            continuous_series=continuous_series, categorical_series=categorical_series
-        )
-        omega_square = (anova[:-1]["sum_sq"] - (anova[:-1]["df"] * anova["mean_sq"][-1])) / (
-            sum(anova["sum_sq"]) + anova["mean_sq"][-1]
+    def _calculate_omega_square(
+        self,
+        dataframe: pd.DataFrame,
+        continuous_variable: BaseVariable,
+        categorical_variable: BaseVariable,
+        continuous_series: pd.Series,
+        categorical_series: pd.Series,
+    ) -> float:
+        """One-way ANOVA omega squared of a scalar series grouped by a categorical one, from the
+        omega squared of the table when available.
+        """
+        if self._omega_squared is not None and self._omega_squared.dataframe is dataframe:
+            omega_square = self._omega_squared.get(continuous_variable, categorical_variable)
+            if omega_square is not None:
+                return omega_square
+        codes, _ = pd.factorize(categorical_series)
+        values = continuous_series.to_numpy(dtype=float)
+        values = values - values.mean()
+        return float(
+            OmegaSquaredMatrix.from_sums(
+                counts=np.bincount(codes)[:, np.newaxis],
+                sums=np.bincount(codes, weights=values)[:, np.newaxis],
+                squares=np.array([np.sum(values**2)]),
+            )[0]
         )
-        return omega_square.values[0]
 
-    def _calculate_anova(
-        self, continuous_series: pd.Series, categorical_series: pd.Series
-    ) -> Optional[pd.DataFrame]:
-        df = pd.DataFrame(
-            {"Continuous": continuous_series.values, "Categorical": categorical_series.values},
-        )
-        lm = sfa.ols("Continuous ~ C(Categorical)", data=df).fit()
-        return sa.stats.anova_lm(lm)
+    def _calculate_kruskal_statistic(self, series_by_categories: Tuple[pd.Series, ...]) -> float:
+        """Kruskal-Wallis H statistic corrected for ties, as `scipy.stats.kruskal`."""
+        if len(series_by_categories) < 2:
+            raise ValueError("Need at least two groups in kruskal")
+        sizes = np.array([len(series) for series in series_by_categories])
+        values = np.concatenate([series.to_numpy(dtype=float) for series in series_by_categories])
+        n = len(values)
+        ranks = stats.rankdata(values)
+        rank_sums = np.bincount(np.repeat(np.arange(len(sizes)), sizes), weights=ranks)
+        _, ties = np.unique(values, return_counts=True)
+        ties_correction = 1.0 - np.sum(ties**3.0 - ties) / (n**3.0 - n)
+        if ties_correction == 0:
+            return np.nan
+        h_statistic = 12.0 / (n * (n + 1)) * np.sum(rank_sums**2 / sizes) - 3 * (n + 1)
+        return h_statistic / ties_correction
+
+    def _calculate_theils_u(
+        self,
+        dataframe: pd.DataFrame,
+        variable: CategoricalVariable,
+        other_variable: CategoricalVariable,
+    ) -> float:
+        """Uncertainty coefficient U(variable|other_variable) of the categories of both variables,
+        from their contingency table, as `dython.nominal.theils_u`.
+        """
+        counts = self._property_cache.get_contingency_table(
+            dataframe, variable, other_variable, only_numeric=False
+        ).astype(float)
+        total = counts.sum()
+        entropy = stats.entropy(counts.sum(axis=1))
+        if entropy == 0:
+            return 1.0
+        joint = counts[counts > 0] / total
+        other = np.broadcast_to(counts.sum(axis=0), counts.shape)[counts > 0] / total
+        conditional_entropy = np.sum(joint * np.log(other / joint))
+        return (entropy - conditional_entropy) / entropy
 
     def _calculate_epsilon_squared(self, h_statistic: float, n: int) -> float:
         return h_statistic * (n + 1) / (n**2 - 1)
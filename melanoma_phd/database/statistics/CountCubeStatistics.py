@@ -0,0 +1,89 @@
+from typing import Any, Dict, List, Optional, Union
+
+import pandas as pd
+
+from melanoma_phd.database.index.CountCube import CountCube
+from melanoma_phd.database.variable.BaseVariable import BaseVariable
+from melanoma_phd.database.variable.CategoricalVariable import CategoricalVariable
+from melanoma_phd.database.variable.StatisticFieldName import StatisticFieldName
+from melanoma_phd.database.variable.VariableDynamicMixin import VariableDynamicMixin
+
+
+class CountCubeStatistics:
+    """Descriptive statistics of categorical variables over the rows of a count cube `selection`.
+
+    Returns the same statistics as `CategoricalVariable.descriptive_statistics` over the selected
+    rows, or None when the variables are not cube dimensions, so the caller falls back to them.
+    """
+
+    def __init__(self, count_cube: CountCube, selection: Dict[str, List[Any]]) -> None:
+        self._count_cube = count_cube
+        self._selection = selection
+
+    def descriptive_statistics(
+        self,
+        variable: BaseVariable,
+        group_by: Optional[Union[BaseVariable, List[BaseVariable]]] = None,
+    ) -> Optional[pd.DataFrame]:
+        group_by_list = (
+            [] if not group_by else [group_by] if isinstance(group_by, BaseVariable) else group_by
+        )
+        if not all(self.__is_supported(variable) for variable in [variable] + group_by_list):
+            return None
+        value_counts = self._count_cube.value_counts([variable.id], self._selection)
+        names = self.__get_names(variable, value_counts.index)
+        if names is None or value_counts.empty:
+            return None
+        percent = pd.Series(
+            value_counts.to_numpy() / value_counts.sum(),
+            index=pd.Index(names, name=variable.id),
+            name="proportion",
+        )
+        if not group_by_list:
+            counts = pd.Series(value_counts.to_numpy(), index=percent.index, name="count")
+        else:
+            value_column = f"_tmp_{variable.id}"
+            grouped_counts = self._count_cube.value_counts(
+                [group_by_variable.id for group_by_variable in group_by_list] + [variable.id],
+                self._selection,
+                sort=False,
+            )
+            level_names = []
+            for level, level_variable in enumerate(group_by_list + [variable]):
+                level_names.append(
+                    self.__get_names(level_variable, grouped_counts.index.levels[level])
+                )
+            if any(names is None for names in level_names):
+                return None
+            grouped_counts.index = grouped_counts.index.set_levels(level_names).set_names(
+                [group_by_variable.id for group_by_variable in group_by_list] + [value_column]
+            )
+            counts = (
+                grouped_counts.groupby(level=list(range(len(group_by_list) + 1)))
+                .sum()
+                .unstack(fill_value=0)
+                .stack()
+            )
+        percent100 = percent.mul(100).round(1)
+        return pd.DataFrame(
+            {
+                StatisticFieldName.COUNT.value: counts,
+                StatisticFieldName.PERCENTAGE.value: percent100,
+            }
+        )
+
+    def __is_supported(self, variable: BaseVariable) -> bool:
+        return (
+            isinstance(variable, CategoricalVariable)
+            and not isinstance(variable, VariableDynamicMixin)
+            and self._count_cube.has_dimensions([variable.id])
+        )
+
+    def __get_names(self, variable: CategoricalVariable, values: pd.Index) -> Optional[List[Any]]:
+        """Category names of the raw `values`, if all of them are categories with distinct names."""
+        if not all(value in variable.categories for value in values):
+            return None
+        names = [variable.categories[value] for value in values]
+        if len(set(names)) != len(names):
+            return None
+        return names
@@ -0,0 +1,174 @@
+from typing import Dict, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from melanoma_phd.database.variable.BaseIterationScalarVariable import BaseIterationScalarVariable
+from melanoma_phd.database.variable.BaseVariable import BaseVariable
+from melanoma_phd.database.variable.CategoricalVariable import CategoricalVariable
+from melanoma_phd.database.variable.ScalarVariable import ScalarVariable
+from melanoma_phd.database.variable.StatisticFieldName import StatisticFieldName
+
+
+class GroupByStatistics:
+    """Descriptive statistics of several variables grouped by the same group by variables.
+
+    Group by keys are factorized once into group codes, shared by a single multi-column aggregation
+    of scalar variables and by categorical counts. Other variables fall back to their own
+    `descriptive_statistics`.
+    """
+
+    SCALAR_AGGREGATIONS = [
+        StatisticFieldName.MEDIAN.value,
+        StatisticFieldName.MEAN.value,
+        StatisticFieldName.STD_DEVIATION.value,
+        StatisticFieldName.MIN_VALUE.value,
+        StatisticFieldName.MAX_VALUE.value,
+    ]
+
+    def __init__(
+        self,
+        dataframe: pd.DataFrame,
+        group_by: Union[BaseVariable, List[BaseVariable]],
+    ) -> None:
+        self._dataframe = dataframe
+        self._group_by: List[BaseVariable] = (
+            [group_by] if isinstance(group_by, BaseVariable) else group_by
+        )
+        group_by_data = [
+            group_by_variable.get_series(dataframe=dataframe)
+            for group_by_variable in self._group_by
+        ]
+        grouper = pd.Series(np.zeros(len(dataframe.index)), index=dataframe.index).groupby(
+            group_by_data
+        )
+        self._group_codes: np.ndarray = grouper.ngroup().fillna(-1).to_numpy(dtype=int)
+        self._group_index: pd.Index = self.__create_group_index(group_by_data)
+        self._scalar_statistics: Optional[pd.DataFrame] = None
+
+    @property
+    def group_by(self) -> List[BaseVariable]:
+        return self._group_by
+
+    def descriptive_statistics(
+        self, variables: List[BaseVariable]
+    ) -> Dict[BaseVariable, Union[pd.DataFrame, Exception]]:
+        self.__compute_scalar_statistics(
+            [variable for variable in variables if self.__is_supported_scalar(variable)]
+        )
+        statistics: Dict[BaseVariable, Union[pd.DataFrame, Exception]] = {}
+        for variable in variables:
+            try:
+                statistics[variable] = self.variable_descriptive_statistics(variable)
+            except Exception as error:
+                statistics[variable] = error
+        return statistics
+
+    def variable_descriptive_statistics(self, variable: BaseVariable) -> pd.DataFrame:
+        if self.__is_supported_scalar(variable):
+            self.__compute_scalar_statistics([variable])
+            assert self._scalar_statistics is not None
+            return self._scalar_statistics[variable.id].copy()
+        elif isinstance(variable, CategoricalVariable):
+            return self.__categorical_statistics(variable)
+        return variable.descriptive_statistics(self._dataframe, group_by=self._group_by)
+
+    def __is_supported_scalar(self, variable: BaseVariable) -> bool:
+        return (
+            isinstance(variable, ScalarVariable)
+            and not isinstance(variable, BaseIterationScalarVariable)
+            and variable.id in self._dataframe.columns
+        )
+
+    def __compute_scalar_statistics(self, variables: List[BaseVariable]) -> None:
+        computed_ids = (
+            set(self._scalar_statistics.columns.get_level_values(0))
+            if self._scalar_statistics is not None
+            else set()
+        )
+        variable_ids = list(
+            dict.fromkeys(variable.id for variable in variables if variable.id not in computed_ids)
+        )
+        if not variable_ids:
+            return
+        valid_mask = self._group_codes >= 0
+        codes = self._group_codes[valid_mask]
+        data = self._dataframe.loc[valid_mask, variable_ids]
+        grouped = data.groupby(codes, sort=True)
+        statistics = grouped.agg(self.SCALAR_AGGREGATIONS)
+        quartiles = grouped.quantile([0.25, 0.75]).unstack(level=-1)
+        quartiles = quartiles.rename(
+            columns={
+                0.25: StatisticFieldName.QUARTILE_1.value,
+                0.75: StatisticFieldName.QUARTILE_3.value,
+            },
+            level=1,
+        )
+        statistics = pd.concat([statistics, quartiles], axis=1)
+        statistics = statistics.reindex(
+            columns=pd.MultiIndex.from_product(
+                [
+                    variable_ids,
+                    self.SCALAR_AGGREGATIONS
+                    + [StatisticFieldName.QUARTILE_1.value, StatisticFieldName.QUARTILE_3.value],
+                ]
+            )
+        )
+        statistics.index = self._group_index[statistics.index.to_numpy()]
+        self._scalar_statistics = (
+            statistics
+            if self._scalar_statistics is None
+            else pd.concat([self._scalar_statistics, statistics], axis=1)
+        )
+
+    def __categorical_statistics(self, variable: CategoricalVariable) -> pd.DataFrame:
+        series = variable.get_series(dataframe=self._dataframe)
+        value_column = f"_tmp_{variable.id}"
+        assert value_column not in self._dataframe.columns
+
+        valid_mask = (self._group_codes >= 0) & series.notna().to_numpy()
+        value_codes, values = pd.factorize(series[valid_mask], sort=True)
+        group_codes = self._group_codes[valid_mask]
+        counts_matrix = np.bincount(
+            group_codes * len(values) + value_codes,
+            minlength=len(self._group_index) * len(values),
+        ).reshape(len(self._group_index), len(values))
+        present_groups = np.flatnonzero(counts_matrix.sum(axis=1))
+        counts_matrix = counts_matrix[present_groups]
+        group_index = self._group_index[present_groups]
+        counts = pd.Series(
+            counts_matrix.ravel(),
+            index=self.__product_index(group_index, pd.Index(values, name=value_column)),
+        )
+
+        percent = series.value_counts(normalize=True)
+        percent100 = percent.mul(100).round(1)
+        return pd.DataFrame(
+            {
+                StatisticFieldName.COUNT.value: counts,
+                StatisticFieldName.PERCENTAGE.value: percent100,
+            }
+        )
+
+    def __create_group_index(self, group_by_data: List[pd.Series]) -> pd.Index:
+        """Group keys in group codes order, read from the first row of each group."""
+        group_codes, first_positions = np.unique(self._group_codes, return_index=True)
+        first_positions = first_positions[group_codes >= 0]
+        names = [group_by_variable.id for group_by_variable in self._group_by]
+        keys = [series.iloc[first_positions].to_numpy() for series in group_by_data]
+        if len(self._group_by) > 1:
+            return pd.MultiIndex.from_arrays(keys, names=names)
+        return pd.Index(keys[0], name=names[0])
+
+    def __product_index(self, group_index: pd.Index, values_index: pd.Index) -> pd.MultiIndex:
+        group_positions = np.repeat(np.arange(len(group_index)), len(values_index))
+        value_positions = np.tile(np.arange(len(values_index)), len(group_index))
+        groups = group_index[group_positions]
+        if isinstance(groups, pd.MultiIndex):
+            arrays = [groups.get_level_values(level) for level in range(groups.nlevels)]
+        else:
+            arrays = [groups]
+        return pd.MultiIndex.from_arrays(
+            arrays + [values_index[value_positions]],
+            names=list(group_index.names) + [values_index.name],
+        )
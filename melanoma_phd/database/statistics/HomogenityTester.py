@@ -1,9 +1,10 @@
-from typing import Union
+from typing import Optional, Union
 
 import pandas as pd
 import scipy.stats as stats
 
 from melanoma_phd.database.statistics.NormalityTester import NormalityTester
+from melanoma_phd.database.statistics.StatisticalPropertyCache import StatisticalPropertyCache
 from melanoma_phd.database.variable.CategoricalVariable import CategoricalVariable
 from melanoma_phd.database.variable.ScalarVariable import ScalarVariable
 from melanoma_phd.database.variable.Variable import PValueType
@@ -11,10 +12,13 @@ from melanoma_phd.database.variable.Variable import PValueType
 
 class HomogenityTester:
     def __init__(
-        self, null_hypothesis: PValueType = 0.05, normality_null_hypothesis: PValueType = 0.05
+        self,
+        null_hypothesis: PValueType = 0.05,
+        normality_null_hypothesis: PValueType = 0.05,
+        property_cache: Optional[StatisticalPropertyCache] = None,
     ) -> None:
         self._null_hypothesis = null_hypothesis
-        self._normality_tester = NormalityTester(normality_null_hypothesis)
+        self._normality_tester = NormalityTester(normality_null_hypothesis, property_cache)
 
     def test_series(self, *series: pd.Series) -> bool:
         if self._normality_tester.test_many_series(*series):
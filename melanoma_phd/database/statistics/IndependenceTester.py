@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import functools
 import logging
 from dataclasses import dataclass
 from enum import Enum
@@ -10,6 +11,9 @@ import scipy.stats as stats
 
 from melanoma_phd.database.statistics.HomogenityTester import HomogenityTester
 from melanoma_phd.database.statistics.NormalityTester import NormalityTester
+from melanoma_phd.database.statistics.PairwiseTableExecutor import PairwiseTableExecutor
+from melanoma_phd.database.statistics.ScalarCorrelationMatrix import ScalarCorrelationMatrix
+from melanoma_phd.database.statistics.StatisticalPropertyCache import StatisticalPropertyCache
 from melanoma_phd.database.statistics.VariableDataframe import VariableDataframe
 from melanoma_phd.database.statistics.VariableStatisticalProperties import (
     VariableStatisticalProperties,
@@ -70,12 +74,23 @@ class IndependenceTester:
         self,
         normality_null_hypothesis: PValueType = 0.05,
         homogeneity_null_hypothesis: PValueType = 0.05,
+        property_cache: Optional[StatisticalPropertyCache] = None,
+        scalar_correlations: Optional[ScalarCorrelationMatrix] = None,
     ) -> None:
         super().__init__()
-        self._normality_tester = NormalityTester(null_hypothesis=normality_null_hypothesis)
+        self._normality_null_hypothesis = normality_null_hypothesis
+        self._homogeneity_null_hypothesis = homogeneity_null_hypothesis
+        self._scalar_correlations = scalar_correlations
+        self._property_cache = (
+            property_cache if property_cache is not None else StatisticalPropertyCache()
+        )
+        self._normality_tester = NormalityTester(
+            null_hypothesis=normality_null_hypothesis, property_cache=self._property_cache
+        )
         self._homogeneity_tester = HomogenityTester(
             null_hypothesis=homogeneity_null_hypothesis,
             normality_null_hypothesis=normality_null_hypothesis,
+            property_cache=self._property_cache,
         )
 
     def test(
@@ -103,8 +118,8 @@ class IndependenceTester:
         )
         try:
             if isinstance(first_variable, ScalarVariable):
-                first_series, second_series = first_variable_dataframe.merge_and_remove_nulls(
-                    second_variable_dataframe
+                first_series, second_series = self._property_cache.merge_and_remove_nulls(
+                    dataframe, first_variable, second_variable
                 )
                 variable_0_prop.normality = self._normality_tester.test_series(first_series)
                 if isinstance(second_variable, ScalarVariable):
@@ -120,7 +135,14 @@ class IndependenceTester:
                             },
                             homogeneity=homogenuos_data,
                             type=IndependencyTestType.PEARSON,
-                            p_value=stats.pearsonr(first_series, second_series).pvalue,
+                            p_value=self._correlate_scalars(
+                                dataframe,
+                                first_variable,
+                                second_variable,
+                                first_series,
+                                second_series,
+                                spearman=False,
+                            )[1],
                         )
                     else:
                         return IndependenceTestResult(
@@ -130,14 +152,18 @@ class IndependenceTester:
                             },
                             homogeneity=homogenuos_data,
                             type=IndependencyTestType.SPEARMAN,
-                            p_value=stats.spearmanr(first_series, second_series).pvalue,
+                            p_value=self._correlate_scalars(
+                                dataframe,
+                                first_variable,
+                                second_variable,
+                                first_series,
+                                second_series,
+                                spearman=True,
+                            )[1],
                         )
                 elif isinstance(second_variable, CategoricalVariable):
-                    series_by_categories = first_variable.get_data_by_categories(
-                        dataframe=dataframe,
-                        category_variable=second_variable,
-                        remove_nulls=True,
-                        remove_short_categories=True,
+                    series_by_categories = self._property_cache.get_data_by_categories(
+                        dataframe, first_variable, second_variable
                     )
                     homogenuos_data = self._homogeneity_tester.test_series(*series_by_categories)
                     if isinstance(second_variable, BooleanVariable):
@@ -187,10 +213,9 @@ class IndependenceTester:
                 second_variable, CategoricalVariable
             ):
                 # TODO: Differentitate between Ordinal (same as ScalarVariable non-normal) and Nominal (as is here) categorical variables
-                serie = first_variable_dataframe.merge_and_remove_nulls(
-                    second_variable_dataframe, only_numeric=True
+                table = self._property_cache.get_contingency_table(
+                    dataframe, first_variable, second_variable
                 )
-                table = stats.contingency.crosstab(*serie).count
                 if table.size < 2:
                     table.resize([2, 2], refcheck=False)
                 if isinstance(first_variable, BooleanVariable) and isinstance(
@@ -238,31 +263,61 @@ class IndependenceTester:
         )
 
     def table(
-        self, dataframe: pd.DataFrame, variables: List[BaseVariable]
+        self,
+        dataframe: pd.DataFrame,
+        variables: List[BaseVariable],
+        executor: Optional[PairwiseTableExecutor] = None,
     ) -> Tuple[pd.DataFrame, List[ValueError]]:
         self._check_variables(dataframe, *variables)
-        results: List[List[IndependenceTestResult]] = []
-        columns: List[str] = []
-        index: List[str] = []
-        for v1 in variables:
-            v1_results = [self.test(dataframe, v1, v2) for v2 in variables]
-            results.append(v1_results)
-            var_title = f"{v1.name} [{v1_results[-1].variables[v1].type.value}] Normality={v1_results[-1].variables[v1].normality}"
-            columns.append(var_title)
-            index.append(var_title)
+        # All the tests are symmetric, so the lower triangle mirrors the upper one
+        pairs = [(i, j) for i in range(len(variables)) for j in range(i + 1, len(variables))]
+        # Scalar pairs read their coefficients from the correlation matrix of all the variables
+        tester_factory = functools.partial(
+            IndependenceTester,
+            normality_null_hypothesis=self._normality_null_hypothesis,
+            homogeneity_null_hypothesis=self._homogeneity_null_hypothesis,
+            scalar_correlations=ScalarCorrelationMatrix(dataframe, variables),
+        )
+        computed_results: List[IndependenceTestResult] = (
+            executor if executor is not None else PairwiseTableExecutor()
+        ).run(
+            tester=tester_factory(
+                property_cache=(
+                    self._property_cache
+                    if self._property_cache.dataframe is dataframe
+                    else StatisticalPropertyCache(dataframe)
+                )
+            ),
+            tester_factory=tester_factory,
+            method_name="test",
+            dataframe=dataframe,
+            variables=variables,
+            pairs=pairs,
+        )
+        results: Dict[Tuple[int, int], IndependenceTestResult] = dict(zip(pairs, computed_results))
+        for i, j in pairs:
+            results.setdefault((j, i), results[(i, j)])
+        titles: List[str] = []
+        for i, v1 in enumerate(variables):
+            v1_properties = (
+                results[(i, len(variables) - 1)].variables[v1]
+                if i < len(variables) - 1
+                else self._get_variable_properties(dataframe, v1)
+            )
+            titles.append(
+                f"{v1.name} [{v1_properties.type.value}] Normality={v1_properties.normality}"
+            )
         return pd.DataFrame(
             data=[
                 [
-                    f"{result.p_value:.4f} (Homogeneity={result.homogeneity}, {result.type.value})"
-                    if result.succeded
-                    else "ERROR"
-                    for result in result_row
+                    "" if i == j else self._format_result(results[(i, j)])
+                    for j in range(len(variables))
                 ]
-                for result_row in results
+                for i in range(len(variables))
             ],
-            columns=columns,
-            index=index,
-        ), [result.error for result_row in results for result in result_row if not result.succeded]
+            columns=titles,
+            index=titles,
+        ), [result.error for result in computed_results if not result.succeded]
 
     def test_two_population(
         self, dataframe_0: pd.DataFrame, dataframe_1: pd.DataFrame, variable: BaseVariable
@@ -301,12 +356,7 @@ class IndependenceTester:
             var_title_index = f"{variable.id} [{test_result.variables[reference_variable].type.value}] Normality={test_result.variables[reference_variable].normality}"
             index.append(var_title_index)
         return pd.DataFrame(
-            data=[
-                f"{result.p_value:.4f} (Homogeneity={result.homogeneity}, {result.type.value})"
-                if result.succeded
-                else "ERROR"
-                for result in results
-            ],
+            data=[self._format_result(result) for result in results],
             columns=columns,
             index=index,
         ), [result.error for result in results if not result.succeded]
@@ -364,13 +414,60 @@ class IndependenceTester:
         group_variable.init_from_dataframe(dataframe=dataframe)
         return dataframe, reference_variable, group_variable
 
+    def _correlate_scalars(
+        self,
+        dataframe: pd.DataFrame,
+        first_variable: BaseVariable,
+        second_variable: BaseVariable,
+        first_series: pd.Series,
+        second_series: pd.Series,
+        spearman: bool,
+    ) -> Tuple[float, float]:
+        """Coefficient and p-value of two scalar series, from the scalar correlations of the table
+        when available.
+        """
+        if (
+            self._scalar_correlations is not None
+            and self._scalar_correlations.dataframe is dataframe
+        ):
+            correlate = (
+                self._scalar_correlations.spearman
+                if spearman
+                else self._scalar_correlations.pearson
+            )
+            correlation = correlate(first_variable, second_variable)
+            if correlation is not None:
+                return correlation
+        result = (stats.spearmanr if spearman else stats.pearsonr)(first_series, second_series)
+        return result.statistic, result.pvalue
+
+    def _format_result(self, result: IndependenceTestResult) -> str:
+        if not result.succeded:
+            return "ERROR"
+        return f"{result.p_value:.4f} (Homogeneity={result.homogeneity}, {result.type.value})"
+
+    def _get_variable_properties(
+        self, dataframe: pd.DataFrame, variable: BaseVariable
+    ) -> VariableStatisticalProperties:
+        properties = VariableStatisticalProperties(
+            type=variable.statistical_type(),
+            normality=False,
+        )
+        if isinstance(variable, ScalarVariable):
+            try:
+                properties.normality = self._normality_tester.test_series(
+                    self._property_cache.get_series(dataframe, variable).dropna()
+                )
+            except ValueError:
+                pass
+        return properties
+
     def _check_variables(self, dataframe: pd.DataFrame, *variables: BaseVariable):
-        empty_variables = []
-        for variable in variables:
-            serie = variable.get_series(dataframe)
-            null_mask = serie.isnull()
-            if sum(null_mask) == len(null_mask):
-                empty_variables.append(variable)
+        empty_variables = [
+            variable
+            for variable in variables
+            if self._property_cache.get_null_mask(dataframe, variable).all()
+        ]
         if empty_variables:
             error_msg = f"{self.__class__.__name__}: variables {[variable.name for variable in empty_variables]} are empty for the given filters. Please review database or filters."
             logging.error(error_msg)
@@ -1,18 +1,26 @@
-from typing import Union
+from typing import Optional, Union
 
 import pandas as pd
 import scipy.stats as stats
 
+from melanoma_phd.database.statistics.StatisticalPropertyCache import StatisticalPropertyCache
 from melanoma_phd.database.variable.ScalarVariable import ScalarVariable
 from melanoma_phd.database.variable.Variable import PValueType
 
 
 class NormalityTester:
-    def __init__(self, null_hypothesis: PValueType = 0.05) -> None:
+    def __init__(
+        self,
+        null_hypothesis: PValueType = 0.05,
+        property_cache: Optional[StatisticalPropertyCache] = None,
+    ) -> None:
         self._null_hypothesis = null_hypothesis
+        self._property_cache = property_cache
 
     def test_series(self, series: pd.Series) -> bool:
         try:
+            if self._property_cache is not None:
+                return self._property_cache.get_normality_pvalue(series) >= self._null_hypothesis
             return stats.shapiro(series).pvalue >= self._null_hypothesis
         except ValueError as e:
             raise ValueError(f"Normality test failed due to: {e}")
@@ -0,0 +1,87 @@
+import warnings
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from melanoma_phd.database.variable.BaseVariable import BaseVariable
+from melanoma_phd.database.variable.CategoricalVariable import CategoricalVariable
+from melanoma_phd.database.variable.ScalarVariable import ScalarVariable
+
+
+class OmegaSquaredMatrix:
+    """One-way ANOVA omega squared of every scalar variable grouped by every categorical variable
+    of a dataframe, over the rows where both are not null.
+
+    Group counts, sums and sums of squares of all the scalar variables are aggregated at once per
+    categorical variable, as products with its one-hot encoding, and the sums of squares of the
+    ANOVA table are derived from them in closed form.
+    """
+
+    def __init__(self, dataframe: pd.DataFrame, variables: List[BaseVariable]) -> None:
+        self._dataframe = dataframe
+        self._scalar_positions: Dict[str, int] = {}
+        self._categorical_positions: Dict[str, int] = {}
+        columns: List[np.ndarray] = []
+        categorical_codes: List[np.ndarray] = []
+        for variable in variables:
+            if isinstance(variable, ScalarVariable) and variable.id not in self._scalar_positions:
+                try:
+                    columns.append(variable.get_series(dataframe).to_numpy(dtype=float))
+                except (TypeError, ValueError):
+                    continue
+                self._scalar_positions[variable.id] = len(columns) - 1
+            elif (
+                isinstance(variable, CategoricalVariable)
+                and variable.id not in self._categorical_positions
+            ):
+                categorical_codes.append(pd.factorize(variable.get_series(dataframe))[0])
+                self._categorical_positions[variable.id] = len(categorical_codes) - 1
+        values = np.column_stack(columns) if columns else np.empty((len(dataframe.index), 0))
+        valid = ~np.isnan(values)
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", category=RuntimeWarning)
+            # Centering by the column means keeps the sums of squares well conditioned
+            centered = np.where(valid, values - np.nanmean(values, axis=0), 0.0)
+        indicators = valid.astype(float)
+        self._omega_squared = np.full((len(categorical_codes), values.shape[1]), np.nan)
+        for position, codes in enumerate(categorical_codes):
+            groups = np.zeros((len(codes), codes.max() + 1 if len(codes) else 0))
+            groups[np.flatnonzero(codes >= 0), codes[codes >= 0]] = 1.0
+            self._omega_squared[position] = self.from_sums(
+                counts=groups.T @ indicators,
+                sums=groups.T @ centered,
+                squares=groups.sum(axis=1) @ centered**2,
+            )
+
+    @property
+    def dataframe(self) -> pd.DataFrame:
+        return self._dataframe
+
+    def get(
+        self, scalar_variable: BaseVariable, categorical_variable: BaseVariable
+    ) -> Optional[float]:
+        if (
+            scalar_variable.id not in self._scalar_positions
+            or categorical_variable.id not in self._categorical_positions
+        ):
+            return None
+        omega_squared = self._omega_squared[
+            self._categorical_positions[categorical_variable.id],
+            self._scalar_positions[scalar_variable.id],
+        ]
+        return None if np.isnan(omega_squared) else float(omega_squared)
+
+    @staticmethod
+    def from_sums(counts: np.ndarray, sums: np.ndarray, squares: np.ndarray) -> np.ndarray:
+        """Omega squared of each column from its groups x columns `counts` and `sums` and its
+        total sum of `squares`, as `anova_lm` of the one-way OLS fit does.
+        """
+        n = counts.sum(axis=0)
+        groups_number = (counts > 0).sum(axis=0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            correction = sums.sum(axis=0) ** 2 / n
+            between = np.where(counts > 0, sums**2 / counts, 0.0).sum(axis=0) - correction
+            total = squares - correction
+            within_mean = (total - between) / (n - groups_number)
+            return (between - (groups_number - 1) * within_mean) / (total + within_mean)
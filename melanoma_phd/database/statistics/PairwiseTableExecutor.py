@@ -0,0 +1,116 @@
+import logging
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from melanoma_phd.database.statistics.StatisticalPropertyCache import StatisticalPropertyCache
+from melanoma_phd.database.variable.BaseVariable import BaseVariable
+
+ProgressCallback = Callable[[int, int], None]
+
+# Tester, dataframe and variables of a pool worker, set once by its initializer
+_worker_state: Dict[str, Any] = {}
+
+
+def _initialize_worker(
+    tester_factory: Callable[..., Any], dataframe: pd.DataFrame, variables: List[BaseVariable]
+) -> None:
+    _worker_state["tester"] = tester_factory(property_cache=StatisticalPropertyCache(dataframe))
+    _worker_state["dataframe"] = dataframe
+    _worker_state["variables"] = variables
+
+
+def _run_pairs(method_name: str, pairs: List[Tuple[int, int]]) -> List[Any]:
+    method = getattr(_worker_state["tester"], method_name)
+    dataframe = _worker_state["dataframe"]
+    variables = _worker_state["variables"]
+    return [method(dataframe, variables[i], variables[j]) for i, j in pairs]
+
+
+class PairwiseTableExecutor:
+    """Runs the pair tests of a pairwise table, in order in the calling process or, with more
+    than one `max_workers`, in a process pool.
+
+    Pool workers receive the dataframe and the variables once, when started, and then run chunks
+    of `chunk_size` pairs with their own tester and property cache. Results are returned in pairs
+    order whatever the completion order, with their variables mapped back to the given ones.
+    """
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = 1,
+        chunk_size: int = 64,
+        progress_callback: Optional[ProgressCallback] = None,
+    ) -> None:
+        if chunk_size < 1:
+            raise ValueError(f"Chunk size has to be positive, not {chunk_size}")
+        self._max_workers = max_workers
+        self._chunk_size = chunk_size
+        self._progress_callback = progress_callback
+
+    @property
+    def parallel(self) -> bool:
+        return self._max_workers is None or self._max_workers > 1
+
+    def run(
+        self,
+        tester: Any,
+        tester_factory: Callable[..., Any],
+        method_name: str,
+        dataframe: pd.DataFrame,
+        variables: List[BaseVariable],
+        pairs: List[Tuple[int, int]],
+    ) -> List[Any]:
+        """Returns `tester.method_name(dataframe, variables[i], variables[j])` for each (i, j) of
+        `pairs`. Pool workers build their tester with `tester_factory(property_cache=...)`.
+        """
+        chunks = [
+            pairs[start : start + self._chunk_size]
+            for start in range(0, len(pairs), self._chunk_size)
+        ]
+        chunk_results: List[Optional[List[Any]]] = [None] * len(chunks)
+        done = 0
+        self.__report_progress(done, len(pairs))
+        if not self.parallel or len(chunks) < 2:
+            method = getattr(tester, method_name)
+            for chunk_index, chunk in enumerate(chunks):
+                chunk_results[chunk_index] = [
+                    method(dataframe, variables[i], variables[j]) for i, j in chunk
+                ]
+                done += len(chunk)
+                self.__report_progress(done, len(pairs))
+        else:
+            logging.info(
+                f"{self.__class__.__name__}: running {len(pairs)} pairs in {len(chunks)} chunks"
+            )
+            with ProcessPoolExecutor(
+                max_workers=self._max_workers,
+                initializer=_initialize_worker,
+                initargs=(tester_factory, dataframe, variables),
+            ) as executor:
+                futures = {
+                    executor.submit(_run_pairs, method_name, chunk): chunk_index
+                    for chunk_index, chunk in enumerate(chunks)
+                }
+                for future in as_completed(futures):
+                    chunk_index = futures[future]
+                    chunk_results[chunk_index] = self.__map_variables(future.result(), variables)
+                    done += len(chunks[chunk_index])
+                    self.__report_progress(done, len(pairs))
+        return [result for results in chunk_results if results for result in results]
+
+    def __report_progress(self, done: int, total: int) -> None:
+        if self._progress_callback is not None:
+            self._progress_callback(done, total)
+
+    @staticmethod
+    def __map_variables(results: List[Any], variables: List[BaseVariable]) -> List[Any]:
+        """Replaces the unpickled copies of the variables of `results` by the original ones."""
+        variables_by_id = {variable.id: variable for variable in variables}
+        for result in results:
+            result.variables = {
+                variables_by_id.get(variable.id, variable): properties
+                for variable, properties in result.variables.items()
+            }
+        return results
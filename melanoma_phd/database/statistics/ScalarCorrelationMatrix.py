@@ -0,0 +1,134 @@
+import warnings
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import scipy.stats as stats
+
+from melanoma_phd.database.variable.BaseVariable import BaseVariable
+from melanoma_phd.database.variable.ScalarVariable import ScalarVariable
+
+
+class ScalarCorrelationMatrix:
+    """Pairwise complete Pearson and Spearman correlations, with their p-values, of all the scalar
+    variables of a dataframe, computed at once as masked matrix products.
+
+    Coefficients of each pair use the rows where both variables are not null. Spearman ranks
+    depend on those rows, so pairs are grouped by their non null rows and the columns of each group
+    are ranked once over them. Pairs with less than 3 rows or constant values are not available,
+    so the caller falls back to scipy for them.
+    """
+
+    MIN_VALUES = 3
+
+    def __init__(self, dataframe: pd.DataFrame, variables: List[BaseVariable]) -> None:
+        self._dataframe = dataframe
+        self._positions: Dict[str, int] = {}
+        columns: List[np.ndarray] = []
+        for variable in variables:
+            if not isinstance(variable, ScalarVariable) or variable.id in self._positions:
+                continue
+            try:
+                columns.append(variable.get_series(dataframe).to_numpy(dtype=float))
+            except (TypeError, ValueError):
+                continue
+            self._positions[variable.id] = len(columns) - 1
+        values = np.column_stack(columns) if columns else np.empty((len(dataframe.index), 0))
+        valid = ~np.isnan(values)
+        self._counts = valid.T.astype(np.int64) @ valid.astype(np.int64)
+        self._pearson = self.__correlate(values, valid)
+        self._spearman = self.__correlate_ranks(values, valid)
+
+    @property
+    def dataframe(self) -> pd.DataFrame:
+        return self._dataframe
+
+    def pearson(
+        self, variable: BaseVariable, other_variable: BaseVariable
+    ) -> Optional[Tuple[float, float]]:
+        """Pearson coefficient and two-sided p-value, as `scipy.stats.pearsonr`."""
+        positions = self.__get_positions(variable, other_variable)
+        if positions is None:
+            return None
+        coefficient = self._pearson[positions]
+        n = self._counts[positions]
+        # Exact distribution of the coefficient under the null hypothesis, as scipy does
+        p_value = 2 * stats.beta.sf(abs(coefficient), n / 2 - 1, n / 2 - 1, loc=-1, scale=2)
+        return float(coefficient), float(p_value)
+
+    def spearman(
+        self, variable: BaseVariable, other_variable: BaseVariable
+    ) -> Optional[Tuple[float, float]]:
+        """Spearman coefficient and two-sided p-value, as `scipy.stats.spearmanr`."""
+        positions = self.__get_positions(variable, other_variable)
+        if positions is None or np.isnan(self._spearman[positions]):
+            return None
+        coefficient = self._spearman[positions]
+        degrees_of_freedom = self._counts[positions] - 2
+        with np.errstate(divide="ignore"):
+            t = coefficient * np.sqrt(
+                degrees_of_freedom / ((coefficient + 1.0) * (1.0 - coefficient))
+            )
+        p_value = 2 * stats.t.sf(abs(t), degrees_of_freedom)
+        return float(coefficient), float(p_value)
+
+    def __get_positions(
+        self, variable: BaseVariable, other_variable: BaseVariable
+    ) -> Optional[Tuple[int, int]]:
+        if variable.id not in self._positions or other_variable.id not in self._positions:
+            return None
+        positions = (self._positions[variable.id], self._positions[other_variable.id])
+        if self._counts[positions] < self.MIN_VALUES or np.isnan(self._pearson[positions]):
+            return None
+        return positions
+
+    def __correlate_ranks(self, values: np.ndarray, valid: np.ndarray) -> np.ndarray:
+        """Pairwise complete Spearman coefficients, ranking the columns once per distinct set of
+        non null rows of their pairs.
+        """
+        coefficients = np.full((values.shape[1], values.shape[1]), np.nan)
+        masks, mask_codes = np.unique(valid.T, axis=0, return_inverse=True)
+        mask_codes = mask_codes.ravel()
+        # Pairs of columns null masks, grouped by the non null rows they have in common
+        groups: Dict[bytes, List[Tuple[int, int]]] = {}
+        for code in range(len(masks)):
+            for other_code in range(code, len(masks)):
+                rows = masks[code] & masks[other_code]
+                groups.setdefault(rows.tobytes(), []).append((code, other_code))
+        for code_pairs in groups.values():
+            rows = masks[code_pairs[0][0]] & masks[code_pairs[0][1]]
+            if np.count_nonzero(rows) < self.MIN_VALUES:
+                continue
+            in_group = np.zeros((len(masks), len(masks)), dtype=bool)
+            for code, other_code in code_pairs:
+                in_group[code, other_code] = in_group[other_code, code] = True
+            group_codes = np.flatnonzero(in_group.any(axis=1))
+            positions = np.flatnonzero(np.isin(mask_codes, group_codes))
+            ranks = stats.rankdata(values[np.ix_(rows, positions)], axis=0)
+            group_coefficients = self.__correlate(ranks, np.ones(ranks.shape, dtype=bool))
+            selected = in_group[np.ix_(mask_codes[positions], mask_codes[positions])]
+            block = coefficients[np.ix_(positions, positions)]
+            block[selected] = group_coefficients[selected]
+            coefficients[np.ix_(positions, positions)] = block
+        return coefficients
+
+    @staticmethod
+    def __correlate(values: np.ndarray, valid: np.ndarray) -> np.ndarray:
+        """Pairwise complete correlation coefficients, null for pairs with constant values."""
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", category=RuntimeWarning)
+            # Centering by the column means keeps the products well conditioned
+            centered = np.where(valid, values - np.nanmean(values, axis=0), 0.0)
+        indicators = valid.astype(float)
+        counts = indicators.T @ indicators
+        # [a, b]: sum and sum of squares of `a` over the rows where `b` is not null
+        sums = centered.T @ indicators
+        squares = (centered**2).T @ indicators
+        with np.errstate(divide="ignore", invalid="ignore"):
+            covariances = centered.T @ centered - sums * sums.T / counts
+            variances = squares - sums**2 / counts
+            coefficients = covariances / np.sqrt(variances * variances.T)
+        # Variances cancelled down to rounding errors are constant values
+        constant = (variances <= 1e-12 * squares) | (variances.T <= 1e-12 * squares.T)
+        coefficients[constant | ~np.isfinite(coefficients)] = np.nan
+        return np.clip(coefficients, -1.0, 1.0)
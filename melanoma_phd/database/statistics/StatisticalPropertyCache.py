@@ -0,0 +1,163 @@
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import scipy.stats as stats
+
+from melanoma_phd.database.variable.BaseVariable import BaseVariable
+from melanoma_phd.database.variable.CategoricalVariable import CategoricalVariable
+from melanoma_phd.database.variable.ScalarVariable import ScalarVariable
+
+
+class StatisticalPropertyCache:
+    """Cache of the statistical properties the testers compute once per variable pair.
+
+    Series, null masks and group splits of variables are cached by variable for the `dataframe`
+    of a view, so a cache owned by a view lives as long as its filters fingerprint. Normality
+    p-values are cached by series content, so they are shared by every pair whose null removal
+    leaves the same values, whatever the dataframe.
+    """
+
+    MAX_ENTRIES = 1024
+
+    def __init__(self, dataframe: Optional[pd.DataFrame] = None) -> None:
+        self._dataframe = dataframe
+        self._variable_entries: Dict[Hashable, Any] = {}
+        self._content_entries: OrderedDict[Hashable, Any] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def dataframe(self) -> Optional[pd.DataFrame]:
+        return self._dataframe
+
+    def get_series(
+        self, dataframe: pd.DataFrame, variable: BaseVariable, only_numeric: bool = False
+    ) -> pd.Series:
+        return self.__get_variable_entry(
+            dataframe,
+            ("series", variable.id, only_numeric),
+            lambda: (
+                variable.get_numeric_series(dataframe)
+                if only_numeric and isinstance(variable, CategoricalVariable)
+                else variable.get_series(dataframe)
+            ),
+        )
+
+    def get_null_mask(
+        self, dataframe: pd.DataFrame, variable: BaseVariable, only_numeric: bool = False
+    ) -> np.ndarray:
+        return self.__get_variable_entry(
+            dataframe,
+            ("null_mask", variable.id, only_numeric),
+            lambda: self.get_series(dataframe, variable, only_numeric).isnull().to_numpy(),
+        )
+
+    def merge_and_remove_nulls(
+        self,
+        dataframe: pd.DataFrame,
+        variable: BaseVariable,
+        other_variable: BaseVariable,
+        only_numeric: bool = False,
+    ) -> Tuple[pd.Series, pd.Series]:
+        """Series of both variables without the rows where any of them is null."""
+        null_mask = self.get_null_mask(dataframe, variable, only_numeric) | self.get_null_mask(
+            dataframe, other_variable, only_numeric
+        )
+        series = self.get_series(dataframe, variable, only_numeric)
+        other_series = self.get_series(dataframe, other_variable, only_numeric)
+        if not null_mask.any():
+            return series, other_series
+        logging.info(
+            f"{self.__class__.__name__}: {null_mask.sum()} nulls removed out of {len(null_mask)} values from variables {[variable.name, other_variable.name]}"
+        )
+        return series[~null_mask], other_series[~null_mask]
+
+    def get_data_by_categories(
+        self,
+        dataframe: pd.DataFrame,
+        variable: ScalarVariable,
+        category_variable: CategoricalVariable,
+    ) -> Tuple[pd.Series, ...]:
+        """Non null `variable` series of each `category_variable` category with 3 values or more."""
+        return self.__get_variable_entry(
+            dataframe,
+            ("data_by_categories", variable.id, category_variable.id),
+            lambda: variable.get_data_by_categories(
+                dataframe=dataframe,
+                category_variable=category_variable,
+                remove_nulls=True,
+                remove_short_categories=True,
+            ),
+        )
+
+    def get_codes(
+        self, dataframe: pd.DataFrame, variable: CategoricalVariable, only_numeric: bool = True
+    ) -> Tuple[np.ndarray, int]:
+        """Codes of the sorted values of a categorical `variable`, -1 for nulls, and the number of
+        values. Values are the numeric ones or, without `only_numeric`, the category names.
+        """
+
+        def encode() -> Tuple[np.ndarray, int]:
+            codes, values = pd.factorize(
+                self.get_series(dataframe, variable, only_numeric), sort=True
+            )
+            return codes, len(values)
+
+        return self.__get_variable_entry(dataframe, ("codes", variable.id, only_numeric), encode)
+
+    def get_contingency_table(
+        self,
+        dataframe: pd.DataFrame,
+        variable: CategoricalVariable,
+        other_variable: CategoricalVariable,
+        only_numeric: bool = True,
+    ) -> np.ndarray:
+        """Counts of the rows holding each pair of values of both variables, over the values of
+        the rows where none is null, as `scipy.stats.contingency.crosstab` of their series.
+        """
+        codes, values_number = self.get_codes(dataframe, variable, only_numeric)
+        other_codes, other_values_number = self.get_codes(dataframe, other_variable, only_numeric)
+        valid = (codes >= 0) & (other_codes >= 0)
+        counts = np.bincount(
+            codes[valid] * other_values_number + other_codes[valid],
+            minlength=values_number * other_values_number,
+        ).reshape(values_number, other_values_number)
+        return counts[counts.any(axis=1)][:, counts.any(axis=0)]
+
+    def get_normality_pvalue(self, series: pd.Series) -> float:
+        """Shapiro-Wilk test p-value of `series`."""
+        return self.__get_content_entry(
+            "normality", series, lambda values: stats.shapiro(values).pvalue
+        )
+
+    def __get_variable_entry(self, dataframe: pd.DataFrame, key: Hashable, compute: Any) -> Any:
+        if dataframe is not self._dataframe:
+            return compute()
+        with self._lock:
+            if key in self._variable_entries:
+                return self._variable_entries[key]
+        value = compute()
+        with self._lock:
+            self._variable_entries[key] = value
+        return value
+
+    def __get_content_entry(self, name: str, series: pd.Series, compute: Any) -> Any:
+        try:
+            values = np.ascontiguousarray(series, dtype=float)
+        except (TypeError, ValueError):
+            return compute(series)
+        key = (name, len(values), hashlib.blake2b(values.tobytes(), digest_size=16).digest())
+        with self._lock:
+            if key in self._content_entries:
+                self._content_entries.move_to_end(key)
+                return self._content_entries[key]
+        value = compute(values)
+        with self._lock:
+            self._content_entries[key] = value
+            while len(self._content_entries) > self.MAX_ENTRIES:
+                self._content_entries.popitem(last=False)
+        return value
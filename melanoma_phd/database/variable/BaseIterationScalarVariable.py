@@ -1,11 +1,12 @@
 import warnings
-from typing import Any, List, Optional, Union
+from typing import Any, Dict, List, Optional, Union
 
 import numpy as np
 import pandas as pd
 
 from melanoma_phd.database.variable.BaseVariable import BaseVariable
 from melanoma_phd.database.variable.IteratedScalarVariableStatic import IteratedScalarVariableStatic
+from melanoma_phd.database.variable.IterationVariableMixin import IterationVariableMixin
 from melanoma_phd.database.variable.ScalarVariable import ScalarVariable
 from melanoma_phd.database.variable.StatisticFieldName import StatisticFieldName
 from melanoma_phd.database.variable.VariableDynamicMixin import (
@@ -31,7 +32,7 @@ class BaseIterationScalarVariableConfig(BaseDynamicVariableConfig):
         self.iterated_variables = iterated_variables
 
 
-class BaseIterationScalarVariable(VariableDynamicMixin, ScalarVariable):
+class BaseIterationScalarVariable(IterationVariableMixin, VariableDynamicMixin, ScalarVariable):
     def __init__(self, config: BaseIterationScalarVariableConfig) -> None:
         super().__init__(config=config)
         self._iterated_variables = config.iterated_variables
@@ -39,7 +40,7 @@ class BaseIterationScalarVariable(VariableDynamicMixin, ScalarVariable):
 
     def init_from_dataframe(self, dataframe: pd.DataFrame) -> None:
         super().init_from_dataframe(dataframe=dataframe)
-        iterated_variable_ids = [varable.id for varable in self._iterated_variables]
+        iterated_variable_ids = self.iterated_variable_ids
         iterated_variables_dataframe = dataframe[iterated_variable_ids]
         self._interval = pd.Interval(
             left=iterated_variables_dataframe.to_numpy(na_value=0).min(),
@@ -51,7 +52,7 @@ class BaseIterationScalarVariable(VariableDynamicMixin, ScalarVariable):
         return self.get_series(dataframe=dataframe).dropna()
 
     def get_series(self, dataframe: pd.DataFrame) -> pd.Series:
-        iterated_variable_ids = [varable.id for varable in self._iterated_variables]
+        iterated_variable_ids = self.iterated_variable_ids
         values = dataframe[iterated_variable_ids].to_numpy()
         with warnings.catch_warnings():
             warnings.simplefilter("ignore", category=RuntimeWarning)
@@ -65,6 +66,39 @@ class BaseIterationScalarVariable(VariableDynamicMixin, ScalarVariable):
             )
         return series
 
+    @classmethod
+    def get_batch_series(
+        cls, variables: List["BaseIterationScalarVariable"], dataframe: pd.DataFrame
+    ) -> Dict[str, pd.Series]:
+        """Returns the series of `variables`, computing the means of the variables with the same
+        number of iterations in one vectorized operation.
+        """
+        batches: Dict[int, List[BaseIterationScalarVariable]] = {}
+        for variable in variables:
+            batches.setdefault(len(variable.iterated_variable_ids), []).append(variable)
+        series: Dict[str, pd.Series] = {}
+        for iterations_number, batch_variables in batches.items():
+            values = dataframe[
+                [
+                    variable_id
+                    for variable in batch_variables
+                    for variable_id in variable.iterated_variable_ids
+                ]
+            ].to_numpy()
+            if values.dtype.kind != "f" or len(batch_variables) == 1:
+                for variable in batch_variables:
+                    series[variable.id] = variable.get_series(dataframe=dataframe)
+                continue
+            values = values.T.reshape(len(batch_variables), iterations_number, len(dataframe.index))
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore", category=RuntimeWarning)
+                means = np.nanmean(values, axis=1)
+            for variable, variable_means in zip(batch_variables, means):
+                series[variable.id] = pd.Series(
+                    variable_means, index=dataframe.index, name=variable.id
+                )
+        return series
+
     @property
     def interval(self) -> pd.Interval:
         if self._interval:
@@ -119,7 +153,7 @@ class BaseIterationScalarVariable(VariableDynamicMixin, ScalarVariable):
         return [[row_name, value_name, value]]
 
     def filter(self, dataframe: pd.DataFrame, filter_dataframe: pd.DataFrame) -> pd.DataFrame:
-        iterated_variable_ids = [varable.id for varable in self._iterated_variables]
+        iterated_variable_ids = self.iterated_variable_ids
         iterated_filter_dataframe = filter_dataframe.copy()
         iterated_filter_dataframe.columns = iterated_variable_ids
         filtered_dataframe = dataframe.copy()
@@ -1,11 +1,13 @@
 from typing import Dict, List, Optional, Union
 
+import numpy as np
 import pandas as pd
 
 from melanoma_phd.database.variable.CategoricalVariable import CategoricalVariable
 from melanoma_phd.database.variable.IteratedCategoricalVariableStatic import (
     IteratedCategoricalVariableStatic,
 )
+from melanoma_phd.database.variable.IterationVariableMixin import IterationVariableMixin
 from melanoma_phd.database.variable.ReferenceIterationVariable import ReferenceIterationVariable
 from melanoma_phd.database.variable.VariableDynamicMixin import (
     BaseDynamicVariableConfig,
@@ -33,7 +35,9 @@ class IterationCategoricalVariableConfig(BaseDynamicVariableConfig):
         self.iterated_variables = iterated_variables
 
 
-class IterationCategoricalVariable(VariableDynamicMixin, CategoricalVariable):
+class IterationCategoricalVariable(
+    IterationVariableMixin, VariableDynamicMixin, CategoricalVariable
+):
     def __init__(self, config: IterationCategoricalVariableConfig) -> None:
         super().__init__(config=config)
         self._iterated_variables = config.iterated_variables
@@ -50,7 +54,10 @@ class IterationCategoricalVariable(VariableDynamicMixin, CategoricalVariable):
         return self.get_series(dataframe=dataframe).dropna()
 
     def get_series(self, dataframe: pd.DataFrame) -> pd.Series:
-        iterated_variable_ids = [varable.id for varable in self._iterated_variables]
+        iterated_variable_ids = self.iterated_variable_ids
+        values = dataframe[iterated_variable_ids].to_numpy()
+        if values.dtype.kind == "f":
+            return pd.Series(self.__get_modes(values), index=dataframe.index, name=self.id)
         series = pd.Series(
             dataframe[iterated_variable_ids].mode(axis=1).iloc[:, 0],
             index=dataframe.index,
@@ -58,8 +65,25 @@ class IterationCategoricalVariable(VariableDynamicMixin, CategoricalVariable):
         )
         return series
 
+    @staticmethod
+    def __get_modes(values: np.ndarray) -> np.ndarray:
+        """Most frequent non null value of each row, the smallest one on ties as `DataFrame.mode`."""
+        non_null = ~np.isnan(values)
+        uniques = np.unique(values[non_null])
+        modes = np.full(len(values), np.nan)
+        if not len(uniques):
+            return modes
+        codes = np.where(non_null, np.searchsorted(uniques, values), len(uniques))
+        rows = np.repeat(np.arange(len(values)), values.shape[1])
+        counts = np.bincount(
+            rows * (len(uniques) + 1) + codes.ravel(), minlength=len(values) * (len(uniques) + 1)
+        ).reshape(len(values), len(uniques) + 1)[:, :-1]
+        has_values = non_null.any(axis=1)
+        modes[has_values] = uniques[counts[has_values].argmax(axis=1)]
+        return modes
+
     def filter(self, dataframe: pd.DataFrame, filter_dataframe: pd.DataFrame) -> pd.DataFrame:
-        iterated_variable_ids = [varable.id for varable in self._iterated_variables]
+        iterated_variable_ids = self.iterated_variable_ids
         iterated_filter_dataframe = filter_dataframe.copy()
         iterated_filter_dataframe.columns = iterated_variable_ids
         filtered_dataframe = dataframe.copy()
@@ -73,5 +97,5 @@ class IterationCategoricalVariable(VariableDynamicMixin, CategoricalVariable):
     def get_filter_dataframe(
         self, dataframe: pd.DataFrame, category_options: List[str]
     ) -> pd.DataFrame:
-        filter_dataframe = dataframe.loc[:, [variable.id for variable in self._iterated_variables]]
+        filter_dataframe = dataframe.loc[:, self.iterated_variable_ids]
         return filter_dataframe.isin(self.get_category_values(category_options))
@@ -0,0 +1,27 @@
+from typing import Dict, List, Sequence
+
+import numpy as np
+import pandas as pd
+
+from melanoma_phd.database.variable.BaseVariable import BaseVariable
+
+
+class IterationVariableMixin:
+    """Mixin class for dynamic variables built from one iterated variable per iteration."""
+
+    _iterated_variables: Sequence[BaseVariable]
+
+    @property
+    def iterated_variable_ids(self) -> List[str]:
+        return [variable.id for variable in self._iterated_variables]
+
+    def get_filter_cells(self, filter_dataframe: pd.DataFrame) -> Dict[str, np.ndarray]:
+        iterated_variable_ids = self.iterated_variable_ids
+        if len(filter_dataframe.columns) != len(iterated_variable_ids):
+            raise ValueError(
+                f"Filter dataframe columns {list(filter_dataframe.columns)} do not match '{self.id}' iterated variables"
+            )
+        return {
+            iterated_variable_id: filter_dataframe.iloc[:, index].to_numpy(dtype=bool)
+            for index, iterated_variable_id in enumerate(iterated_variable_ids)
+        }
@@ -1,7 +1,9 @@
 from typing import List
 
+import numpy as np
 import pandas as pd
 
+from melanoma_phd.database.filter.IntervalMask import IntervalMask
 from melanoma_phd.database.variable.BaseIterationScalarVariable import (
     BaseIterationScalarVariable,
     BaseIterationScalarVariableConfig,
@@ -20,14 +22,18 @@ class ReferenceIterationVariable(BaseIterationScalarVariable):
     def get_filter_dataframe(
         self, dataframe: pd.DataFrame, intervals: List[pd.Interval]
     ) -> pd.DataFrame:
-        filter_dataframe = dataframe.loc[:, [variable.id for variable in self._iterated_variables]]
-        filters = [
-            filter_dataframe.applymap(lambda value: value in interval).any(axis=1)
-            for interval in intervals
-        ]
-        filter = pd.concat(filters, axis=1).all(axis=1)
-        filter_dataframe.loc[filter, :] = filter_dataframe.loc[filter, :].applymap(
-            lambda value: any(value in interval for interval in intervals)
+        if not intervals:
+            raise ValueError(f"No intervals to filter '{self.id}' iteration variable")
+        iterated_variable_ids = self.iterated_variable_ids
+        masks = IntervalMask(intervals).masks(dataframe[iterated_variable_ids].to_numpy())
+        return self.create_filter_dataframe(index=dataframe.index, interval_masks=masks)
+
+    def create_filter_dataframe(self, index: pd.Index, interval_masks: np.ndarray) -> pd.DataFrame:
+        """Creates the filter dataframe from patients x iterations x intervals membership masks."""
+        filter = interval_masks.any(axis=1).all(axis=1)
+        cells = interval_masks.any(axis=2) & filter[:, None]
+        return pd.DataFrame(
+            cells,
+            index=index,
+            columns=self.iterated_variable_ids,
         )
-        filter_dataframe.loc[~filter, :] = False
-        return filter_dataframe
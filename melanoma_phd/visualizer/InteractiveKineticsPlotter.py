@@ -0,0 +1,144 @@
+import math
+from typing import Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+from melanoma_phd.database.IterationTimeSeriesTable import IterationTimeSeriesTable
+from melanoma_phd.database.variable.IterationScalarVariable import IterationScalarVariable
+
+
+class InteractiveKineticsPlotter:
+    """WebGL kinetics plot of many patients.
+
+    All patient series are packed into a single trace with null separators between patients, so
+    drawing cost does not grow with the number of traces, and hovering a point shows its patient.
+    Above `max_points` points, series are decimated keeping their first and last points and, if
+    still needed, evenly spaced patients.
+    """
+
+    MAX_POINTS = 50000
+
+    def __init__(self, max_points: int = MAX_POINTS) -> None:
+        if max_points < 2:
+            raise ValueError(f"Kinetics plot needs at least 2 points, not {max_points}")
+        self._max_points = max_points
+
+    def plot(self, variable: IterationScalarVariable, time_series: pd.DataFrame) -> go.Figure:
+        """Plots the `variable` values over time of all the patients of a long format
+        `time_series` slice of `IterationTimeSeriesTable`, sorted by patient and iteration.
+        """
+        patient_column = time_series.columns[0]
+        patients = time_series[patient_column].to_numpy()
+        times = time_series[IterationTimeSeriesTable.TIME].to_numpy(dtype=float)
+        values = time_series[IterationTimeSeriesTable.VALUE].to_numpy(dtype=float)
+        iterations = time_series[IterationTimeSeriesTable.ITERATION].to_numpy()
+        starts = self.__get_patient_starts(patients)
+        patients_number = len(starts)
+        keep = self.__decimate(starts, len(patients))
+        patients, times, values, iterations = (
+            patients[keep],
+            times[keep],
+            values[keep],
+            iterations[keep],
+        )
+        starts = self.__get_patient_starts(patients)
+        x, y, customdata = self.__pack(starts, times, values, patients, iterations)
+
+        title = f"{variable.name} kinetics of {patients_number} patients"
+        if len(starts) < patients_number or keep.sum() < len(keep):
+            title += f" ({len(starts)} patients, {len(times)} of {len(keep)} points shown)"
+        fig = go.Figure(
+            go.Scattergl(
+                x=x,
+                y=y,
+                customdata=customdata,
+                mode="lines+markers",
+                connectgaps=False,
+                line=dict(width=1, color="rgba(41, 128, 185, 0.4)"),
+                marker=dict(size=4, color="rgba(41, 128, 185, 0.8)"),
+                hovertemplate=(
+                    f"{patient_column}: %{{customdata[0]}}<br>"
+                    "Iteration: %{customdata[1]}<br>"
+                    "Months: %{x}<br>"
+                    f"{variable.name}: %{{y}}<extra></extra>"
+                ),
+                showlegend=False,
+            )
+        )
+        fig.update_layout(
+            template="plotly_white",
+            title=title,
+            xaxis_title="Months",
+            yaxis_title=variable.name,
+        )
+        time_range = self.__get_time_range(variable)
+        if time_range:
+            fig.update_xaxes(range=time_range)
+        return fig
+
+    def __decimate(self, starts: np.ndarray, points_number: int) -> np.ndarray:
+        """Mask of the points to plot, with at most `max_points` points plus separators."""
+        keep = np.ones(points_number, dtype=bool)
+        if points_number <= self._max_points:
+            return keep
+        stops = np.append(starts[1:], points_number)
+        patient_codes = np.repeat(np.arange(len(starts)), stops - starts)
+        ranks = np.arange(points_number) - starts[patient_codes]
+        is_last = np.arange(points_number) == stops[patient_codes] - 1
+        stride = math.ceil(points_number / self._max_points)
+        keep = (ranks % stride == 0) | is_last
+        kept_per_patient = np.bincount(patient_codes[keep], minlength=len(starts))
+        plotted_patients = np.ones(len(starts), dtype=bool)
+        kept_number = int(kept_per_patient.sum())
+        patients_to_plot = len(starts)
+        while kept_number > self._max_points and patients_to_plot > 1:
+            patients_to_plot = max(
+                1,
+                min(patients_to_plot - 1, self._max_points * patients_to_plot // kept_number),
+            )
+            plotted_patients[:] = False
+            plotted_patients[
+                np.linspace(0, len(starts) - 1, patients_to_plot).round().astype(np.int64)
+            ] = True
+            kept_number = int(kept_per_patient[plotted_patients].sum())
+        return keep & plotted_patients[patient_codes]
+
+    @staticmethod
+    def __get_patient_starts(patients: np.ndarray) -> np.ndarray:
+        if not len(patients):
+            return np.empty(0, dtype=np.int64)
+        return np.flatnonzero(np.concatenate([[True], patients[1:] != patients[:-1]]))
+
+    @staticmethod
+    def __pack(
+        starts: np.ndarray,
+        times: np.ndarray,
+        values: np.ndarray,
+        patients: np.ndarray,
+        iterations: np.ndarray,
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Concatenates the patient series with a null point after each one."""
+        patient_codes = np.zeros(len(times), dtype=np.int64)
+        patient_codes[starts[1:]] = 1
+        positions = np.arange(len(times)) + np.cumsum(patient_codes)
+        size = len(times) + len(starts)
+        x = np.full(size, np.nan)
+        y = np.full(size, np.nan)
+        customdata = np.full((size, 2), None, dtype=object)
+        x[positions] = times
+        y[positions] = values
+        customdata[positions, 0] = patients
+        customdata[positions, 1] = iterations
+        return x, y, customdata
+
+    @staticmethod
+    def __get_time_range(variable: IterationScalarVariable) -> Optional[Tuple[float, float]]:
+        try:
+            interval = variable.reference_variable.interval
+        except ValueError:
+            return None
+        if not np.isfinite(interval.left) or not np.isfinite(interval.right):
+            return None
+        return interval.left, interval.right
@@ -1,27 +1,35 @@
-from typing import Dict, List
+from typing import List
 
 import matplotlib.pyplot as plt
 import pandas as pd
 
-from melanoma_phd.database.Patient import Patient
+from melanoma_phd.database.IterationTimeSeriesTable import IterationTimeSeriesTable
+from melanoma_phd.database.statistics.CohortKinetics import CohortKinetics
 from melanoma_phd.database.variable.IterationScalarVariable import IterationScalarVariable
+from melanoma_phd.database.variable.StatisticFieldName import StatisticFieldName
 
 
 class KineticsPlotter:
     def __init__(self) -> None:
         pass
 
-    def plot(self, variable: IterationScalarVariable, patients: List[Patient]) -> plt.Figure:
-        time_series: Dict[str, pd.DataFrame] = {}
-        for patient in patients:
-            time_series[patient.id] = patient.create_time_series(
-                time_variable_name="TIEMPO IT{N}",
-                value_variable_name=variable.id,
-                range=list(range(1, 11, 1)),
-            )
+    def plot(
+        self,
+        variable: IterationScalarVariable,
+        time_series: pd.DataFrame,
+        patient_ids: List[int],
+    ) -> plt.Figure:
+        """Plots the `variable` values over time of `patient_ids` patients from a long format
+        `time_series` slice of `IterationTimeSeriesTable`.
+        """
+        patient_column = time_series.columns[0]
+        patient_time_series = dict(list(time_series.groupby(patient_column, sort=False)))
         fig, axes = plt.subplots(1, 1)
-        for patient_id, ts in time_series.items():
-            lines = axes.plot(ts.iloc[:, 0], ts.iloc[:, 1], "o-")
+        for patient_id in patient_ids:
+            ts = patient_time_series.get(patient_id, time_series.iloc[:0])
+            lines = axes.plot(
+                ts[IterationTimeSeriesTable.TIME], ts[IterationTimeSeriesTable.VALUE], "o-"
+            )
             lines[0].set_label(patient_id)
         axes.set_xlabel("Months")
         axes.set_ylabel(variable.name)
@@ -29,3 +37,32 @@ class KineticsPlotter:
         axes.legend()
 
         return fig
+
+    def plot_cohort(
+        self,
+        variable: IterationScalarVariable,
+        statistics: pd.DataFrame,
+    ) -> plt.Figure:
+        """Plots the median and interquartile range over time of each group of `CohortKinetics`
+        `statistics`.
+        """
+        fig, axes = plt.subplots(1, 1)
+        for group, group_statistics in statistics.groupby(level=0, sort=False):
+            group_statistics = group_statistics.droplevel(0)
+            times = group_statistics.index.get_level_values(CohortKinetics.TIME)
+            lines = axes.plot(
+                times, group_statistics[StatisticFieldName.MEDIAN.value], "o-", label=group
+            )
+            axes.fill_between(
+                times,
+                group_statistics[StatisticFieldName.QUARTILE_1.value],
+                group_statistics[StatisticFieldName.QUARTILE_3.value],
+                color=lines[0].get_color(),
+                alpha=0.2,
+            )
+        axes.set_xlabel("Months")
+        axes.set_ylabel(variable.name)
+        axes.grid(True)
+        axes.legend()
+
+        return fig
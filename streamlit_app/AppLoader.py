@@ -12,6 +12,8 @@ import streamlit as st
 from PersistentSessionState import PersistentSessionState
 
 from melanoma_phd.database.filter.CategoricalFilter import CategoricalFilter
+from melanoma_phd.database.filter.FacetCounter import FacetCounter
+from melanoma_phd.database.filter.IncrementalFilterer import IncrementalFilterer
 from melanoma_phd.database.filter.IterationCategoricalFilter import (
     IterationCategoricalFilter,
 )
@@ -27,12 +29,15 @@ from streamlit_app.filter.FilterSelection import FilterSelection
 from streamlit_app.filter.MultiSelectFilter import MultiSelectFilter
 from streamlit_app.filter.MultiSelectNotEmptyFilter import MultiSelectNotEmptyFilter
 from streamlit_app.filter.RangeInputFilter import RangeInputFilter
+from streamlit_app.filter.TextQueryFilter import TextQueryFilter
 from streamlit_app.logger.StreamlitLogHandler import StreamlitLogHandler
 from streamlit_app.table.CsvTable import CsvTable
 from streamlit_app.table.MarkdownTable import MarkdownTable
 from streamlit_app.table.VariableTable import VariableTable
 from streamlit_app.VariableSelector import VariableSelector
 
+SIDEBAR_FILTER_KEY_CONTEXT = "sidebar filter"
+
 
 @dataclass
 class SelectVariableConfig:
@@ -192,17 +197,39 @@ def create_filters(key_context: str, database: PatientDatabase) -> List[Filter]:
             key_context=key_context,
             filter=CategoricalFilter(database.get_variable("GRUPO con cfDNA")),
         ),
+        TextQueryFilter(key_context=key_context, filter=database.query_filter),
     ]
     return filters
 
 
+def get_count_cube_variables(database: PatientDatabase) -> List[BaseVariable]:
+    """Categorical variables of the filters, used as count cube dimensions."""
+    return [
+        filter.facet.variable
+        for filter in create_filters(key_context="count cube", database=database)
+        if isinstance(filter, MultiSelectFilter)
+    ]
+
+
 def select_filters_sidebar(database: PatientDatabase) -> List[Filter]:
+    filters = create_filters(key_context=SIDEBAR_FILTER_KEY_CONTEXT, database=database)
+    filter_selection = FilterSelection(name=SIDEBAR_FILTER_KEY_CONTEXT, filters=filters)
+    with st.sidebar:
+        filter_selection.select(
+            database=database,
+            facet_counter=get_facet_counter(SIDEBAR_FILTER_KEY_CONTEXT),
+        )
     with st.sidebar.form("Patients Filter"):
-        filters = create_filters(key_context="sidebar filter", database=database)
-        for filter in filters:
-            filter.select()
-        st.form_submit_button("Filter")
-        return filters
+        submitted = st.form_submit_button("Filter")
+    filter_selection.apply(submitted=submitted)
+    return filters
+
+
+def get_facet_counter(key_context: str) -> FacetCounter:
+    facet_counter_key = f"{key_context}_facet_counter"
+    if facet_counter_key not in st.session_state:
+        st.session_state[facet_counter_key] = FacetCounter()
+    return st.session_state[facet_counter_key]
 
 
 def select_population_section(
@@ -219,17 +246,19 @@ def select_population_section(
     filter_selection = FilterSelection(name=population_name, filters=filters)
     if uploaded_file:
         filter_selection.load_from_file(file_contents=uploaded_file.getvalue())
+    filter_selection.select(
+        database=database, facet_counter=get_facet_counter(population_name)
+    )
     with st.form(population_name):
-        filter_selection.select()
         filtered = st.form_submit_button("Filter")
-        if filtered:
-            data_to_save = filter_selection.save_to_file()
-            file_name = (
-                f"filter_selection_{custom_population_name}"
-                + datetime.now().strftime("%d/%m/%Y_%H:%M:%S")
-                + ".json"
-            )
+    filter_selection.apply(submitted=filtered)
     if filtered:
+        data_to_save = filter_selection.save_to_file()
+        file_name = (
+            f"filter_selection_{custom_population_name}"
+            + datetime.now().strftime("%d/%m/%Y_%H:%M:%S")
+            + ".json"
+        )
         st.download_button(
             label=f"Download filter selection ⬇️",
             data=data_to_save,
@@ -240,7 +269,7 @@ def select_population_section(
     return filter_database(
         unique_form_title=f"{population_name} variables to display",
         database=database,
-        filters=filters,
+        filter_selection=filter_selection,
         population_name=custom_population_name,
     )
 
@@ -262,10 +291,18 @@ def select_group_by_sidebar(database: PatientDatabase) -> List[BaseVariable]:
 def filter_database(
     unique_form_title: str,
     database: PatientDatabase,
-    filters: List[Filter],
+    filter_selection: FilterSelection,
     population_name: str,
 ) -> PatientDatabaseView:
-    db_view = database.filter(filters=filters, name=population_name)
+    filterer_key = f"{unique_form_title}_incremental_filterer"
+    if filterer_key not in st.session_state:
+        st.session_state[filterer_key] = IncrementalFilterer()
+    db_view = database.filter(
+        filters=filter_selection.filters,
+        name=population_name,
+        fingerprint=filter_selection.fingerprint(),
+        filterer=st.session_state[filterer_key],
+    )
     df_result = db_view.dataframe
     st.text(f"{len(df_result.index)} patients match with selected filters")
     selected_variables = select_variables_by_multiselect(
@@ -303,7 +340,9 @@ def filter_database_section(
         return filter_database(
             unique_form_title="Variables to display",
             database=database,
-            filters=filters,
+            filter_selection=FilterSelection(
+                name=SIDEBAR_FILTER_KEY_CONTEXT, filters=filters
+            ),
             population_name="",
         )
 
@@ -541,6 +580,8 @@ class AppLoader:
     @st.cache_resource(show_spinner="Loading main application & database...")
     def __load_app(_self) -> MelanomaPhdApp:
         custom_handlers = [StreamlitLogHandler()] if _self._log_trace else []
-        return create_melanoma_phd_app(
+        app = create_melanoma_phd_app(
             log_level=logging.INFO, custom_handlers=custom_handlers
         )
+        app.database.set_count_cube_variables(get_count_cube_variables(app.database))
+        return app
@@ -1,7 +1,11 @@
-from typing import Any, Dict, Protocol
+from typing import Any, Dict, Optional, Protocol
 
 import pandas as pd
 
+from melanoma_phd.database.filter.FilterEstimate import FilterEstimate
+from melanoma_phd.database.filter.FilterMask import FilterMask
+from melanoma_phd.database.filter.FilterMaskContext import FilterMaskContext
+
 
 class Filter(Protocol):
     def select(self) -> None:
@@ -10,6 +14,12 @@ class Filter(Protocol):
     def filter(self, dataframe: pd.DataFrame) -> pd.DataFrame:
         pass
 
+    def mask(self, context: FilterMaskContext) -> FilterMask:
+        pass
+
+    def estimate(self, context: FilterMaskContext) -> Optional[FilterEstimate]:
+        pass
+
     def save_to_dict(self, dict: Dict[str, Any]) -> None:
         pass
 
@@ -1,8 +1,15 @@
+import hashlib
 import json
-from typing import Any, Dict, List
+import logging
+from typing import Any, Dict, List, Optional
 
 import pandas as pd
+import streamlit as st
 
+from melanoma_phd.database.filter.CategoricalFilter import CategoricalFilter
+from melanoma_phd.database.filter.FacetCounter import FacetCounter
+from melanoma_phd.database.filter.QueryParser import QueryError
+from melanoma_phd.database.PatientDatabase import PatientDatabase
 from streamlit_app.filter.Filter import Filter
 
 
@@ -10,11 +17,85 @@ class FilterSelection:
     def __init__(self, name: str, filters: List[Filter]) -> None:
         self._name = name
         self._filters = filters
+        self._loaded_dict: Dict[str, Any] = {}
 
-    def select(self) -> None:
+    @property
+    def name(self) -> str:
+        return self._name
+
+    @property
+    def filters(self) -> List[Filter]:
+        return self._filters
+
+    def select(
+        self,
+        database: Optional[PatientDatabase] = None,
+        facet_counter: Optional[FacetCounter] = None,
+    ) -> None:
+        if database is not None and facet_counter is not None:
+            self.update_option_counts(database, facet_counter)
         for filter in self._filters:
             filter.select()
 
+    def apply(self, submitted: bool) -> None:
+        """Loads the applied selection into the filters, taking the drawn one when `submitted`.
+
+        Widgets are drawn outside the form so that option counts follow every change, while the
+        database is only filtered with the selection of the last form submission.
+        """
+        applied_key = self.__get_applied_key()
+        if submitted or applied_key not in st.session_state:
+            dict: Dict[str, Any] = {}
+            for filter in self._filters:
+                filter.save_to_dict(dict)
+            st.session_state[applied_key] = dict
+        for filter in self._filters:
+            filter.load_from_dict(st.session_state[applied_key])
+
+    def update_option_counts(self, database: PatientDatabase, facet_counter: FacetCounter) -> None:
+        """Counts the options of the categorical filters given the other filters, before drawing
+        them. Widget values are read from the session state, which holds the values of the last
+        change, so the counts follow the selection being drawn before it is applied.
+        """
+        current_dict: Dict[str, Any] = st.session_state.to_dict()
+        current_dict.update(
+            {key: value for key, value in self._loaded_dict.items() if value not in (None, "", [])}
+        )
+        facets: Dict[int, CategoricalFilter] = {}
+        for index, filter in enumerate(self._filters):
+            filter.load_from_dict(current_dict)
+            if hasattr(filter, "set_option_counts"):
+                facets[index] = filter.facet
+        try:
+            option_counts = facet_counter.count(
+                dataframe=database.dataframe,
+                filters=self._filters,
+                facets=facets,
+                variables=database.variables,
+                index=database.index,
+            )
+        except QueryError as error:
+            logging.debug(f"Option counts not available: {error}")
+            option_counts = {}
+        for index in facets:
+            self._filters[index].set_option_counts(option_counts.get(index))
+
+    def fingerprint(self) -> str:
+        """Canonical hash of the selected filter options, independent of the selection name."""
+        dict: Dict[str, Any] = {}
+        for filter in self._filters:
+            filter.save_to_dict(dict)
+        key_prefix = f"{self._name}_"
+        canonical_dict = {
+            key[len(key_prefix) :] if key.startswith(key_prefix) else key: (
+                sorted(value) if isinstance(value, list) else value
+            )
+            for key, value in dict.items()
+            if value not in (None, "", [], ())
+        }
+        canonical_json = json.dumps(canonical_dict, sort_keys=True, default=str)
+        return hashlib.sha256(canonical_json.encode("utf-8")).hexdigest()
+
     def save_to_file(self) -> str:
         dict: Dict[str, Any] = {}
         for filter in self._filters:
@@ -23,5 +104,14 @@ class FilterSelection:
 
     def load_from_file(self, file_contents: bytes) -> None:
         dict: Dict[str, Any] = json.loads(file_contents.decode("utf-8"))
+        self._loaded_dict = dict
         for filter in self._filters:
             filter.load_from_dict(dict)
+        loaded_file_key = f"{self._name}_loaded_file"
+        loaded_file_hash = hashlib.sha256(file_contents).hexdigest()
+        if st.session_state.get(loaded_file_key) != loaded_file_hash:
+            st.session_state[loaded_file_key] = loaded_file_hash
+            st.session_state[self.__get_applied_key()] = dict
+
+    def __get_applied_key(self) -> str:
+        return f"{self._name}_applied_selection"
@@ -4,6 +4,9 @@ from typing import Any, Dict, List
 import pandas as pd
 import streamlit as st
 
+from melanoma_phd.database.filter.FilterEstimate import FilterEstimate
+from melanoma_phd.database.filter.FilterMask import FilterMask
+from melanoma_phd.database.filter.FilterMaskContext import FilterMaskContext
 from melanoma_phd.database.filter.ScalarFilter import ScalarFilter
 
 
@@ -46,6 +49,14 @@ class MultiSelectBinFilter:
         intervals = [self._bins[selected_option] for selected_option in self._selected_options]
         return self._filter.filter(dataframe, intervals)
 
+    def mask(self, context: FilterMaskContext) -> FilterMask:
+        intervals = [self._bins[selected_option] for selected_option in self._selected_options]
+        return self._filter.mask(context, intervals)
+
+    def estimate(self, context: FilterMaskContext) -> FilterEstimate:
+        intervals = [self._bins[selected_option] for selected_option in self._selected_options]
+        return self._filter.estimate(context, intervals)
+
     def save_to_dict(self, dict: Dict[str, Any]) -> None:
         dict[self._key] = self._selected_options
 
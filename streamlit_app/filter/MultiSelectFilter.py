@@ -1,9 +1,12 @@
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 
 import pandas as pd
 import streamlit as st
 
 from melanoma_phd.database.filter.CategoricalFilter import CategoricalFilter
+from melanoma_phd.database.filter.FilterEstimate import FilterEstimate
+from melanoma_phd.database.filter.FilterMask import FilterMask
+from melanoma_phd.database.filter.FilterMaskContext import FilterMaskContext
 
 
 class MultiSelectFilter:
@@ -11,6 +14,14 @@ class MultiSelectFilter:
         self._key = f"{key_context}_{filter.name}"
         self._filter = filter
         self._selected_options: List[str] = []
+        self._option_counts: Optional[Dict[str, int]] = None
+
+    @property
+    def facet(self) -> CategoricalFilter:
+        return self._filter
+
+    def set_option_counts(self, option_counts: Optional[Dict[str, int]]) -> None:
+        self._option_counts = option_counts
 
     def select(self) -> None:
         self._selected_options = st.multiselect(
@@ -18,11 +29,21 @@ class MultiSelectFilter:
             options=self._filter.options(),
             key=self._key,
             default=self.__get_current_options(),
+            format_func=self.__format_option,
         )
 
     def filter(self, dataframe: pd.DataFrame) -> pd.DataFrame:
         return self._filter.filter(dataframe, self._selected_options)
 
+    def mask(self, context: FilterMaskContext) -> FilterMask:
+        return self._filter.mask(context, self._selected_options)
+
+    def estimate(self, context: FilterMaskContext) -> FilterEstimate:
+        return self._filter.estimate(context, self._selected_options)
+
+    def selection(self) -> Optional[Dict[str, List[Any]]]:
+        return self._filter.selection(self._selected_options)
+
     def save_to_dict(self, dict: Dict[str, Any]) -> None:
         dict[self._key] = self._selected_options
 
@@ -30,6 +51,11 @@ class MultiSelectFilter:
         if self._key in dict:
             self._selected_options = dict[self._key]
 
+    def __format_option(self, option: str) -> str:
+        if self._option_counts is None or option not in self._option_counts:
+            return option
+        return f"{option} ({self._option_counts[option]})"
+
     def __get_current_options(self) -> List[str]:
         return (
             self._selected_options
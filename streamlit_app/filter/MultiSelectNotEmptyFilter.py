@@ -3,6 +3,9 @@ from typing import Any, Dict, List
 import pandas as pd
 import streamlit as st
 
+from melanoma_phd.database.filter.FilterEstimate import FilterEstimate
+from melanoma_phd.database.filter.FilterMask import FilterMask
+from melanoma_phd.database.filter.FilterMaskContext import FilterMaskContext
 from melanoma_phd.database.filter.NotEmptyVariableFilter import NotEmptyVariableFilter
 
 
@@ -17,7 +20,7 @@ class MultiSelectNotEmptyFilter:
         self._filters: Dict[str, NotEmptyVariableFilter] = {
             filter.name: filter for filter in filters
         }
-        self._selected_option: str
+        self._selected_option: str = self.EMPTY_OPTON
 
     def select(self) -> None:
         options = list(self._filters.keys())
@@ -35,6 +38,20 @@ class MultiSelectNotEmptyFilter:
             else dataframe
         )
 
+    def mask(self, context: FilterMaskContext) -> FilterMask:
+        return (
+            self._filters[self._selected_option].mask(context)
+            if self._selected_option != self.EMPTY_OPTON
+            else context.full_mask()
+        )
+
+    def estimate(self, context: FilterMaskContext) -> FilterEstimate:
+        return (
+            self._filters[self._selected_option].estimate(context)
+            if self._selected_option != self.EMPTY_OPTON
+            else FilterEstimate.empty()
+        )
+
     def save_to_dict(self, dict: Dict[str, Any]) -> None:
         dict[self._key] = self._selected_option
 
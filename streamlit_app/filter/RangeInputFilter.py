@@ -3,6 +3,9 @@ from typing import Any, Dict, List, Optional, Tuple, Union
 import pandas as pd
 import streamlit as st
 
+from melanoma_phd.database.filter.FilterEstimate import FilterEstimate
+from melanoma_phd.database.filter.FilterMask import FilterMask
+from melanoma_phd.database.filter.FilterMaskContext import FilterMaskContext
 from melanoma_phd.database.filter.IterationScalarFilter import IterationScalarFilter
 
 
@@ -65,6 +68,18 @@ class RangeInputFilter:
         else:
             return dataframe
 
+    def mask(self, context: FilterMaskContext) -> FilterMask:
+        if self._selected_intervals:
+            return self._filter.mask(context, intervals=self._selected_intervals)
+        else:
+            return context.full_mask()
+
+    def estimate(self, context: FilterMaskContext) -> FilterEstimate:
+        if self._selected_intervals:
+            return self._filter.estimate(context, intervals=self._selected_intervals)
+        else:
+            return FilterEstimate.empty()
+
     def __get_current_min_value(
         self, index: int, key: str, default: Union[int, float]
     ) -> Union[int, float]:
@@ -104,6 +119,8 @@ class RangeInputFilter:
         for index in range(self._ranges_number):
             _, range_key_min, range_key_max = self.__get_number_input_name_key(index)
             if range_key_min in dict and range_key_max in dict:
+                if (dict[range_key_min], dict[range_key_max]) == (self._min_value, self._max_value):
+                    continue
                 self._selected_intervals.append(
                     pd.Interval(left=dict[range_key_min], right=dict[range_key_max], closed="both")
                 )
@@ -3,6 +3,9 @@ from typing import Any, Dict, List, Optional, Tuple, Union
 import pandas as pd
 import streamlit as st
 
+from melanoma_phd.database.filter.FilterEstimate import FilterEstimate
+from melanoma_phd.database.filter.FilterMask import FilterMask
+from melanoma_phd.database.filter.FilterMaskContext import FilterMaskContext
 from melanoma_phd.database.filter.IterationScalarFilter import IterationScalarFilter
 
 
@@ -53,6 +56,18 @@ class RangeSliderFilter:
         else:
             return dataframe
 
+    def mask(self, context: FilterMaskContext) -> FilterMask:
+        if self._selected_intervals:
+            return self._filter.mask(context, intervals=self._selected_intervals)
+        else:
+            return context.full_mask()
+
+    def estimate(self, context: FilterMaskContext) -> FilterEstimate:
+        if self._selected_intervals:
+            return self._filter.estimate(context, intervals=self._selected_intervals)
+        else:
+            return FilterEstimate.empty()
+
     def __get_slider_name_key(self, index: int) -> Tuple[str, str]:
         index_postfix = f" #{index+1}" if self._sliders_number > 1 else ""
         slider_name = f"{self._filter.name}{index_postfix}"
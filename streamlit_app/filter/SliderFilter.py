@@ -3,6 +3,9 @@ from typing import Any, Dict, Tuple, Union
 import pandas as pd
 import streamlit as st
 
+from melanoma_phd.database.filter.FilterEstimate import FilterEstimate
+from melanoma_phd.database.filter.FilterMask import FilterMask
+from melanoma_phd.database.filter.FilterMaskContext import FilterMaskContext
 from melanoma_phd.database.filter.ScalarFilter import ScalarFilter
 
 
@@ -32,6 +35,26 @@ class SliderFilter:
             ),
         )
 
+    def mask(self, context: FilterMaskContext) -> FilterMask:
+        return self._filter.mask(
+            context,
+            pd.Interval(
+                left=self._selected_interval[0],
+                right=self._selected_interval[1],
+                closed="both",
+            ),
+        )
+
+    def estimate(self, context: FilterMaskContext) -> FilterEstimate:
+        return self._filter.estimate(
+            context,
+            pd.Interval(
+                left=self._selected_interval[0],
+                right=self._selected_interval[1],
+                closed="both",
+            ),
+        )
+
     def __get_current_value(self) -> Tuple[Union[int, float], Union[int, float]]:
         if self._selected_interval:
             return self._selected_interval[0], self._selected_interval[1]
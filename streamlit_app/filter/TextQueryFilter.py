@@ -0,0 +1,60 @@
+from typing import Any, Dict, Optional
+
+import pandas as pd
+import streamlit as st
+
+from melanoma_phd.database.filter.FilterEstimate import FilterEstimate
+from melanoma_phd.database.filter.FilterMask import FilterMask
+from melanoma_phd.database.filter.FilterMaskContext import FilterMaskContext
+from melanoma_phd.database.filter.QueryFilter import QueryFilter
+from melanoma_phd.database.filter.QueryParser import QueryError
+
+
+class TextQueryFilter:
+    HELP: str = (
+        'e.g. BOR in ["RC", "RP"] and "EDAD (AÑOS)" between 40 and 60 and '
+        'any("TIEMPO IT{N}" in [5, 7])'
+    )
+
+    def __init__(self, key_context: str, filter: QueryFilter) -> None:
+        self._key = f"{key_context}_{filter.name}"
+        self._filter = filter
+        self._query: str = ""
+
+    def select(self) -> None:
+        query = st.text_area(
+            label=self._filter.name,
+            key=self._key,
+            value=self.__get_current_query(),
+            help=self.HELP,
+        )
+        try:
+            self._filter.compile(query)
+            self._query = query
+        except QueryError as error:
+            st.error(str(error))
+            self._query = ""
+
+    def filter(self, dataframe: pd.DataFrame) -> pd.DataFrame:
+        return self._filter.filter(dataframe, self._query)
+
+    def mask(self, context: FilterMaskContext) -> FilterMask:
+        return self._filter.mask(context, self._query)
+
+    def estimate(self, context: FilterMaskContext) -> Optional[FilterEstimate]:
+        return self._filter.estimate(context, self._query)
+
+    def save_to_dict(self, dict: Dict[str, Any]) -> None:
+        dict[self._key] = self._query
+
+    def load_from_dict(self, dict: Dict[str, Any]) -> None:
+        if self._key in dict:
+            self._query = dict[self._key]
+
+    def __get_current_query(self) -> str:
+        if self._query:
+            return self._query
+        elif self._key in st.session_state:
+            return st.session_state[self._key]
+        else:
+            return ""
@@ -9,6 +9,7 @@ import streamlit as st
 sys.path.append(
     os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 )  # isort: skip <- Force to be after workaround
+from melanoma_phd.database.statistics.GroupByStatistics import GroupByStatistics
 from melanoma_phd.database.variable.BooleanVariable import BooleanVariable
 from melanoma_phd.database.variable.CategoricalVariable import CategoricalVariable
 from melanoma_phd.database.variable.ScalarVariable import ScalarVariable
@@ -74,14 +75,49 @@ if __name__ == "__main__":
                 ],
             ),
         )
+        group_by_statistics = (
+            GroupByStatistics(filtered_df, group_by=selected_group_by)
+            if selected_group_by
+            else None
+        )
         st.header("Descriptive Statistcs")
         if selected_variables:
+            # Categorical variables of count cube selections are aggregated from the cube
+            cube_statistics = (
+                {
+                    variable: db_view.count_cube_descriptive_statistics(
+                        variable, selected_group_by
+                    )
+                    for variable in selected_variables
+                }
+                if group_by_statistics
+                else {}
+            )
+            grouped_statistics = (
+                group_by_statistics.descriptive_statistics(
+                    [
+                        variable
+                        for variable in selected_variables
+                        if cube_statistics[variable] is None
+                    ]
+                )
+                if group_by_statistics
+                else {}
+            )
             variables_statistics = {}
             for variable in selected_variables:
                 try:
-                    variables_statistics[variable] = variable.descriptive_statistics(
-                        filtered_df, group_by=selected_group_by
-                    )
+                    if cube_statistics.get(variable) is not None:
+                        variables_statistics[variable] = cube_statistics[variable]
+                    elif group_by_statistics:
+                        statistics = grouped_statistics[variable]
+                        if isinstance(statistics, Exception):
+                            raise statistics
+                        variables_statistics[variable] = statistics
+                    else:
+                        variables_statistics[variable] = db_view.descriptive_statistics(
+                            variable
+                        )
                     st.write(
                         f"{variable.name}"
                         + (
@@ -105,13 +141,19 @@ if __name__ == "__main__":
         variable_names_to_plot = get_cell_variable_groups()
         for group_name, variable_names in variable_names_to_plot.items():
             st.header(group_name)
-            variables_to_plot = dict(
-                (
-                    database.get_variable(variable_name),
-                    database.get_variable(variable_name)
-                    .descriptive_statistics(filtered_df, group_by=selected_group_by)
-                    .fillna(0),
+            variables_to_plot = {}
+            for variable_name in variable_names:
+                variable = database.get_variable(variable_name)
+                statistics = (
+                    db_view.count_cube_descriptive_statistics(variable, selected_group_by)
+                    if group_by_statistics
+                    else None
                 )
-                for variable_name in variable_names
-            )
+                if statistics is None:
+                    statistics = (
+                        group_by_statistics.variable_descriptive_statistics(variable)
+                        if group_by_statistics
+                        else db_view.descriptive_statistics(variable)
+                    )
+                variables_to_plot[variable] = statistics.fillna(0)
             st.pyplot(PiePlotter().plot(variable_statistics=variables_to_plot))
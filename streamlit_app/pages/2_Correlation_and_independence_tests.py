@@ -1,5 +1,6 @@
 import os
 import sys
+from typing import Optional
 
 import streamlit as st
 
@@ -7,6 +8,7 @@ import streamlit as st
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))  # isort: skip
 from melanoma_phd.database.statistics.Correlationer import Correlationer
 from melanoma_phd.database.statistics.IndependenceTester import IndependenceTester
+from melanoma_phd.database.statistics.PairwiseTableExecutor import PairwiseTableExecutor
 from melanoma_phd.database.variable.BooleanVariable import BooleanVariable
 from melanoma_phd.database.variable.CategoricalVariable import CategoricalVariable
 from melanoma_phd.database.variable.ScalarVariable import ScalarVariable
@@ -19,6 +21,16 @@ from streamlit_app.AppLoader import (
     select_variables_by_checkbox,
 )
 
+
+def create_table_executor(max_workers: Optional[int]) -> PairwiseTableExecutor:
+    progress_bar = st.progress(0.0, text="Computing pairs")
+
+    def update_progress(done: int, total: int) -> None:
+        progress_bar.progress(done / total if total else 1.0, text=f"Computed {done}/{total} pairs")
+
+    return PairwiseTableExecutor(max_workers=max_workers, progress_callback=update_progress)
+
+
 if __name__ == "__main__":
     st.set_page_config(page_title="Melanoma PHD Statistics", layout="wide")
     st.title("Correlation and Independence Tests")
@@ -50,13 +62,23 @@ if __name__ == "__main__":
         homogeneity_null_hypothesis = st.number_input(
             "Homogeneity null hypotesis", min_value=0.0, max_value=1.0, step=0.01, value=0.05
         )
+        max_workers = st.number_input(
+            "Worker processes (1 runs the tests in the app process)",
+            min_value=1,
+            max_value=os.cpu_count() or 1,
+            step=1,
+            value=1,
+        )
         if selected_variables:
             st.header("Independence Tests (p-value)")
             independence_tester = IndependenceTester(
                 normality_null_hypothesis=normality_null_hypothesis,
                 homogeneity_null_hypothesis=homogeneity_null_hypothesis,
+                property_cache=db_view.property_cache,
+            )
+            independence_table, errors = independence_tester.table(
+                filtered_df, selected_variables, create_table_executor(max_workers)
             )
-            independence_table, errors = independence_tester.table(filtered_df, selected_variables)
             for error in errors:
                 st.error(error)
             st.dataframe(independence_table)
@@ -65,8 +87,11 @@ if __name__ == "__main__":
             correlationer = Correlationer(
                 normality_null_hypothesis=normality_null_hypothesis,
                 homogeneity_null_hypothesis=homogeneity_null_hypothesis,
+                property_cache=db_view.property_cache,
+            )
+            correlation_table, errors = correlationer.table(
+                filtered_df, selected_variables, create_table_executor(max_workers)
             )
-            correlation_table, errors = correlationer.table(filtered_df, selected_variables)
             for error in errors:
                 st.error(error)
             st.dataframe(correlation_table)
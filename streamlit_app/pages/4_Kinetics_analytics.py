@@ -1,6 +1,6 @@
 import os
 import sys
-from typing import List
+from typing import List, Optional, Tuple
 
 import streamlit as st
 
@@ -8,9 +8,13 @@ import streamlit as st
 sys.path.append(
     os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 )  # isort: skip
-from melanoma_phd.database.Patient import Patient
+from melanoma_phd.database.PatientDatabase import PatientDatabase
 from melanoma_phd.database.PatientDatabaseView import PatientDatabaseView
+from melanoma_phd.database.statistics.CohortKinetics import CohortKinetics, CohortKineticsMethod
+from melanoma_phd.database.variable.BaseVariable import BaseVariable
+from melanoma_phd.database.variable.CategoricalVariable import CategoricalVariable
 from melanoma_phd.database.variable.IterationScalarVariable import IterationScalarVariable
+from melanoma_phd.visualizer.InteractiveKineticsPlotter import InteractiveKineticsPlotter
 from melanoma_phd.visualizer.KineticsPlotter import KineticsPlotter
 from streamlit_app.AppLoader import (
     AppLoader,
@@ -20,9 +24,10 @@ from streamlit_app.AppLoader import (
     select_filters_sidebar,
     select_one_variable,
 )
+from streamlit_app.VariableSelector import VariableSelector
 
 
-def select_patients(database_view: PatientDatabaseView) -> List[Patient]:
+def select_patients(database_view: PatientDatabaseView) -> List[int]:
     with st.form("select_patients"):
         patient_ids = []
         selected_patient_ids = st.multiselect(
@@ -30,14 +35,80 @@ def select_patients(database_view: PatientDatabaseView) -> List[Patient]:
         )
         if st.form_submit_button("Select"):
             patient_ids = selected_patient_ids
-    return database_view.get_patients(patient_ids)
+    return patient_ids
 
 
-def plot_kinetics(variable: IterationScalarVariable, patients: List[Patient]) -> None:
-    figure = KineticsPlotter().plot(variable, patients)
+def plot_kinetics(
+    database: PatientDatabase,
+    database_view: PatientDatabaseView,
+    variable: IterationScalarVariable,
+    patient_ids: List[int],
+) -> None:
+    time_series = database.time_series_table.get(
+        variable_ids=[variable.id], patient_ids=patient_ids, mask=database_view.mask
+    )
+    figure = KineticsPlotter().plot(variable, time_series, patient_ids)
     st.pyplot(figure)
 
 
+def plot_all_patients_kinetics(
+    database: PatientDatabase,
+    database_view: PatientDatabaseView,
+    variable: IterationScalarVariable,
+) -> None:
+    time_series = database.time_series_table.get(
+        variable_ids=[variable.id], patient_ids=database_view.patient_ids, mask=database_view.mask
+    )
+    st.plotly_chart(
+        InteractiveKineticsPlotter().plot(variable, time_series), use_container_width=True
+    )
+
+
+def select_cohort_kinetics(
+    database: PatientDatabase,
+) -> Optional[Tuple[Optional[BaseVariable], float, CohortKineticsMethod]]:
+    with st.form("select_cohort_kinetics"):
+        variables = VariableSelector(database).get_variables_to_select(CategoricalVariable)
+        group_by_id = st.selectbox(
+            label="Group by",
+            options=[None] + [variable.id for variable in variables],
+            key="cohort_kinetics_group_by",
+        )
+        time_step = st.number_input(
+            label="Time step (months)",
+            min_value=0.1,
+            value=1.0,
+            step=0.5,
+            key="cohort_kinetics_time_step",
+        )
+        method = st.radio(
+            label="Resampling method",
+            options=list(CohortKineticsMethod),
+            format_func=lambda method: method.value.capitalize(),
+            key="cohort_kinetics_method",
+            horizontal=True,
+        )
+        if not st.form_submit_button("Aggregate"):
+            return None
+    group_by = database.get_variable(group_by_id) if group_by_id else None
+    return group_by, time_step, method
+
+
+def plot_cohort_kinetics(
+    database_view: PatientDatabaseView,
+    variable: IterationScalarVariable,
+    group_by: Optional[BaseVariable],
+    time_step: float,
+    method: CohortKineticsMethod,
+) -> None:
+    cohort_kinetics = CohortKinetics(
+        variable, CohortKinetics.create_time_grid(variable, time_step), method
+    )
+    statistics = cohort_kinetics.compute(database_view.dataframe, group_by)
+    st.pyplot(KineticsPlotter().plot_cohort(variable, statistics))
+    st.dataframe(statistics, use_container_width=True)
+
+
 if __name__ == "__main__":
     st.set_page_config(page_title="Kinetics Analytics", layout="wide")
     st.title("Kinetics Analytics")
@@ -55,7 +126,19 @@ if __name__ == "__main__":
             ),
         )
         if variable:
-            patients = select_patients(db_view)
-            plot_kinetics(variable, patients)
+            mode = st.radio(
+                label="Kinetics of",
+                options=["Patients", "All patients", "Cohort"],
+                key="kinetics_mode",
+            )
+            if mode == "Patients":
+                patient_ids = select_patients(db_view)
+                plot_kinetics(database, db_view, variable, patient_ids)
+            elif mode == "All patients":
+                plot_all_patients_kinetics(database, db_view, variable)
+            else:
+                cohort_selection = select_cohort_kinetics(database)
+                if cohort_selection:
+                    plot_cohort_kinetics(db_view, variable, *cohort_selection)
         else:
             st.text("Select a variable to display :)")